@@ -1,4 +1,5 @@
 import logging
+import os
 from logging.handlers import RotatingFileHandler
 from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
@@ -7,16 +8,27 @@ from flask_jwt_extended import JWTManager
 from flask_mail import Mail
 from flask_cors import CORS
 from extensions import db
+from json_provider import init_json_provider
 
 #import blueprints here
 from auth.routes import auth_bp
+from auth.revocation import init_revocation_cache
+from auth.pruning import init_blocklist_pruner
+from auth.hashing import init_password_hasher
+from notifications.outbox import init_outbox_sender
 from cash_flow.routes import transaction_bp
 from cash_flow.views.blueprint import cash_flow
+from cash_flow.views.list_cache import init_list_cache
+from cash_flow.typeahead import init_typeahead
+from cash_flow.commands import check_query_plans, import_csv, verify_ledger, build_balance_snapshots, rebuild_cash_flow_rollups, generate_statements, rebuild_search_index_command, find_duplicate_customers
 
 # Import models
 from auth.models import User, TokenBlocklist, ResetToken
-from cash_flow.models import Account, Transaction, ExpenseCategory, Vendor, VendorContact, Customer, CustomerContact, ProductService, Invoice, Payment, Transfer
+from cash_flow.models.base_model import BaseModel
+from cash_flow.models.serializers import build_serializers
+from cash_flow.models import Account, Transaction, ExpenseCategory, Vendor, VendorContact, Customer, CustomerContact, ProductService, Invoice, Payment, Transfer, Posting, BalanceSnapshot, CashFlowDaily, TableVersion, SearchDocument
 from audit.models import AuditLog
+from notifications.models import OutboxMessage
 
 mail = Mail()
 
@@ -24,33 +36,56 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object('config.Config')
 
-    # Configure logging
-    handler = RotatingFileHandler('app.log', maxBytes=100000, backupCount=3)
-    handler.setLevel(logging.ERROR)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    app.logger.addHandler(handler)
+    # Configure logging. app.logger is shared by every app built in this process, so the
+    # file handler is only added once per log file.
+    log_file = app.config['LOG_FILE']
+    if log_file and not any(getattr(h, 'baseFilename', None) == os.path.abspath(log_file) for h in app.logger.handlers):
+        handler = RotatingFileHandler(log_file, maxBytes=100000, backupCount=3)
+        handler.setLevel(logging.ERROR)
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        app.logger.addHandler(handler)
 
     # Initialize extensions
+    init_json_provider(app)
     db.init_app(app)
     migrate = Migrate(app, db)
     jwt = JWTManager(app)
+    revocation_cache = init_revocation_cache(app)
+    init_blocklist_pruner(app)
+    init_password_hasher(app)
     mail.init_app(app)
+    init_outbox_sender(app, mail)
+    init_list_cache(app)
+    init_typeahead(app)
     CORS(app, resources={r"/*": {"origins": "http://127.0.0.1:5173"}},
      supports_credentials=True,
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-     allow_headers=["Authorization", "Content-Type", "X-Requested-With"])
+     allow_headers=["Authorization", "Content-Type", "X-Requested-With", "If-None-Match"],
+     expose_headers=["ETag"])
 
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(transaction_bp, url_prefix='/transaction')
     app.register_blueprint(cash_flow, url_prefix='/cash_flow')
 
+    # Register CLI commands
+    app.cli.add_command(check_query_plans)
+    app.cli.add_command(import_csv)
+    app.cli.add_command(verify_ledger)
+    app.cli.add_command(build_balance_snapshots)
+    app.cli.add_command(rebuild_cash_flow_rollups)
+    app.cli.add_command(generate_statements)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(find_duplicate_customers)
+
+    # Compile model serializers once instead of on the first request per model
+    build_serializers(BaseModel)
+
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
         jti = jwt_payload["jti"]
-        token = TokenBlocklist.query.filter_by(jti=jti).first()
-        return token is not None
+        return revocation_cache.is_revoked(jti)
 
     @jwt.unauthorized_loader
     def unauthorized_callback(callback):
@@ -0,0 +1,69 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HashPoolSaturated(Exception):
+    """Raised when the password hashing pool has no free slot within the queue timeout."""
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification on a bounded worker pool.
+
+    hashlib's scrypt and pbkdf2 release the GIL, so a small thread pool caps
+    the CPU spent on hashing without blocking unrelated requests. At most
+    `workers + queue_size` hashes may be running or waiting; callers beyond
+    that wait up to `queue_timeout` seconds for a slot and then get
+    HashPoolSaturated, which the views turn into a 503.
+    """
+
+    def __init__(self, method: str, salt_length: int, workers: int, queue_size: int, queue_timeout: float):
+        self.method = method
+        self.salt_length = salt_length
+        # Werkzeug expands defaults into the stored prefix (e.g. "scrypt" -> "scrypt:32768:8:1")
+        self.method_prefix = generate_password_hash('', method, salt_length).partition('$')[0]
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HashPoolSaturated()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured method."""
+        return self._submit(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """Check a password against a stored hash."""
+        return self._submit(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Check whether a stored hash was made with parameters other than the configured ones."""
+        method, _, rest = password_hash.partition('$')
+        salt = rest.partition('$')[0]
+        return method != self.method_prefix or len(salt) != self.salt_length
+
+def init_password_hasher(app) -> PasswordHasher:
+    """Create the password hashing pool for an app from its config."""
+    hasher = PasswordHasher(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        salt_length=app.config['PASSWORD_HASH_SALT_LENGTH'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        queue_size=app.config['PASSWORD_HASH_QUEUE_SIZE'],
+        queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT'],
+    )
+    app.extensions['password_hasher'] = hasher
+    return hasher
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the password hasher of the current app."""
+    return current_app.extensions['password_hasher']
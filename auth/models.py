@@ -1,5 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from auth.hashing import get_password_hasher
 from datetime import datetime
 import uuid
 from extensions import db
@@ -16,10 +16,14 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_password_hasher().hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return get_password_hasher().verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Check whether the stored hash uses outdated hash parameters."""
+        return get_password_hasher().needs_rehash(self.password_hash)
 
     def to_dict(self):
         return {
@@ -32,10 +36,13 @@ class User(db.Model):
 
 class TokenBlocklist(db.Model):
     __tablename__ = 'token_blocklist'
+    # Without AUTOINCREMENT SQLite reuses the ids of pruned rows, and the revocation cache reads new rows by id
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = db.Column(db.Integer, primary_key=True)
     jti = db.Column(db.String(36), nullable=False, unique=True)  # JWT identifier (JTI)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Revocation timestamp
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)  # Token expiry (JWT exp); the row can be pruned after it
 
     def __repr__(self):
         return f"<TokenBlocklist jti={self.jti}>"
@@ -0,0 +1,120 @@
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import delete, select
+from auth.models import db, TokenBlocklist
+
+class BlocklistPruner:
+    """
+    Deletes TokenBlocklist rows whose token has expired, in small chunks.
+
+    Each chunk is its own short transaction so the table is never locked for
+    long. A daemon thread per worker runs a prune every `interval` seconds;
+    prunes can also be run on demand. Throughput counters are kept for the
+    stats endpoint.
+    """
+
+    def __init__(self, app, interval: float, batch_size: int):
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self.total_deleted = 0
+        self.runs = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_run_deleted = 0
+        self.last_run_seconds = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete every expired blocklist row, one chunk of `batch_size` rows per transaction.
+
+        Args:
+            now (Optional[datetime]): Cut-off time, defaults to the current UTC time.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        deleted = 0
+        with self._lock:
+            while True:
+                expired_ids = select(TokenBlocklist.id).where(
+                    TokenBlocklist.expires_at < now
+                ).limit(self.batch_size)
+                result = db.session.execute(
+                    delete(TokenBlocklist).where(TokenBlocklist.id.in_(expired_ids)),
+                    execution_options={"synchronize_session": False},
+                )
+                db.session.commit()
+                deleted += result.rowcount
+                if result.rowcount < self.batch_size:
+                    break
+
+            self.runs += 1
+            self.total_deleted += deleted
+            self.last_run_at = now
+            self.last_run_deleted = deleted
+            self.last_run_seconds = time.perf_counter() - started
+        return deleted
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    self.prune()
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Token blocklist prune failed: {e}")
+
+    def start(self):
+        """Start the background prune thread once per worker."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='blocklist-pruner', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        """Return table size and prune throughput."""
+        now = datetime.utcnow()
+        rows = db.session.query(db.func.count(TokenBlocklist.id)).scalar()
+        expired_rows = db.session.query(db.func.count(TokenBlocklist.id)) \
+            .filter(TokenBlocklist.expires_at < now).scalar()
+        return {
+            "rows": rows,
+            "expired_rows": expired_rows,
+            "prune_interval_seconds": self.interval,
+            "prune_batch_size": self.batch_size,
+            "prune_runs": self.runs,
+            "total_deleted": self.total_deleted,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_deleted": self.last_run_deleted,
+            "last_run_seconds": round(self.last_run_seconds, 6),
+            "last_run_rows_per_second": round(self.last_run_deleted / self.last_run_seconds, 1)
+            if self.last_run_seconds else 0.0,
+        }
+
+def init_blocklist_pruner(app) -> BlocklistPruner:
+    """Create the blocklist pruner for an app and start it with the first request."""
+    pruner = BlocklistPruner(app, app.config['BLOCKLIST_PRUNE_INTERVAL'], app.config['BLOCKLIST_PRUNE_BATCH_SIZE'])
+    app.extensions['blocklist_pruner'] = pruner
+
+    # Started lazily so CLI commands such as `flask db upgrade` never spawn the thread
+    @app.before_request
+    def start_blocklist_pruner():
+        pruner.start()
+
+    return pruner
+
+def get_blocklist_pruner() -> BlocklistPruner:
+    """Return the blocklist pruner of the current app."""
+    return current_app.extensions['blocklist_pruner']
@@ -0,0 +1,97 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from flask import current_app
+from sqlalchemy import func, or_
+from auth.models import TokenBlocklist
+
+class RevocationCache:
+    """
+    Per-worker cache of revoked JWT identifiers (JTIs).
+
+    The cache holds every JTI whose token has not expired yet, together with
+    its expiry, after which the token would be rejected anyway.
+    It is refreshed incrementally by reading only TokenBlocklist rows with an
+    id above the last one seen, at most once every `max_staleness` seconds,
+    so lookups between refreshes never touch the database.
+    """
+
+    def __init__(self, max_staleness: float, token_lifetime: Optional[timedelta]):
+        self.max_staleness = max_staleness
+        self.token_lifetime = token_lifetime
+        self._revoked: Dict[str, Optional[datetime]] = {}
+        self._watermark = 0
+        self._last_refresh = None
+        self._lock = threading.Lock()
+
+    def _expiry_for(self, revoked_at: Optional[datetime]) -> Optional[datetime]:
+        """Return the time after which a token revoked at `revoked_at` has expired on its own."""
+        if self.token_lifetime is None or revoked_at is None:
+            return None
+        return revoked_at + self.token_lifetime
+
+    def _load(self):
+        """Read blocklist rows added since the watermark and drop expired entries."""
+        query = TokenBlocklist.query.with_entities(
+            TokenBlocklist.id, TokenBlocklist.jti, TokenBlocklist.created_at, TokenBlocklist.expires_at
+        )
+        if self._last_refresh is None:
+            # Expired tokens cannot be presented any more, so only live revocations are loaded
+            self._watermark = TokenBlocklist.query.with_entities(func.max(TokenBlocklist.id)).scalar() or 0
+            query = query.filter(or_(
+                TokenBlocklist.expires_at >= datetime.utcnow(),
+                TokenBlocklist.expires_at.is_(None),
+            ))
+        else:
+            query = query.filter(TokenBlocklist.id > self._watermark)
+
+        for row_id, jti, created_at, expires_at in query.order_by(TokenBlocklist.id):
+            self._revoked[jti] = expires_at or self._expiry_for(created_at)
+            self._watermark = max(self._watermark, row_id)
+
+        now = datetime.utcnow()
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at is not None and expires_at < now]:
+            del self._revoked[jti]
+
+    def refresh(self, force: bool = False):
+        """Refresh the cache if it is older than max_staleness (or always, when forced)."""
+        if not force and self._last_refresh is not None \
+                and time.monotonic() - self._last_refresh < self.max_staleness:
+            return
+        with self._lock:
+            if not force and self._last_refresh is not None \
+                    and time.monotonic() - self._last_refresh < self.max_staleness:
+                return
+            self._load()
+            self._last_refresh = time.monotonic()
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check whether a JTI has been revoked, refreshing the cache first if it is stale."""
+        self.refresh()
+        return jti in self._revoked
+
+    def add(self, jti: str, expires_at: Optional[datetime] = None):
+        """Record a revocation made by this worker so it takes effect immediately."""
+        with self._lock:
+            self._revoked[jti] = expires_at or self._expiry_for(datetime.utcnow())
+
+    def __len__(self):
+        return len(self._revoked)
+
+def init_revocation_cache(app) -> RevocationCache:
+    """Create the revocation cache for an app from its config."""
+    token_lifetime = app.config.get('JWT_ACCESS_TOKEN_EXPIRES', timedelta(minutes=15))
+    if token_lifetime is False:
+        token_lifetime = None
+    elif not isinstance(token_lifetime, timedelta):
+        token_lifetime = timedelta(seconds=token_lifetime)
+
+    cache = RevocationCache(app.config['REVOCATION_CACHE_MAX_STALENESS'], token_lifetime)
+    app.extensions['revocation_cache'] = cache
+    return cache
+
+def get_revocation_cache() -> RevocationCache:
+    """Return the revocation cache of the current app."""
+    return current_app.extensions['revocation_cache']
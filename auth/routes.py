@@ -10,14 +10,22 @@ from flask_jwt_extended import (
 )
 from auth.models import User, db, TokenBlocklist, ResetToken
 from auth.utils import roles_required, is_strong_password
+from auth.revocation import get_revocation_cache
+from auth.pruning import get_blocklist_pruner
+from auth.hashing import HashPoolSaturated
+from notifications.outbox import enqueue_mail, get_outbox_sender
 from auth import auth_bp
 import uuid
-from flask_mail import Mail, Message
 from datetime import timedelta, datetime
 
 # In-memory store for revoked tokens (for simplicity)
 revoked_tokens = set()
-mail = Mail()
+
+def hashing_busy_response():
+    """Response returned when the password hashing pool is saturated."""
+    response = jsonify({"msg": "Server is busy, please try again shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -43,7 +51,10 @@ def register():
         return jsonify({"msg": message}), 400
 
     new_user = User(username=username, email=email, role=role)
-    new_user.set_password(password)
+    try:
+        new_user.set_password(password)
+    except HashPoolSaturated:
+        return hashing_busy_response()
 
     try:
         db.session.add(new_user)
@@ -64,8 +75,16 @@ def login():
 
     user = User.query.filter_by(username=username).first()
 
-    if not user or not user.check_password(password):
-        return jsonify({"msg": "Invalid credentials"}), 401
+    try:
+        if not user or not user.check_password(password):
+            return jsonify({"msg": "Invalid credentials"}), 401
+
+        # Transparently upgrade hashes made with outdated parameters
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+    except HashPoolSaturated:
+        return hashing_busy_response()
 
     identity = {
         "user_id": user.id,
@@ -94,12 +113,17 @@ def refresh():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    jti = get_jwt()["jti"]  # Get the token's JTI
-    # Save the revoked token to the database
-    revoked_token = TokenBlocklist(jti=jti)
+    token = get_jwt()
+    jti = token["jti"]  # Get the token's JTI
+    expires_at = datetime.utcfromtimestamp(token["exp"]) if "exp" in token else None
+    # Save the revoked token to the database, with its expiry so it can be pruned later
+    revoked_token = TokenBlocklist(jti=jti, expires_at=expires_at)
     db.session.add(revoked_token)
     db.session.commit()
 
+    # Reject the token on this worker right away, other workers pick it up on their next refresh
+    get_revocation_cache().add(jti, expires_at)
+
     return jsonify({"msg": "Access token revoked"}), 200
 
 
@@ -163,19 +187,18 @@ def request_password_reset():
     # Store the token in the database
     reset_token = ResetToken(token=token, user_id=user.id)
     db.session.add(reset_token)
-    db.session.commit()
 
     # Create the reset URL (point to the frontend)
     reset_url = f"http://127.0.0.1:5173/reset-password/{token}"  # Frontend route
 
-    # Send the reset email
-    msg = Message(
+    # Queue the reset email in the same transaction; the outbox sender delivers it
+    enqueue_mail(
         'Password Reset Request',
-        recipients=[user.email]
+        recipients=[user.email],
+        body=f"Hi {user.username},\nClick the link below to reset your password:\n{reset_url}"
     )
-    msg.body = f"Hi {user.username},\nClick the link below to reset your password:\n{reset_url}"
-
-    mail.send(msg)
+    db.session.commit()
+    get_outbox_sender().wake()
 
     return jsonify({"msg": "Password reset email sent"}), 200
 
@@ -218,6 +241,8 @@ def reset_password(token):
         db.session.commit()
         return jsonify({"msg": "Password updated successfully"}), 200
 
+    except HashPoolSaturated:
+        return hashing_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({"msg": f"Error updating password: {str(e)}"}), 500
@@ -227,8 +252,25 @@ def reset_password(token):
 @jwt_required()
 @roles_required('admin')
 def cleanup_tokens():
-    """Remove tokens older than 30 days."""
+    """Remove reset tokens older than 30 days and expired blocklist entries."""
     cutoff_date = datetime.utcnow() - timedelta(days=30)
     ResetToken.query.filter(ResetToken.created_at < cutoff_date).delete()
     db.session.commit()
-    return jsonify({"msg": "Old tokens cleaned up"}), 200
+    pruned = get_blocklist_pruner().prune()
+    return jsonify({"msg": "Old tokens cleaned up", "blocklist_pruned": pruned}), 200
+
+
+@auth_bp.route('/admin/mail-outbox-stats', methods=['GET'])
+@jwt_required()
+@roles_required('admin')
+def mail_outbox_stats():
+    """Report mail outbox queue depth and send counters."""
+    return jsonify(get_outbox_sender().stats()), 200
+
+
+@auth_bp.route('/admin/blocklist-stats', methods=['GET'])
+@jwt_required()
+@roles_required('admin')
+def blocklist_stats():
+    """Report token blocklist size and prune throughput."""
+    return jsonify(get_blocklist_pruner().stats()), 200
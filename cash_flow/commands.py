@@ -0,0 +1,269 @@
+import json
+import sys
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import or_
+
+from extensions import db
+from cash_flow.models import (
+    Account, Customer, CustomerContact, Vendor, VendorContact, ProductService, Invoice, Payment, Transfer, Posting,
+    CashFlowDaily,
+)
+from cash_flow.views.pagination import keyset_query, list_etag_statement
+from cash_flow.views.changes_view import CHANGE_TYPES, changed_rows_query
+from cash_flow.importer import CsvImporter, IMPORT_SPECS
+from cash_flow.models.ledger import verify_balances
+from cash_flow.models.snapshots import balances_as_of_statement, build_snapshots, verify_snapshots
+from cash_flow.models.rollups import cash_flow_report_statement, rebuild_rollups, verify_rollups
+from cash_flow.models.aging import latest_invoice_statement, receivables_aging_statement
+from cash_flow.models.search import rebuild_search_index
+from cash_flow.statements import STATEMENT_FORMATS, statement_lines, write_statements
+from cash_flow.duplicates import active_customer_records, find_duplicates
+
+# Models served by the paginated list views
+LIST_MODELS = [Account, Customer, CustomerContact, Vendor, VendorContact, ProductService, Invoice, Payment, Transfer]
+
+# Changes feed type of each listed model
+CHANGE_TYPE_NAMES = {model: change_type for change_type, model in CHANGE_TYPES.items()}
+
+def planned_queries():
+    """
+    Build the hot statements of the cash_flow views and reports with the same functions that run them.
+
+    Returns:
+        List[Tuple[str, Select, Tuple[str, ...], bool]]: (label, statement, indexes its plan must use,
+        whether it may sort rows in a temporary b-tree) per statement. Only reports may sort, after an
+        index has narrowed their rows.
+    """
+    after = (datetime.utcnow(), '')
+    today = datetime.utcnow().date()
+    queries = []
+    for model in LIST_MODELS:
+        active = model.query.filter(model.deleted_at.is_(None))
+        name = model.__tablename__
+        list_index = f'ix_{name}_active_created_at'
+        updated_index = f'ix_{name}_updated_at'
+        queries.append((f'{name}: first page', keyset_query(active, model).limit(51), (list_index,), False))
+        queries.append((f'{name}: next page', keyset_query(active, model, after).limit(51), (list_index,), False))
+        queries.append((
+            f'{name}: restore lookup', model.query.filter(model.id == '', model.deleted_at.isnot(None)), (), False,
+        ))
+        queries.append((f'{name}: etag watermark', list_etag_statement(model), (updated_index,), False))
+        change_type = CHANGE_TYPE_NAMES[model]
+        queries.append((
+            f'{name}: changes since the start', changed_rows_query(change_type, None, datetime.utcnow(), 51),
+            (updated_index,), False,
+        ))
+        for after_type in sorted({min(CHANGE_TYPES), change_type, max(CHANGE_TYPES)}):
+            queries.append((
+                f'{name}: changes after a {after_type} row',
+                changed_rows_query(change_type, (datetime.utcnow(), after_type, ''), datetime.utcnow(), 51),
+                (updated_index,), False,
+            ))
+
+    queries.extend([
+        ('payments by invoice', Payment.query.filter(Payment.invoice_id == '', Payment.deleted_at.is_(None)), (), False),
+        ('payments by account', Payment.query.filter(Payment.account_id == ''), (), False),
+        ('invoices by customer', Invoice.query.filter(Invoice.customer_id == '', Invoice.deleted_at.is_(None)), (), False),
+        ('contacts by customer', CustomerContact.query.filter(CustomerContact.customer_id == ''), (), False),
+        ('contacts by vendor', VendorContact.query.filter(VendorContact.vendor_id == ''), (), False),
+        ('transfers by account', Transfer.query.filter(
+            or_(Transfer.from_account_id == '', Transfer.to_account_id == '')
+        ), (), False),
+        ('postings by source', Posting.query.filter(Posting.source_type == '', Posting.source_id == ''), (), False),
+        ('postings by account', Posting.query.filter(Posting.account_id == ''), (), False),
+        ('aging: latest invoice', latest_invoice_statement(), ('ix_invoices_active_created_at',), False),
+        ('aging: as of today', receivables_aging_statement(today, newer_invoices=False),
+         ('ix_invoices_aging', 'ix_payments_payment_date'), True),
+        ('aging: as of an earlier day', receivables_aging_statement(today, newer_invoices=True),
+         ('ix_invoices_aging', 'ix_payments_payment_date'), True),
+        # Served by ix_invoices_customer_id or the customer prefix of ix_invoices_aging, depending on statistics
+        ('aging: one customer', receivables_aging_statement(today, [''], newer_invoices=False),
+         ('ix_payments_payment_date',), True),
+        ('balances as of a day', balances_as_of_statement(today), ('ix_postings_account_effective_date',), True),
+        ('balance of one account as of a day', balances_as_of_statement(today, ['']),
+         ('ix_postings_account_effective_date',), True),
+        ('statement lines of one customer', statement_lines(today, today, None, None, ''),
+         ('ix_invoices_customer_id', 'ix_payments_invoice_id'), True),
+        ('statement lines of a customer range', statement_lines(today, today, '', '', None),
+         ('ix_invoices_active_created_at', 'ix_payments_payment_date'), True),
+    ])
+    for group_by in ([], ['day'], ['month', 'account'], ['category', 'type']):
+        queries.append((
+            f"cash flow report by {', '.join(group_by) or 'nothing'}",
+            cash_flow_report_statement(db.engine.dialect.name, today, today, group_by), (), True,
+        ))
+    return queries
+
+def explain(statement):
+    """
+    Return the SQLite EXPLAIN QUERY PLAN detail lines for a query or Core statement.
+
+    Args:
+        statement (Union[Query, Select]): The statement to explain.
+
+    Returns:
+        List[str]: One detail string per plan step.
+    """
+    statement = getattr(statement, 'statement', statement)
+    compiled = statement.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(None for _ in (compiled.positiontup or ()))
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).fetchall()
+    return [row[-1] for row in rows]
+
+def plan_problems(details, indexes=(), sorts=False):
+    """Return the plan steps that scan a whole table or (unless `sorts`) sort outside an index, and the expected indexes left unused."""
+    tables = set(db.metadata.tables)
+    problems = [
+        detail for detail in details
+        if (detail.startswith('SCAN ') and detail.split()[1] in tables and ' USING ' not in detail)
+        or (not sorts and 'TEMP B-TREE' in detail)
+    ]
+    plan = ' '.join(details)
+    problems.extend(f'{index} not used' for index in indexes if f' {index}' not in plan)
+    return problems
+
+@click.command('check-query-plans')
+@with_appcontext
+def check_query_plans():
+    """Fail if any list or lookup query falls back to a full table scan."""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo('Query plan check only supports SQLite.')
+        sys.exit(2)
+
+    failures = 0
+    for label, statement, indexes, sorts in planned_queries():
+        problems = plan_problems(explain(statement), indexes, sorts)
+        if problems:
+            failures += 1
+            click.echo(f'FAIL {label}: {"; ".join(problems)}')
+        else:
+            click.echo(f'ok   {label}')
+
+    if failures:
+        click.echo(f'{failures} queries are not served by an index.')
+        sys.exit(1)
+
+@click.command('import')
+@click.argument('kind', type=click.Choice(sorted(IMPORT_SPECS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--chunk-size', default=5000, show_default=True, help='Rows inserted per transaction.')
+@click.option('--rejects', 'rejects_path', type=click.Path(dir_okay=False), help='CSV for rejected rows [default: PATH.rejects.csv].')
+@click.option('--resume/--restart', default=True, show_default=True, help='Continue after the last committed chunk of an interrupted run.')
+@with_appcontext
+def import_csv(kind, path, chunk_size, rejects_path, resume):
+    """Bulk load customers, vendors or products from a CSV file."""
+    importer = CsvImporter(db.engine, kind, path, chunk_size, rejects_path=rejects_path)
+    rows_done = importer.read_checkpoint()['rows_done']
+    if resume and rows_done:
+        click.echo(f'Resuming after row {rows_done}.')
+    stats = importer.run(resume=resume, progress=click.echo)
+    click.echo(
+        f"Imported {stats['inserted']} {kind}, rejected {stats['rejected']}, skipped {stats['skipped']} "
+        f"in {stats['elapsed']:.1f}s ({stats['rows_per_second']:.0f} rows/s)."
+    )
+    if stats['rejected']:
+        click.echo(f'Rejected rows written to {importer.rejects_path}.')
+
+@click.command('verify-ledger')
+@with_appcontext
+def verify_ledger():
+    """Fail if any cached balance, latest snapshot or cash-flow rollup differs from its postings or any entry is unbalanced."""
+    with db.engine.connect() as connection:
+        problems = verify_balances(connection) + verify_snapshots(connection) + verify_rollups(connection)
+    for problem in problems:
+        click.echo(f'FAIL {problem}')
+    if problems:
+        click.echo(f'{len(problems)} ledger problems found.')
+        sys.exit(1)
+    click.echo('Ledger is consistent.')
+
+@click.command('build-balance-snapshots')
+@click.option('--through', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day to snapshot [default: yesterday].')
+@click.option('--interval', type=click.Choice(['daily', 'monthly']), help='Snapshot interval [default: BALANCE_SNAPSHOT_INTERVAL].')
+@with_appcontext
+def build_balance_snapshots(through, interval):
+    """Snapshot every account balance at each period end since the last snapshot."""
+    through = through.date() if through else datetime.utcnow().date() - timedelta(days=1)
+    interval = interval or current_app.config['BALANCE_SNAPSHOT_INTERVAL']
+    with db.engine.connect() as connection:
+        written = build_snapshots(connection, through, interval)
+        connection.commit()
+    click.echo(f'Wrote {written} {interval} balance snapshots through {through.isoformat()}.')
+
+@click.command('rebuild-cash-flow-rollups')
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), help='First day to rebuild [default: all history].')
+@with_appcontext
+def rebuild_cash_flow_rollups(start):
+    """Rebuild the daily cash-flow rollups from the postings ledger."""
+    start = start.date() if start else None
+    with db.engine.connect() as connection:
+        written = rebuild_rollups(connection, start)
+        connection.commit()
+    since = f' from {start.isoformat()}' if start else ''
+    click.echo(f'Wrote {written} daily cash-flow rollups{since}.')
+
+@click.command('generate-statements')
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), help='First day of the period [default: first day of last month].')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day of the period [default: last day of last month].')
+@click.option('--format', 'fmt', type=click.Choice(STATEMENT_FORMATS), default='json', show_default=True)
+@click.option('--out', 'out_dir', type=click.Path(file_okay=False), default='statements', show_default=True, help='Directory for the statement files.')
+@click.option('--workers', type=int, help='Worker processes [default: STATEMENT_WORKERS].')
+@with_appcontext
+def generate_statements(start, end, fmt, out_dir, workers):
+    """Write the statement of every customer for a period, one file per worker."""
+    first_of_month = datetime.utcnow().date().replace(day=1)
+    end = end.date() if end else first_of_month - timedelta(days=1)
+    start = start.date() if start else end.replace(day=1)
+    if start > end:
+        raise click.BadParameter('--from must not be after --to')
+    workers = workers or current_app.config['STATEMENT_WORKERS']
+    started = datetime.utcnow()
+    parts = write_statements(
+        # The engine URL has relative SQLite paths resolved against the instance folder
+        db.engine.url.render_as_string(hide_password=False), out_dir, start, end, fmt,
+        workers, current_app.config['STREAM_BATCH_SIZE'],
+    )
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    for path, written in parts:
+        click.echo(f'{path}: {written} statements')
+    click.echo(f'Wrote {sum(written for _, written in parts)} statements for {start.isoformat()} to {end.isoformat()} in {elapsed:.1f}s.')
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Rebuild the full-text search index of customers, vendors, contacts and products."""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo('The search index only supports SQLite.')
+        sys.exit(2)
+    started = datetime.utcnow()
+    with db.engine.connect() as connection:
+        indexed = rebuild_search_index(connection)
+        connection.commit()
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    click.echo(f'Indexed {indexed} rows in {elapsed:.1f}s.')
+
+@click.command('find-duplicate-customers')
+@click.option('--out', 'out_path', type=click.Path(dir_okay=False), default='duplicate-customers.json', show_default=True, help='JSON file for the merge proposals.')
+@click.option('--min-score', type=click.FloatRange(0, 1), help='Lowest pair score to propose [default: DUPLICATE_MIN_SCORE].')
+@click.option('--max-block-size', type=click.IntRange(min=2), help='Largest bucket of customers compared pairwise [default: DUPLICATE_MAX_BLOCK_SIZE].')
+@with_appcontext
+def find_duplicate_customers(out_path, min_score, max_block_size):
+    """Propose merges of active customers that look like the same person."""
+    min_score = current_app.config['DUPLICATE_MIN_SCORE'] if min_score is None else min_score
+    max_block_size = max_block_size or current_app.config['DUPLICATE_MAX_BLOCK_SIZE']
+    started = datetime.utcnow()
+    with db.engine.connect() as connection:
+        proposals, stats = find_duplicates(active_customer_records(connection), min_score, max_block_size)
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    with open(out_path, 'w', encoding='utf-8') as out:
+        json.dump({'generated_at': started.isoformat(), 'min_score': min_score, 'stats': stats, 'proposals': proposals}, out, indent=2)
+    click.echo(
+        f"Compared {stats['pairs_compared']} pairs in {stats['blocks']} blocks of {stats['customers']} customers "
+        f"in {elapsed:.1f}s; skipped {stats['skipped_blocks']} blocks larger than {max_block_size}."
+    )
+    click.echo(f"Wrote {stats['proposals']} merge proposals to {out_path}.")
@@ -0,0 +1,270 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from cash_flow.models import Customer, CustomerContact, Invoice
+from cash_flow.typeahead import normalize_name
+
+# American Soundex digit of each consonant; vowels, h, w and y have none
+_SOUNDEX_CODES = {
+    letter: digit
+    for letters, digit in (('bfpv', '1'), ('cgjkqsxz', '2'), ('dt', '3'), ('l', '4'), ('mn', '5'), ('r', '6'))
+    for letter in letters
+}
+
+# Phone numbers are compared on their last digits, so a country or trunk prefix does not matter
+PHONE_DIGITS = 10
+MIN_PHONE_DIGITS = 7
+
+# Weight of each field in a pair's score; fields missing on either side are left out
+SCORE_WEIGHTS = {'name': 0.5, 'email': 0.25, 'phone': 0.25}
+
+@lru_cache(maxsize=65536)
+def soundex(word: str) -> str:
+    """Return the four-character American Soundex code of a word, or '' if it has no letters."""
+    letters = [ch for ch in normalize_name(word) if 'a' <= ch <= 'z']
+    if not letters:
+        return ''
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate consonants with the same code; vowels do
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+class CustomerRecord:
+    """The fields of a customer that duplicate detection compares, normalized once."""
+
+    __slots__ = ('id', 'created_at', 'first_name', 'last_name', 'name', 'letters', 'email', 'phone')
+
+    def __init__(self, row):
+        self.id = row.id
+        self.created_at = row.created_at
+        self.first_name = normalize_name(row.first_name)
+        self.last_name = normalize_name(row.last_name)
+        self.name = f'{self.first_name} {self.last_name}'
+        self.letters = Counter(self.name)
+        self.email = row.email_norm
+        self.phone = row.phone_norm[-PHONE_DIGITS:] if row.phone_norm and len(row.phone_norm) >= MIN_PHONE_DIGITS else None
+
+    def blocking_keys(self) -> List[str]:
+        """
+        Return the keys under which this customer is compared with others.
+
+        Only customers sharing a key are scored, so a misspelt name is still
+        caught through the phone, and a reformatted phone through the name.
+        """
+        keys = []
+        if self.phone:
+            keys.append(f'phone:{self.phone}')
+        if self.email and '@' in self.email:
+            keys.append(f"email:{self.email.rsplit('@', 1)[1]}:{self.last_name}")
+        codes = sorted((soundex(self.first_name), soundex(self.last_name)))
+        if all(codes):
+            # Sorted so first and last name entered the wrong way round share the key
+            keys.append(f"name:{':'.join(codes)}")
+        return keys
+
+    def to_dict(self) -> dict:
+        return {'id': self.id, 'name': self.name, 'email': self.email, 'phone': self.phone,
+                'created_at': self.created_at.isoformat() if self.created_at else None}
+
+def _similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+def _email_similarity(a: str, b: str) -> float:
+    """Compare the local parts of addresses at the same domain, and whole addresses otherwise."""
+    local_a, _, domain_a = a.rpartition('@')
+    local_b, _, domain_b = b.rpartition('@')
+    if domain_a == domain_b:
+        return _similarity(local_a, local_b)
+    return _similarity(a, b)
+
+def _length_bound(a: str, b: str) -> float:
+    """Upper bound of the similarity of two strings from their lengths alone."""
+    return 2.0 * min(len(a), len(b)) / (len(a) + len(b)) if a or b else 1.0
+
+def score_pair(a: CustomerRecord, b: CustomerRecord, min_score: float = 0.0) -> float:
+    """
+    Score how likely two customers are the same person, from 0 to 1.
+
+    The name counts whichever way round first and last name were entered;
+    phones count fully when their last digits match. Fields are scored
+    cheapest first, and once the pair cannot reach `min_score` the rest
+    are skipped and a score below it is returned.
+    """
+    has_email = bool(a.email and b.email)
+    has_phone = bool(a.phone and b.phone)
+    weights = SCORE_WEIGHTS['name'] + has_email * SCORE_WEIGHTS['email'] + has_phone * SCORE_WEIGHTS['phone']
+    needed = min_score * weights
+
+    # Exact matches cost nothing; the upper bounds of the other fields decide whether scoring goes on
+    total = 0.0
+    # Matching blocks cannot pair more characters than the names have in common, in either order
+    name_bound = 2.0 * sum((a.letters & b.letters).values()) / (len(a.name) + len(b.name))
+    email_bound = phone_bound = 0.0
+    if has_email:
+        email_bound = 1.0 if a.email == b.email else _length_bound(a.email, b.email)
+    if has_phone:
+        phone_bound = 1.0 if a.phone == b.phone else _length_bound(a.phone, b.phone)
+    remaining = (SCORE_WEIGHTS['name'] * name_bound + SCORE_WEIGHTS['email'] * email_bound
+                 + SCORE_WEIGHTS['phone'] * phone_bound)
+    if remaining < needed:
+        return remaining / weights
+
+    name = max(_similarity(a.name, b.name), _similarity(a.name, f'{b.last_name} {b.first_name}'))
+    total += SCORE_WEIGHTS['name'] * name
+    remaining -= SCORE_WEIGHTS['name'] * name_bound
+    if has_phone:
+        if total + remaining < needed:
+            return (total + remaining) / weights
+        phone = 1.0 if a.phone == b.phone else _similarity(a.phone, b.phone)
+        total += SCORE_WEIGHTS['phone'] * phone
+        remaining -= SCORE_WEIGHTS['phone'] * phone_bound
+    if has_email:
+        if total + remaining < needed:
+            return (total + remaining) / weights
+        total += SCORE_WEIGHTS['email'] * (1.0 if a.email == b.email else _email_similarity(a.email, b.email))
+    return total / weights
+
+def find_duplicates(records: Iterable[CustomerRecord], min_score: float, max_block_size: int) -> Tuple[List[dict], dict]:
+    """
+    Group customers that are likely the same person into merge proposals.
+
+    Customers are bucketed by their blocking keys and only pairs within a
+    bucket are scored, so the work grows with the bucket sizes rather than
+    with the square of the number of customers. Buckets larger than
+    `max_block_size` (a common surname at a webmail domain) are skipped,
+    as they are too broad to point at duplicates. Pairs scoring at least
+    `min_score` are joined into groups; the oldest customer of a group is
+    the one to keep.
+
+    Args:
+        records (Iterable[CustomerRecord]): Active customers, oldest first.
+        min_score (float): Lowest score_pair of a proposed pair.
+        max_block_size (int): Largest bucket whose pairs are scored.
+
+    Returns:
+        Tuple[List[dict], dict]: Proposals (keep and duplicates, each duplicate with its best
+        score and the keys it matched on), highest scoring first, and counts of the work done.
+    """
+    records = list(records)
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for position, record in enumerate(records):
+        for key in record.blocking_keys():
+            blocks[key].append(position)
+
+    stats = {'customers': len(records), 'blocks': 0, 'skipped_blocks': 0, 'pairs_compared': 0, 'pairs_matched': 0}
+    compared = set()
+    # Best (score, partner) of each matched customer, and the kinds of key each matched pair shares
+    best: Dict[int, Tuple[float, int]] = {}
+    pair_keys: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+    parent = list(range(len(records)))
+
+    def root(position: int) -> int:
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if len(members) > max_block_size:
+            stats['skipped_blocks'] += 1
+            continue
+        stats['blocks'] += 1
+        kind = key.split(':', 1)[0]
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pair = (first, second)
+                if pair in pair_keys:
+                    pair_keys[pair].append(kind)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                stats['pairs_compared'] += 1
+                score = score_pair(records[first], records[second], min_score)
+                if score < min_score:
+                    continue
+                stats['pairs_matched'] += 1
+                pair_keys[pair].append(kind)
+                for position, partner in ((first, second), (second, first)):
+                    if position not in best or score > best[position][0]:
+                        best[position] = (score, partner)
+                # Members are in age order, so the smaller position is the older customer and becomes the root
+                parent[max(root(first), root(second))] = min(root(first), root(second))
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for position in best:
+        groups[root(position)].append(position)
+
+    proposals = []
+    for keep, members in groups.items():
+        duplicates = []
+        for position in sorted(members):
+            if position == keep:
+                continue
+            score, partner = best[position]
+            duplicates.append({
+                **records[position].to_dict(),
+                'score': round(score, 3),
+                'matched_on': sorted(set(pair_keys[(min(position, partner), max(position, partner))])),
+            })
+        proposals.append({'keep': records[keep].to_dict(), 'duplicates': duplicates})
+    proposals.sort(key=lambda proposal: -max(duplicate['score'] for duplicate in proposal['duplicates']))
+    stats['proposals'] = len(proposals)
+    return proposals, stats
+
+def active_customer_records(connection, batch_size: int = 5000) -> Iterable[CustomerRecord]:
+    """Stream every active customer as a CustomerRecord, oldest first."""
+    customers = Customer.__table__
+    rows = connection.execution_options(yield_per=batch_size).execute(
+        select(customers.c.id, customers.c.created_at, customers.c.first_name, customers.c.last_name,
+               customers.c.email_norm, customers.c.phone_norm)
+        .where(customers.c.deleted_at.is_(None))
+        .order_by(customers.c.created_at, customers.c.id)
+    )
+    return (CustomerRecord(row) for row in rows)
+
+def merge_customers(connection, keep_id: str, duplicate_ids: List[str], now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Move the invoices and contacts of duplicate customers to the one kept, and soft delete the duplicates.
+
+    Each table is changed by one UPDATE, whatever the number of rows, and
+    updated_at is set so list ETags and the changes feed pick up the moves.
+    The caller validates the ids and commits, so the merge is all or nothing.
+
+    Args:
+        connection: The connection of the current transaction.
+        keep_id (str): The customer that remains.
+        duplicate_ids (List[str]): Customers merged into it.
+        now (Optional[datetime]): Time recorded as updated_at and deleted_at.
+
+    Returns:
+        Dict[str, int]: Invoices, contacts and customers changed.
+    """
+    now = now or datetime.utcnow()
+    invoices = Invoice.__table__
+    contacts = CustomerContact.__table__
+    customers = Customer.__table__
+    moved_invoices = connection.execute(
+        update(invoices).where(invoices.c.customer_id.in_(duplicate_ids)).values(customer_id=keep_id, updated_at=now)
+    ).rowcount
+    moved_contacts = connection.execute(
+        update(contacts).where(contacts.c.customer_id.in_(duplicate_ids)).values(customer_id=keep_id, updated_at=now)
+    ).rowcount
+    merged = connection.execute(
+        update(customers).where(customers.c.id.in_(duplicate_ids), customers.c.deleted_at.is_(None))
+        .values(deleted_at=now, updated_at=now)
+    ).rowcount
+    return {'invoices': moved_invoices, 'contacts': moved_contacts, 'customers': merged}
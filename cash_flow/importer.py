@@ -0,0 +1,244 @@
+import csv
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from sqlalchemy import insert, select
+from cash_flow.models import Customer, Vendor, ProductService
+from cash_flow.utils import normalize_email, normalize_phone
+from cash_flow.views.utils import (
+    CustomerCreateSchema, VendorCreateSchema, ProductServiceCreateSchema, validate_batch_with_pydantic
+)
+
+# Connection settings for the duration of an import. synchronous=OFF only risks
+# the last commits on an OS crash or power loss; an interrupted import is resumed.
+BULK_LOAD_PRAGMAS = {
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': '-200000',
+}
+
+class UniqueField(NamedTuple):
+    field: str
+    column: object
+    normalize: Callable
+    message: str
+
+class ImportSpec(NamedTuple):
+    model: Type
+    schema: Type
+    unique: Tuple[UniqueField, ...]
+    derived: Dict[str, Tuple[str, Callable]] = {}
+
+def _contact_unique(model) -> Tuple[UniqueField, ...]:
+    return (
+        UniqueField('email', model.email_norm, normalize_email, 'Email is already registered'),
+        UniqueField('phone', model.phone_norm, normalize_phone, 'Phone Number is already registered'),
+    )
+
+_CONTACT_DERIVED = {'email_norm': ('email', normalize_email), 'phone_norm': ('phone', normalize_phone)}
+
+IMPORT_SPECS = {
+    'customers': ImportSpec(Customer, CustomerCreateSchema, _contact_unique(Customer), _CONTACT_DERIVED),
+    'vendors': ImportSpec(Vendor, VendorCreateSchema, _contact_unique(Vendor), _CONTACT_DERIVED),
+    'products': ImportSpec(ProductService, ProductServiceCreateSchema, (
+        UniqueField('name', ProductService.name, lambda value: value, 'Name is already registered'),
+    )),
+}
+
+class CsvImporter:
+    """
+    Streams a CSV file into one table in large chunks.
+
+    Rows are stripped (empty cells become None), validated a chunk at a time
+    with the create schema of the model and deduplicated against in-memory
+    sets of the unique values already in the table, loaded once at start.
+    Rejected rows go to a side CSV with their line number and error.
+
+    Every chunk is inserted with executemany and committed, and a JSON
+    checkpoint file records the rows consumed and the size of the rejects
+    file at that point. Before the commit the checkpoint also records the
+    chunk as pending, with the id of one of its rows. Re-running with
+    resume counts a pending chunk as done if that row exists, cuts the
+    rejects file back to the recorded size and picks up after the last
+    committed chunk, so a crash at any point neither inserts a row twice
+    nor repeats a reject line.
+    """
+
+    def __init__(self, engine, kind: str, path: str, chunk_size: int,
+                 rejects_path: Optional[str] = None, checkpoint_path: Optional[str] = None):
+        self.engine = engine
+        self.spec = IMPORT_SPECS[kind]
+        self.path = path
+        self.chunk_size = chunk_size
+        self.rejects_path = rejects_path or f'{path}.rejects.csv'
+        self.checkpoint_path = checkpoint_path or f'{path}.checkpoint'
+        self.inserted = 0
+        self.rejected = 0
+        self.skipped = 0
+
+    def read_checkpoint(self) -> Dict[str, int]:
+        """
+        Return where a previous run of this file stopped.
+
+        Returns:
+            Dict[str, int]: rows_done, the data rows committed, and rejects_offset, the size of the
+            rejects file after their rejects; both 0 when there is nothing to resume.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return {'rows_done': 0, 'rejects_offset': 0}
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        pending = checkpoint.pop('pending', None)
+        # The run died after writing the pending chunk; it counts if its commit went through
+        if pending and pending['probe_id'] is not None:
+            with self.engine.connect() as connection:
+                model = self.spec.model
+                if connection.execute(select(model.id).where(model.id == pending['probe_id'])).first():
+                    return {'rows_done': pending['rows_done'], 'rejects_offset': pending['rejects_offset']}
+        return checkpoint
+
+    def write_checkpoint(self, rows_done: int, rejects_offset: int, pending: Optional[Dict] = None):
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'rows_done': rows_done, 'rejects_offset': rejects_offset, 'pending': pending}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _load_taken(self, connection) -> Dict[str, set]:
+        taken = {}
+        for unique in self.spec.unique:
+            taken[unique.field] = set(connection.execute(
+                select(unique.column).where(unique.column.isnot(None))
+            ).scalars())
+        return taken
+
+    def _set_pragmas(self, connection, pragmas: Dict[str, str]) -> Dict[str, str]:
+        previous = {}
+        for name, value in pragmas.items():
+            previous[name] = str(connection.exec_driver_sql(f'PRAGMA {name}').scalar())
+            connection.exec_driver_sql(f'PRAGMA {name} = {value}')
+        return previous
+
+    def _prepare_chunk(self, chunk: List[Tuple[int, Dict]], taken: Dict[str, set],
+                       rejects: List[Tuple[int, str, Dict]]) -> List[Dict]:
+        """Validate and dedupe one chunk of (line number, row) pairs, returning the values to insert."""
+        valid, failures = validate_batch_with_pydantic(self.spec.schema, [row for _, row in chunk])
+        for index, details in failures.items():
+            line, row = chunk[index]
+            rejects.append((line, '; '.join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in details), row))
+
+        now = datetime.utcnow()
+        values = []
+        for index, data in valid.items():
+            keys = {unique.field: unique.normalize(data.get(unique.field)) for unique in self.spec.unique}
+            duplicate = next((unique.message for unique in self.spec.unique
+                              if keys[unique.field] is not None and keys[unique.field] in taken[unique.field]), None)
+            if duplicate:
+                line, row = chunk[index]
+                rejects.append((line, duplicate, row))
+                continue
+            for field, key in keys.items():
+                if key is not None:
+                    taken[field].add(key)
+            for column, (field, normalize) in self.spec.derived.items():
+                data[column] = normalize(data.get(field))
+            values.append({**data, 'id': str(uuid.uuid4()), 'created_at': now, 'updated_at': now})
+        return values
+
+    def run(self, resume: bool = True, progress: Optional[Callable[[str], None]] = None) -> Dict:
+        """
+        Import the file.
+
+        Args:
+            resume (bool): Skip rows committed by a previous run of the same file.
+            progress (Optional[Callable[[str], None]]): Called with a status line after every chunk.
+
+        Returns:
+            Dict: inserted, rejected and skipped row counts, elapsed seconds and rows_per_second.
+        """
+        checkpoint = self.read_checkpoint() if resume else {'rows_done': 0, 'rejects_offset': 0}
+        start_row = checkpoint['rows_done']
+        started = time.perf_counter()
+
+        with open(self.path, newline='', encoding='utf-8-sig') as source, self.engine.connect() as connection:
+            reader = csv.DictReader(source)
+            rejects_mode = 'a' if start_row and os.path.exists(self.rejects_path) else 'w'
+            with open(self.rejects_path, rejects_mode, newline='', encoding='utf-8') as rejects_file:
+                writer = csv.writer(rejects_file)
+                if rejects_mode == 'w':
+                    writer.writerow(['line', 'error', *(reader.fieldnames or [])])
+                else:
+                    # Drop reject lines written after the last committed chunk; that chunk is read again
+                    rejects_file.truncate(checkpoint['rejects_offset'])
+                    rejects_file.seek(checkpoint['rejects_offset'])
+
+                is_sqlite = connection.dialect.name == 'sqlite'
+                previous_pragmas = self._set_pragmas(connection, BULK_LOAD_PRAGMAS) if is_sqlite else {}
+                try:
+                    taken = self._load_taken(connection)
+                    connection.commit()
+                    rows_done = 0
+                    chunk: List[Tuple[int, Dict]] = []
+                    for row in reader:
+                        rows_done += 1
+                        if rows_done <= start_row:
+                            self.skipped += 1
+                            continue
+                        cleaned = {key: (value.strip() or None) if isinstance(value, str) else value
+                                   for key, value in row.items() if key is not None}
+                        # DictReader counts the header as line 1
+                        chunk.append((reader.line_num, cleaned))
+                        if len(chunk) >= self.chunk_size:
+                            self._flush(connection, chunk, taken, writer, rejects_file, rows_done, started, progress)
+                            chunk = []
+                    if chunk:
+                        self._flush(connection, chunk, taken, writer, rejects_file, rows_done, started, progress)
+                finally:
+                    connection.rollback()
+                    if previous_pragmas:
+                        self._set_pragmas(connection, previous_pragmas)
+
+        # A finished import leaves nothing to resume
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return self.stats(started)
+
+    def _flush(self, connection, chunk, taken, writer, rejects_file, rows_done, started, progress):
+        rejects: List[Tuple[int, str, Dict]] = []
+        rejects_file.flush()
+        previous = {'rows_done': rows_done - len(chunk), 'rejects_offset': rejects_file.tell()}
+        values = self._prepare_chunk(chunk, taken, rejects)
+        for line, error, row in rejects:
+            writer.writerow([line, error, *row.values()])
+        rejects_file.flush()
+        rejects_offset = rejects_file.tell()
+
+        self.write_checkpoint(**previous, pending={
+            'rows_done': rows_done, 'rejects_offset': rejects_offset, 'probe_id': values[0]['id'] if values else None,
+        })
+        if values:
+            connection.execute(insert(self.spec.model), values)
+        connection.commit()
+        self.write_checkpoint(rows_done, rejects_offset)
+        self.inserted += len(values)
+        self.rejected += len(rejects)
+        if progress:
+            stats = self.stats(started)
+            progress(f"{rows_done} rows read, {self.inserted} inserted, {self.rejected} rejected "
+                     f"({stats['rows_per_second']:.0f} rows/s)")
+
+    def stats(self, started: float) -> Dict:
+        elapsed = time.perf_counter() - started
+        processed = self.inserted + self.rejected
+        return {
+            'inserted': self.inserted,
+            'rejected': self.rejected,
+            'skipped': self.skipped,
+            'elapsed': elapsed,
+            'rows_per_second': processed / elapsed if elapsed else 0.0,
+        }
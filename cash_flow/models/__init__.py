@@ -11,4 +11,19 @@ from .customer_contacts import CustomerContact
 from .product_service_model import ProductService
 from .invoice_model import Invoice
 from .payment import Payment
-from .transfer_model import Transfer
\ No newline at end of file
+from .transfer_model import Transfer
+from .posting_model import Posting
+from .balance_snapshot_model import BalanceSnapshot
+from .cash_flow_daily_model import CashFlowDaily
+from .table_version_model import TableVersion
+from .search_document_model import SearchDocument
+
+# Session listeners that keep denormalized columns in sync
+from . import events
+from . import ledger
+
+# Write counters of the tables behind cached list views
+from . import table_versions
+
+# Full-text search index, kept in sync by SQLite triggers
+from . import search
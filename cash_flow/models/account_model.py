@@ -1,4 +1,5 @@
 from sqlalchemy import Float, String, ForeignKey, Integer
+from sqlalchemy.orm import column_property
 from .base_model import BaseModel
 from extensions import db
 
@@ -7,15 +8,6 @@ class Account(BaseModel):
 
     name = db.Column(String(100), nullable=False)
     description = db.Column(String(255), nullable=True)
-    balance = db.Column(Float, default=0.0)
+    # Maintained by the ledger in cash_flow.models.ledger; active_history lets it book direct edits by their delta
+    balance = column_property(db.Column(Float, default=0.0), active_history=True)
     account_type = db.Column(String(50), nullable=False)
-
-    def to_dict(self):
-        obj_dict = super().to_dict()
-        obj_dict.update({
-            'name': self.name,
-            'description': self.description,
-            'balance': self.balance,
-            'account_type': self.account_type
-        })
-        return obj_dict
\ No newline at end of file
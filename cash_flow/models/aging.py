@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, literal, select, true, union_all
+from .customer_model import Customer
+from .invoice_model import Invoice
+from .payment import Payment
+
+# (bucket name, days past due covered); the last bucket is open-ended
+AGING_BUCKETS = (('current', 0), ('days_1_30', 30), ('days_31_60', 60), ('days_61_90', 90), ('days_over_90', None))
+
+# Balances below this are rounding noise from Float amounts
+TOLERANCE = 1e-6
+
+def _due_within_sums(as_of: date, due_date, balance, invoice_count) -> list:
+    """
+    Build the running sums of balances due no more than each bucket's days before `as_of`, plus total and count.
+
+    Running sums need one comparison per bucket; the buckets are their
+    differences. An invoice due on `as_of` is current; one due the day
+    before is 1 day past due.
+    """
+    columns = [
+        func.sum(case((due_date >= as_of - timedelta(days=days), balance))).label(f'within_{days}')
+        for _, days in AGING_BUCKETS if days is not None
+    ]
+    return [*columns, func.sum(balance).label('total'), func.sum(invoice_count).label('invoice_count')]
+
+def latest_invoice_statement():
+    """Select when the newest active invoice was created."""
+    invoices = Invoice.__table__
+    return select(func.max(invoices.c.created_at)).where(invoices.c.deleted_at.is_(None))
+
+def receivables_aging_statement(as_of: date, customer_ids: Optional[Iterable[str]] = None, newer_invoices: bool = True):
+    """
+    Build the statement of receivables_aging.
+
+    Args:
+        as_of (date): Day the aging is taken at.
+        customer_ids (Optional[Iterable[str]]): Restrict to these customers; all customers when None.
+        newer_invoices (bool): Whether invoices created after `as_of` exist and must be filtered out;
+            an aging taken today can skip the created_at filter.
+    """
+    invoices = Invoice.__table__
+    payments = Payment.__table__
+    customers = Customer.__table__
+    # Compared as a date so the planner still scans ix_invoices_aging rather than ranging over created_at
+    created_before = func.date(invoices.c.created_at) <= as_of if newer_invoices else true()
+
+    # Open invoices aged on their current balance, grouped in the customer order of ix_invoices_aging
+    current_balance = invoices.c.total_amount - invoices.c.amount_paid
+    current = (
+        select(invoices.c.customer_id, *_due_within_sums(as_of, invoices.c.due_date, current_balance, literal(1)))
+        .where(invoices.c.deleted_at.is_(None), invoices.c.amount_paid < invoices.c.total_amount,
+               created_before, current_balance > TOLERANCE)
+        .group_by(invoices.c.customer_id)
+    )
+
+    # Invoices paid after `as_of` swap their current balance for their balance at `as_of`
+    later = (
+        select(invoices.c.customer_id, invoices.c.due_date, current_balance.label('current_balance'),
+               (current_balance + func.sum(payments.c.amount)).label('balance'))
+        .select_from(payments)
+        .join(invoices, invoices.c.id == payments.c.invoice_id)
+        .where(payments.c.payment_date > as_of, payments.c.deleted_at.is_(None),
+               invoices.c.deleted_at.is_(None), created_before)
+        .group_by(invoices.c.id)
+        .subquery()
+    )
+    was_owing = later.c.current_balance > TOLERANCE
+    is_owing = later.c.balance > TOLERANCE
+    corrections = (
+        select(later.c.customer_id, *_due_within_sums(
+            as_of, later.c.due_date,
+            case((is_owing, later.c.balance), else_=0.0) - case((was_owing, later.c.current_balance), else_=0.0),
+            case((is_owing, 1), else_=0) - case((was_owing, 1), else_=0),
+        ))
+        .group_by(later.c.customer_id)
+    )
+    if customer_ids is not None:
+        current = current.where(invoices.c.customer_id.in_(list(customer_ids)))
+        corrections = corrections.where(later.c.customer_id.in_(list(customer_ids)))
+
+    # Both parts are already one row per customer, so the final grouping is small
+    parts = union_all(current, corrections).subquery()
+    within = {days: func.coalesce(func.sum(parts.c[f'within_{days}']), 0.0) for _, days in AGING_BUCKETS if days is not None}
+    total = func.coalesce(func.sum(parts.c.total), 0.0)
+    buckets = []
+    previous = None
+    for name, days in AGING_BUCKETS:
+        upper = within[days] if days is not None else total
+        buckets.append((upper - previous if previous is not None else upper).label(name))
+        previous = upper
+    aged = (
+        select(parts.c.customer_id, *buckets, total.label('total'), func.sum(parts.c.invoice_count).label('invoice_count'))
+        .group_by(parts.c.customer_id)
+        .having(func.sum(parts.c.invoice_count) > 0)
+        .subquery()
+    )
+
+    # Customers are joined after grouping, so only owing customers are looked up
+    return (
+        select(aged.c.customer_id, customers.c.first_name, customers.c.last_name,
+               *[aged.c[name] for name, _ in AGING_BUCKETS], aged.c.total, aged.c.invoice_count)
+        .select_from(aged)
+        .join(customers, customers.c.id == aged.c.customer_id)
+        .order_by(customers.c.last_name, customers.c.first_name, aged.c.customer_id)
+    )
+
+def receivables_aging(connection, as_of: date, customer_ids: Optional[Iterable[str]] = None) -> Tuple[List[dict], dict]:
+    """
+    Bucket the outstanding invoice balances of every customer by days past due at the end of `as_of`.
+
+    Open invoices are first aged on their current balance (total less the
+    denormalized amount_paid), read from the ix_invoices_aging covering
+    index, which holds only open invoices. Invoices with active payments
+    dated after `as_of` are then corrected to their balance at `as_of`;
+    those payments are found through the payment_date index, so an aging
+    taken today reads no payments at all. Both parts are bucketed per
+    customer and summed in one statement. Invoices created after `as_of`,
+    soft deleted or without a positive balance are left out.
+
+    Args:
+        connection: A database connection.
+        as_of (date): Day the aging is taken at.
+        customer_ids (Optional[Iterable[str]]): Restrict to these customers; all customers when None.
+
+    Returns:
+        Tuple[List[dict], dict]: Rows per customer with owing customers ordered by name, and the bucket totals.
+    """
+    # Skip the created_at filter when no invoice is newer than `as_of`, as for an aging taken today
+    latest = connection.scalar(latest_invoice_statement())
+    statement = receivables_aging_statement(as_of, customer_ids, newer_invoices=bool(latest and latest.date() > as_of))
+
+    rows = []
+    totals = {name: 0.0 for name, _ in AGING_BUCKETS}
+    totals.update(total=0.0, invoice_count=0)
+    for row in connection.execute(statement).mappings():
+        rows.append(dict(row))
+        for key in totals:
+            totals[key] += row[key]
+    return rows, totals
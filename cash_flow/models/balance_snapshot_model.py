@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Date, DateTime, Float, Integer, String
+from extensions import db
+
+class BalanceSnapshot(db.Model):
+    """Balance of an account at the end of a day, built by cash_flow.models.snapshots."""
+    __tablename__ = 'balance_snapshots'
+
+    id = db.Column(Integer, primary_key=True)
+    account_id = db.Column(String(36), db.ForeignKey('accounts.id'), nullable=False)
+    as_of = db.Column(Date, nullable=False)  # Balance includes every posting effective on or before this day
+    balance = db.Column(Float, nullable=False)
+    created_at = db.Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('account_id', 'as_of', name='uq_balance_snapshots_account_as_of'),
+        db.Index('ix_balance_snapshots_as_of', 'as_of'),
+    )
@@ -1,7 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from sqlalchemy.orm import declared_attr
 from datetime import datetime
 import uuid
 from extensions import db
+from .serializers import get_serializer
 
 class BaseModel(db.Model):
     __abstract__ = True  # This class is meant to be inherited by other models, not instantiated directly
@@ -11,6 +14,21 @@ class BaseModel(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = db.Column(db.DateTime, nullable=True)
 
+    @declared_attr
+    def __table_args__(cls):
+        """
+        Partial index serving the (created_at, id) ordered scans of non-deleted rows,
+        and an (updated_at, id) index covering the list ETag watermark.
+        """
+        return (
+            db.Index(
+                f'ix_{cls.__tablename__}_active_created_at', 'created_at', 'id',
+                sqlite_where=text('deleted_at IS NULL'),
+                postgresql_where=text('deleted_at IS NULL'),
+            ),
+            db.Index(f'ix_{cls.__tablename__}_updated_at', 'updated_at', 'id'),
+        )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         for key, value in kwargs.items():
@@ -25,13 +43,8 @@ class BaseModel(db.Model):
             self.updated_at = datetime.utcnow()
 
     def to_dict(self):
-        obj_dict = self.__dict__.copy()
-        obj_dict['created_at'] = self.created_at.isoformat()
-        obj_dict['updated_at'] = self.updated_at.isoformat()
-        obj_dict['__class__'] = self.__class__.__name__
-        if '_sa_instance_state' in obj_dict:
-            del obj_dict['_sa_instance_state']
-        return obj_dict
+        """Serialize every column with the precompiled serializer of this class."""
+        return get_serializer(type(self))(self)
 
     def save(self, session):
         """Save the object to the database."""
@@ -0,0 +1,22 @@
+from sqlalchemy import Date, Float, Integer, String
+from extensions import db
+
+class CashFlowDaily(db.Model):
+    """
+    Net cash flow of one account for one day, category and flow type.
+
+    Maintained from the account legs of the postings ledger by
+    cash_flow.models.rollups. A positive amount is money into the account.
+    """
+    __tablename__ = 'cash_flow_daily'
+
+    id = db.Column(Integer, primary_key=True)
+    day = db.Column(Date, nullable=False)  # Effective date of the postings
+    account_id = db.Column(String(36), db.ForeignKey('accounts.id'), nullable=False)
+    category_id = db.Column(String(36), nullable=False, default='')  # '' when the flow has no category, so it stays part of the unique key
+    flow_type = db.Column(String(20), nullable=False)  # One of the FLOW_* values in cash_flow.models.ledger
+    amount = db.Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.UniqueConstraint('day', 'account_id', 'category_id', 'flow_type', name='uq_cash_flow_daily_key'),
+    )
@@ -0,0 +1,64 @@
+from sqlalchemy import event, func, select, update, case, literal
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.orm.util import identity_key
+from .invoice_model import Invoice, InvoiceStatus
+from .payment import Payment
+
+# session.info key holding invoice ids whose loaded instances must be refreshed
+_STALE_INVOICES_KEY = 'cash_flow_stale_invoice_ids'
+
+def _payment_invoice_ids(payment):
+    """Return the current and previous invoice ids of a pending Payment."""
+    history = get_history(payment, 'invoice_id')
+    return {invoice_id for invoice_id in (*history.added, *history.unchanged, *history.deleted) if invoice_id}
+
+def refresh_invoice_totals(connection, invoice_ids):
+    """
+    Recompute amount_paid and status for the given invoices from their active payments.
+
+    Args:
+        connection: The connection of the current transaction.
+        invoice_ids: Ids of the invoices to refresh.
+    """
+    invoices = Invoice.__table__
+    payments = Payment.__table__
+    status_type = invoices.c.status.type
+
+    paid_subquery = (
+        select(func.coalesce(func.sum(payments.c.amount), 0.0))
+        .where(payments.c.invoice_id == invoices.c.id, payments.c.deleted_at.is_(None))
+        .scalar_subquery()
+    )
+    connection.execute(
+        update(invoices).where(invoices.c.id.in_(invoice_ids)).values(amount_paid=paid_subquery)
+    )
+    connection.execute(
+        update(invoices).where(invoices.c.id.in_(invoice_ids)).values(status=case(
+            (invoices.c.total_amount - invoices.c.amount_paid <= 0, literal(InvoiceStatus.PAID, status_type)),
+            (invoices.c.amount_paid > 0, literal(InvoiceStatus.PARTIALLY_PAID, status_type)),
+            else_=literal(InvoiceStatus.UNPAID, status_type),
+        ))
+    )
+
+@event.listens_for(Session, 'after_flush')
+def sync_invoice_payments(session, flush_context):
+    """Keep Invoice.amount_paid and Invoice.status in step with every Payment write."""
+    invoice_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Payment):
+            invoice_ids |= _payment_invoice_ids(obj)
+        elif isinstance(obj, Invoice) and obj in session.dirty and get_history(obj, 'total_amount').has_changes():
+            invoice_ids.add(obj.id)
+
+    if invoice_ids:
+        refresh_invoice_totals(session.connection(), invoice_ids)
+        session.info.setdefault(_STALE_INVOICES_KEY, set()).update(invoice_ids)
+
+@event.listens_for(Session, 'after_flush_postexec')
+def expire_refreshed_invoices(session, flush_context):
+    """Expire loaded invoices so they reload the values written by sync_invoice_payments."""
+    for invoice_id in session.info.pop(_STALE_INVOICES_KEY, ()):
+        invoice = session.identity_map.get(identity_key(Invoice, invoice_id))
+        if invoice is not None:
+            session.expire(invoice, ['amount_paid', 'status'])
@@ -7,11 +7,3 @@ class ExpenseCategory(BaseModel):
 
     name = db.Column(String(100), nullable=False)
     description = db.Column(String(255), nullable=True)
-
-    def to_dict(self):
-        obj_dict = super().to_dict()
-        obj_dict.update({
-            'name': self.name,
-            'description': self.description
-        })
-        return obj_dict
\ No newline at end of file
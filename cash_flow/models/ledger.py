@@ -0,0 +1,237 @@
+import uuid
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.orm.util import identity_key
+from .account_model import Account
+from .payment import Payment
+from .posting_model import Posting
+from .snapshots import shift_snapshots
+from .rollups import shift_rollups
+from .transaction_model import Transaction
+from .transfer_model import Transfer
+
+# System ledgers for the side of an entry that is not an Account
+RECEIVABLES = 'accounts_receivable'
+UNDEPOSITED_FUNDS = 'undeposited_funds'
+OPENING_BALANCES = 'opening_balance_equity'
+BALANCE_ADJUSTMENTS = 'balance_adjustments'
+INCOME = 'income'
+EXPENSES = 'expenses'
+
+# What kind of cash flow an entry is, rolled up by cash_flow.models.rollups
+FLOW_PAYMENT = 'payment'
+FLOW_INCOME = 'income'
+FLOW_EXPENSE = 'expense'
+FLOW_TRANSFER_IN = 'transfer_in'
+FLOW_TRANSFER_OUT = 'transfer_out'
+FLOW_OPENING = 'opening'
+FLOW_ADJUSTMENT = 'adjustment'
+
+# Differences below this are rounding noise from Float amounts
+TOLERANCE = 1e-6
+
+# session.info key holding account ids whose loaded balances must be refreshed
+_STALE_ACCOUNTS_KEY = 'cash_flow_stale_account_ids'
+
+# A leg is keyed by (account_id, ledger, effective_date, flow_type, category_id); exactly one of
+# account_id and ledger is set, and every leg of an entry shares its flow_type and category_id
+Legs = Dict[Tuple[Optional[str], Optional[str], date, str, Optional[str]], float]
+
+def transfer_legs(transfer) -> Legs:
+    """Debit the receiving account and credit the sending one, on the day the transfer was made."""
+    if transfer.deleted_at is not None:
+        return {}
+    effective_date = (transfer.created_at or datetime.utcnow()).date()
+    return {
+        (transfer.to_account_id, None, effective_date, FLOW_TRANSFER_IN, None): transfer.amount,
+        (transfer.from_account_id, None, effective_date, FLOW_TRANSFER_OUT, None): -transfer.amount,
+    }
+
+def payment_legs(payment) -> Legs:
+    """Debit the deposit account (or undeposited funds) and credit receivables, on the payment date."""
+    if payment.deleted_at is not None:
+        return {}
+    debit = (payment.account_id, None) if payment.account_id else (None, UNDEPOSITED_FUNDS)
+    return {
+        (*debit, payment.payment_date, FLOW_PAYMENT, None): payment.amount,
+        (None, RECEIVABLES, payment.payment_date, FLOW_PAYMENT, None): -payment.amount,
+    }
+
+def transaction_legs(transaction) -> Legs:
+    """Debit the account for income or credit it for an expense, against its category, on the day it was recorded."""
+    if transaction.deleted_at is not None or not transaction.amount:
+        return {}
+    effective_date = (transaction.created_at or datetime.utcnow()).date()
+    if transaction.transaction_type == 'income':
+        category_id, amount = transaction.income_category_id, transaction.amount
+        flow_type, ledger = FLOW_INCOME, INCOME
+    elif transaction.transaction_type == 'expense':
+        category_id, amount = transaction.expense_category_id, -transaction.amount
+        flow_type, ledger = FLOW_EXPENSE, EXPENSES
+    else:
+        # Transfers between accounts are posted from the Transfer rows
+        return {}
+    return {
+        (transaction.account_id, None, effective_date, flow_type, category_id): amount,
+        (None, ledger, effective_date, flow_type, category_id): -amount,
+    }
+
+def _posted_legs(connection, source_type: str, source_ids: Iterable[str]) -> Dict[str, Legs]:
+    """Return the net legs already posted for each source."""
+    posted: Dict[str, Legs] = defaultdict(lambda: defaultdict(float))
+    rows = connection.execute(
+        select(Posting.source_id, Posting.account_id, Posting.ledger, Posting.effective_date,
+               Posting.flow_type, Posting.category_id, func.sum(Posting.amount))
+        .where(Posting.source_type == source_type, Posting.source_id.in_(list(source_ids)))
+        .group_by(Posting.source_id, Posting.account_id, Posting.ledger, Posting.effective_date,
+                  Posting.flow_type, Posting.category_id)
+    )
+    for source_id, account_id, ledger, effective_date, flow_type, category_id, amount in rows:
+        posted[source_id][(account_id, ledger, effective_date, flow_type, category_id)] += amount
+    return posted
+
+def _write_entries(connection, source_type: str, entries: List[Tuple[str, Legs]], update_balances: bool) -> set:
+    """
+    Insert one entry per (source_id, legs), move the account balances it
+    touches, shift any balance snapshots taken after a back-dated leg and
+    add the account legs to the daily cash-flow rollups.
+    """
+    now = datetime.utcnow()
+    rows = []
+    deltas = defaultdict(float)
+    dated_deltas = defaultdict(float)
+    rollup_deltas = defaultdict(float)
+    for source_id, legs in entries:
+        entry_id = str(uuid.uuid4())
+        for (account_id, ledger, effective_date, flow_type, category_id), amount in legs.items():
+            rows.append({
+                'entry_id': entry_id, 'source_type': source_type, 'source_id': source_id,
+                'account_id': account_id, 'ledger': ledger, 'effective_date': effective_date,
+                'flow_type': flow_type, 'category_id': category_id, 'amount': amount, 'created_at': now,
+            })
+            if account_id is not None:
+                deltas[account_id] += amount
+                dated_deltas[(account_id, effective_date)] += amount
+                rollup_deltas[(effective_date, account_id, category_id, flow_type)] += amount
+    if rows:
+        connection.execute(insert(Posting.__table__), rows)
+        shift_snapshots(connection, dated_deltas)
+        shift_rollups(connection, rollup_deltas)
+    if update_balances and deltas:
+        accounts = Account.__table__
+        connection.execute(
+            update(accounts).where(accounts.c.id == bindparam('account_id'))
+            .values(balance=func.coalesce(accounts.c.balance, 0.0) + bindparam('delta')),
+            [{'account_id': account_id, 'delta': delta} for account_id, delta in deltas.items()],
+        )
+    return set(deltas)
+
+def sync_postings(connection, source_type: str, desired: Dict[str, Legs]) -> set:
+    """
+    Bring the postings of each source in line with its desired legs.
+
+    The difference between what is desired and what is already posted is
+    written as one new balanced entry per source, and the balance of every
+    Account it touches is moved by the same amount in the same transaction.
+
+    Args:
+        connection: The connection of the current transaction.
+        source_type (str): 'transfer', 'payment' or 'transaction'.
+        desired (Dict[str, Legs]): Legs by source id; empty for deleted sources.
+
+    Returns:
+        set: Ids of the accounts whose balance changed.
+    """
+    if not desired:
+        return set()
+    posted = _posted_legs(connection, source_type, desired)
+    entries = []
+    for source_id, legs in desired.items():
+        difference = defaultdict(float, legs)
+        for key, amount in posted.get(source_id, {}).items():
+            difference[key] -= amount
+        difference = {key: amount for key, amount in difference.items() if abs(amount) > TOLERANCE}
+        if difference:
+            entries.append((source_id, difference))
+    return _write_entries(connection, source_type, entries, update_balances=True)
+
+def verify_balances(connection) -> List[str]:
+    """
+    Check every cached Account.balance against the sum of its postings, and
+    every entry against zero.
+
+    Returns:
+        List[str]: One description per mismatch; empty if the ledger is consistent.
+    """
+    problems = []
+    posted = (
+        select(Posting.account_id, func.sum(Posting.amount).label('total'))
+        .where(Posting.account_id.isnot(None)).group_by(Posting.account_id).subquery()
+    )
+    rows = connection.execute(
+        select(Account.id, Account.balance, func.coalesce(posted.c.total, 0.0))
+        .outerjoin(posted, posted.c.account_id == Account.id)
+    )
+    for account_id, balance, total in rows:
+        if abs((balance or 0.0) - total) > TOLERANCE:
+            problems.append(f'account {account_id}: balance {balance} != postings {total}')
+
+    unbalanced = connection.execute(
+        select(Posting.entry_id, func.sum(Posting.amount)).group_by(Posting.entry_id)
+        .having(func.abs(func.sum(Posting.amount)) > TOLERANCE)
+    )
+    for entry_id, total in unbalanced:
+        problems.append(f'entry {entry_id}: legs sum to {total}')
+    return problems
+
+@event.listens_for(Session, 'after_flush')
+def post_ledger_entries(session, flush_context):
+    """Post ledger entries for every Transfer, Payment and Transaction write and direct Account balance edits."""
+    desired = {'transfer': {}, 'payment': {}, 'transaction': {}}
+    adjustments = []
+    today = datetime.utcnow().date()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Transfer):
+            desired['transfer'][obj.id] = {} if obj in session.deleted else transfer_legs(obj)
+        elif isinstance(obj, Payment):
+            desired['payment'][obj.id] = {} if obj in session.deleted else payment_legs(obj)
+        elif isinstance(obj, Transaction):
+            desired['transaction'][obj.id] = {} if obj in session.deleted else transaction_legs(obj)
+        elif isinstance(obj, Account) and obj not in session.deleted:
+            # Balances set directly (opening balance, manual correction) are booked against equity
+            history = get_history(obj, 'balance')
+            if obj in session.new and obj.balance:
+                adjustments.append((obj.id, {
+                    (obj.id, None, today, FLOW_OPENING, None): obj.balance,
+                    (None, OPENING_BALANCES, today, FLOW_OPENING, None): -obj.balance,
+                }))
+            elif obj not in session.new and history.has_changes():
+                delta = (obj.balance or 0.0) - ((history.deleted or [0.0])[0] or 0.0)
+                if abs(delta) > TOLERANCE:
+                    adjustments.append((obj.id, {
+                        (obj.id, None, today, FLOW_ADJUSTMENT, None): delta,
+                        (None, BALANCE_ADJUSTMENTS, today, FLOW_ADJUSTMENT, None): -delta,
+                    }))
+
+    if not (any(desired.values()) or adjustments):
+        return
+    connection = session.connection()
+    stale = set()
+    for source_type, legs_by_source in desired.items():
+        stale |= sync_postings(connection, source_type, legs_by_source)
+    # The ORM already wrote these balances, so only the postings are added
+    _write_entries(connection, 'account', adjustments, update_balances=False)
+    session.info.setdefault(_STALE_ACCOUNTS_KEY, set()).update(stale)
+
+@event.listens_for(Session, 'after_flush_postexec')
+def expire_posted_accounts(session, flush_context):
+    """Expire loaded accounts so they reload the balances moved by post_ledger_entries."""
+    for account_id in session.info.pop(_STALE_ACCOUNTS_KEY, ()):
+        account = session.identity_map.get(identity_key(Account, account_id))
+        if account is not None:
+            session.expire(account, ['balance'])
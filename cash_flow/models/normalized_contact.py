@@ -0,0 +1,22 @@
+from sqlalchemy import String
+from sqlalchemy.orm import validates
+from extensions import db
+from cash_flow.utils import normalize_email, normalize_phone
+
+class NormalizedContactMixin:
+    """Keeps email_norm and phone_norm in step with email and phone so the database can enforce uniqueness."""
+
+    __serializer_exclude__ = ('email_norm', 'phone_norm')
+
+    email_norm = db.Column(String(100), nullable=True, unique=True, index=True)  # Lower-cased email
+    phone_norm = db.Column(String(20), nullable=True, unique=True, index=True)  # Digits-only phone number
+
+    @validates('email')
+    def _normalize_email(self, key, value):
+        self.email_norm = normalize_email(value)
+        return value
+
+    @validates('phone')
+    def _normalize_phone(self, key, value):
+        self.phone_norm = normalize_phone(value)
+        return value
@@ -1,4 +1,5 @@
 from sqlalchemy import Float, String, Integer, Date, Enum
+from sqlalchemy.orm import column_property
 from .base_model import BaseModel
 from extensions import db
 import enum
@@ -11,23 +12,14 @@ class PaymentMethod(enum.Enum):
 class Payment(BaseModel):
     __tablename__ = 'payments'
 
-    invoice_id = db.Column(String(36), db.ForeignKey('invoices.id'), nullable=False)  # Reference to Invoice table
-    payment_date = db.Column(Date, nullable=False)  # Date of payment
+    # Reference to Invoice table; active_history loads the old invoice on a move so cash_flow.models.events refreshes both
+    invoice_id = column_property(
+        db.Column(String(36), db.ForeignKey('invoices.id'), nullable=False, index=True), active_history=True
+    )
+    payment_date = db.Column(Date, nullable=False, index=True)  # Date of payment
     amount = db.Column(Float, nullable=False)  # Amount paid
     payment_method = db.Column(Enum(PaymentMethod), nullable=False)  # Payment method
-    account_id = db.Column(String(36), db.ForeignKey('accounts.id'), nullable=True)  # Reference to an account (optional)
+    account_id = db.Column(String(36), db.ForeignKey('accounts.id'), nullable=True, index=True)  # Reference to an account (optional)
 
     invoice = db.relationship('Invoice', back_populates='payments')  # Relationship to Invoice
     account = db.relationship('Account', backref=db.backref('payments', lazy=True))  # Relationship to Account
-
-    def to_dict(self):
-        """Convert the Payment object to a dictionary for easy serialization."""
-        obj_dict = super().to_dict()  # Get fields from BaseModel
-        obj_dict.update({
-            'invoice_id': self.invoice_id,
-            'payment_date': self.payment_date,
-            'amount': self.amount,
-            'payment_method': self.payment_method.value,  # Use the value of the Enum
-            'account_id': self.account_id,
-        })
-        return obj_dict
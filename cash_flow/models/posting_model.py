@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import Date, Float, Integer, String, DateTime
+from extensions import db
+
+class Posting(db.Model):
+    """
+    One leg of a double-entry ledger entry.
+
+    Postings are append-only: every entry_id sums to zero, and changes to a
+    source (edits, soft deletes, restores) are recorded as new adjusting
+    entries. A leg hits either an Account (account_id) or one of the system
+    ledgers in cash_flow.models.ledger (ledger). Debits are positive.
+    """
+    __tablename__ = 'postings'
+
+    id = db.Column(Integer, primary_key=True)
+    entry_id = db.Column(String(36), nullable=False, index=True)  # Groups the balanced legs of one entry
+    source_type = db.Column(String(20), nullable=False)  # 'transfer', 'payment', 'transaction' or 'account'
+    source_id = db.Column(String(36), nullable=False)  # ID of the row that caused the entry
+    account_id = db.Column(String(36), db.ForeignKey('accounts.id'), nullable=True)  # Indexed with effective_date below
+    ledger = db.Column(String(50), nullable=True)  # System ledger when the leg is not an Account
+    effective_date = db.Column(Date, nullable=False)  # Day the leg counts towards the balance (payment date, transfer day)
+    flow_type = db.Column(String(20), nullable=False)  # Kind of cash flow, one of the FLOW_* values in cash_flow.models.ledger
+    category_id = db.Column(String(36), nullable=True)  # Income or expense category of a Transaction entry
+    amount = db.Column(Float, nullable=False)  # Signed amount, debit positive and credit negative
+    created_at = db.Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_postings_source', 'source_type', 'source_id'),
+        db.Index('ix_postings_account_effective_date', 'account_id', 'effective_date'),
+    )
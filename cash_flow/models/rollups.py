@@ -0,0 +1,165 @@
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from .cash_flow_daily_model import CashFlowDaily
+from .posting_model import Posting
+
+# Groupings accepted by cash_flow_report
+REPORT_GROUPINGS = ('day', 'month', 'account', 'category', 'type')
+
+# Differences below this are rounding noise from Float amounts
+TOLERANCE = 1e-6
+
+def _upsert(connection, table):
+    """Return an INSERT for the dialect of connection that supports ON CONFLICT."""
+    dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+    return dialect.insert(table)
+
+def shift_rollups(connection, rollup_deltas: Dict[Tuple[date, str, Optional[str], str], float]):
+    """
+    Add new account postings to the daily cash-flow rollups.
+
+    Each (day, account, category, flow type) is added to its existing row,
+    or inserted when the day has no row for that key yet.
+
+    Args:
+        connection: The connection of the current transaction.
+        rollup_deltas (Dict[Tuple[date, str, Optional[str], str], float]): Amount by
+            (effective_date, account_id, category_id, flow_type).
+    """
+    if not rollup_deltas:
+        return
+    table = CashFlowDaily.__table__
+    statement = _upsert(connection, table)
+    statement = statement.on_conflict_do_update(
+        index_elements=['day', 'account_id', 'category_id', 'flow_type'],
+        set_={'amount': table.c.amount + statement.excluded.amount},
+    )
+    connection.execute(statement, [
+        {'day': day, 'account_id': account_id, 'category_id': category_id or '', 'flow_type': flow_type, 'amount': amount}
+        for (day, account_id, category_id, flow_type), amount in rollup_deltas.items()
+    ])
+
+def _posted_totals():
+    """Select the account postings grouped by rollup key."""
+    postings = Posting.__table__
+    return (
+        select(
+            postings.c.effective_date, postings.c.account_id, func.coalesce(postings.c.category_id, literal('')),
+            postings.c.flow_type, func.sum(postings.c.amount),
+        )
+        .where(postings.c.account_id.isnot(None))
+        .group_by(postings.c.effective_date, postings.c.account_id, postings.c.category_id, postings.c.flow_type)
+    )
+
+def rebuild_rollups(connection, start: Optional[date] = None) -> int:
+    """
+    Replace the rollups from the postings ledger.
+
+    Args:
+        connection: The connection to write with; the caller commits.
+        start (Optional[date]): Only rebuild days from this one on; all days when None.
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    table = CashFlowDaily.__table__
+    postings = Posting.__table__
+    totals = _posted_totals()
+    removal = delete(table)
+    if start is not None:
+        totals = totals.where(postings.c.effective_date >= start)
+        removal = removal.where(table.c.day >= start)
+    connection.execute(removal)
+    result = connection.execute(
+        insert(table).from_select(['day', 'account_id', 'category_id', 'flow_type', 'amount'], totals)
+    )
+    return result.rowcount
+
+def verify_rollups(connection) -> List[str]:
+    """
+    Check every rollup row against the postings it summarizes.
+
+    Returns:
+        List[str]: One description per mismatch; empty if the rollups are consistent.
+    """
+    table = CashFlowDaily.__table__
+    expected = {tuple(key): amount for *key, amount in connection.execute(_posted_totals())}
+    problems = []
+    for *key, amount in connection.execute(
+        select(table.c.day, table.c.account_id, table.c.category_id, table.c.flow_type, table.c.amount)
+    ):
+        posted = expected.pop(tuple(key), 0.0)
+        if abs(amount - posted) > TOLERANCE:
+            problems.append(f'cash flow {tuple(key)}: rollup {amount} != postings {posted}')
+    for key, posted in expected.items():
+        if abs(posted) > TOLERANCE:
+            problems.append(f'cash flow {key}: no rollup for postings {posted}')
+    return problems
+
+def cash_flow_report_statement(dialect_name: str, start: Optional[date], end: Optional[date], group_by: Iterable[str],
+                               flow_types: Optional[Iterable[str]] = None, account_ids: Optional[Iterable[str]] = None):
+    """Build the statement of cash_flow_report for a database dialect; see it for the arguments."""
+    table = CashFlowDaily.__table__
+    if dialect_name == 'postgresql':
+        month = func.to_char(table.c.day, 'YYYY-MM')
+    else:
+        month = func.strftime('%Y-%m', table.c.day)
+    expressions = {
+        'day': table.c.day,
+        'month': month,
+        'account': table.c.account_id,
+        'category': table.c.category_id,
+        'type': table.c.flow_type,
+    }
+    keys = [expressions[grouping].label(grouping) for grouping in group_by]
+    statement = select(
+        *keys,
+        func.coalesce(func.sum(case((table.c.amount > 0, table.c.amount), else_=0.0)), 0.0).label('inflow'),
+        func.coalesce(func.sum(case((table.c.amount < 0, -table.c.amount), else_=0.0)), 0.0).label('outflow'),
+        func.coalesce(func.sum(table.c.amount), 0.0).label('net'),
+    )
+    if start is not None:
+        statement = statement.where(table.c.day >= start)
+    if end is not None:
+        statement = statement.where(table.c.day <= end)
+    if flow_types is not None:
+        statement = statement.where(table.c.flow_type.in_(list(flow_types)))
+    if account_ids is not None:
+        statement = statement.where(table.c.account_id.in_(list(account_ids)))
+    if keys:
+        statement = statement.group_by(*keys).order_by(*keys)
+    return statement
+
+def cash_flow_report(connection, start: Optional[date], end: Optional[date], group_by: Iterable[str],
+                     flow_types: Optional[Iterable[str]] = None, account_ids: Optional[Iterable[str]] = None) -> List[dict]:
+    """
+    Sum the rollups over a date range into inflow, outflow and net per group.
+
+    Inflow and outflow are taken per rollup row, so opposite flows of the
+    same account, day, category and flow type net out before they are split.
+
+    Args:
+        connection: A database connection.
+        start (Optional[date]): First day included; unbounded when None.
+        end (Optional[date]): Last day included; unbounded when None.
+        group_by (Iterable[str]): Any of REPORT_GROUPINGS; one total row when empty.
+        flow_types (Optional[Iterable[str]]): Only include these flow types.
+        account_ids (Optional[Iterable[str]]): Only include these accounts.
+
+    Returns:
+        List[dict]: One row per group with its keys and inflow, outflow and net, ordered by the keys.
+    """
+    statement = cash_flow_report_statement(connection.dialect.name, start, end, group_by, flow_types, account_ids)
+
+    rows = []
+    for row in connection.execute(statement).mappings():
+        row = dict(row)
+        if 'day' in row:
+            row['day'] = row['day'].isoformat()
+        if 'category' in row:
+            row['category'] = row['category'] or None
+        rows.append(row)
+    return rows
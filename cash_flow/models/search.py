@@ -0,0 +1,173 @@
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, text
+from extensions import db
+
+def _person(row: str) -> Tuple[str, str]:
+    """Title and body of a customer or vendor; phone_norm lets digits match however the phone was typed."""
+    return (
+        f"{row}.first_name || ' ' || {row}.last_name",
+        f"coalesce({row}.email, '') || ' ' || coalesce({row}.phone, '') || ' ' || coalesce({row}.phone_norm, '') || ' ' || "
+        f"coalesce({row}.address, '') || ' ' || coalesce({row}.description, '')",
+    )
+
+def _contact(row: str) -> Tuple[str, str]:
+    """Title and body of a customer or vendor contact."""
+    return f'{row}.contact_value', f'{row}.contact_type'
+
+def _product(row: str) -> Tuple[str, str]:
+    """Title and body of a product or service."""
+    return f'{row}.name', f"coalesce({row}.description, '')"
+
+PERSON_COLUMNS = ('first_name', 'last_name', 'email', 'phone', 'address', 'description', 'deleted_at')
+CONTACT_COLUMNS = ('contact_type', 'contact_value', 'deleted_at')
+
+# entity -> (table, builder of the title and body expressions for a row alias, indexed columns)
+SEARCH_SOURCES = {
+    'customer': ('customers', _person, PERSON_COLUMNS),
+    'vendor': ('vendors', _person, PERSON_COLUMNS),
+    'customer_contact': ('customer_contacts', _contact, CONTACT_COLUMNS),
+    'vendor_contact': ('vendor_contacts', _contact, CONTACT_COLUMNS),
+    'product_service': ('product_services', _product, ('name', 'description', 'deleted_at')),
+}
+
+# Trigram tokens match any substring of at least this many characters
+MIN_TERM_LENGTH = 3
+
+# Matches read per search and ranked; bm25 is not used as it counts every match of each term first.
+# Matches with every term in the title are read before the rest, so body matches cannot crowd them out
+SEARCH_CANDIDATES = 500
+
+SEARCH_INDEX_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(title, body, tokenize='trigram')"
+)
+
+def _trigger_ddl(entity: str) -> List[str]:
+    """Build the insert, update and delete triggers that keep one table's rows in search_index."""
+    table, expressions, columns = SEARCH_SOURCES[entity]
+    new_title, new_body = expressions('NEW')
+    remove = (
+        f"DELETE FROM search_index WHERE rowid IN "
+        f"(SELECT rowid FROM search_documents WHERE entity = '{entity}' AND entity_id = OLD.id); "
+        f"DELETE FROM search_documents WHERE entity = '{entity}' AND entity_id = OLD.id;"
+    )
+    add = (
+        f"INSERT INTO search_documents (entity, entity_id) SELECT '{entity}', NEW.id WHERE NEW.deleted_at IS NULL; "
+        f"INSERT INTO search_index (rowid, title, body) SELECT last_insert_rowid(), {new_title}, {new_body} "
+        f"WHERE NEW.deleted_at IS NULL;"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS search_{table}_insert AFTER INSERT ON {table} BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS search_{table}_update AFTER UPDATE OF {', '.join(columns)} ON {table} "
+        f"BEGIN {remove} {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS search_{table}_delete AFTER DELETE ON {table} BEGIN {remove} END",
+    ]
+
+def search_ddl() -> List[str]:
+    """Return the statements creating search_index and its triggers; each is a no-op if it already exists."""
+    statements = [SEARCH_INDEX_DDL]
+    for entity in SEARCH_SOURCES:
+        statements.extend(_trigger_ddl(entity))
+    return statements
+
+@event.listens_for(db.metadata, 'after_create')
+def create_search_index(target, connection, **kw):
+    """Create the full-text index with the other tables on SQLite databases built by create_all."""
+    if connection.dialect.name == 'sqlite':
+        for statement in search_ddl():
+            connection.exec_driver_sql(statement)
+
+def rebuild_search_index(connection) -> int:
+    """
+    Re-index every active row of every SEARCH_SOURCES table.
+
+    Args:
+        connection: The connection to write with; the caller commits.
+
+    Returns:
+        int: Number of rows indexed.
+    """
+    connection.exec_driver_sql("DELETE FROM search_index")
+    connection.exec_driver_sql("DELETE FROM search_documents")
+    indexed = 0
+    for entity, (table, expressions, _) in SEARCH_SOURCES.items():
+        title, body = expressions('source')
+        indexed += connection.execute(text(
+            f"INSERT INTO search_documents (entity, entity_id) "
+            f"SELECT :entity, id FROM {table} WHERE deleted_at IS NULL"
+        ), {'entity': entity}).rowcount
+        connection.execute(text(
+            f"INSERT INTO search_index (rowid, title, body) "
+            f"SELECT document.rowid, {title}, {body} FROM search_documents AS document "
+            f"JOIN {table} AS source ON source.id = document.entity_id WHERE document.entity = :entity"
+        ), {'entity': entity})
+    # Merge the index b-trees written by the bulk load into one
+    connection.exec_driver_sql("INSERT INTO search_index (search_index) VALUES ('optimize')")
+    return indexed
+
+def search_terms(query: str) -> List[str]:
+    """Split free text into the terms search can match; terms shorter than MIN_TERM_LENGTH cannot be matched by trigrams."""
+    return [term for term in query.split() if len(term) >= MIN_TERM_LENGTH]
+
+def match_expression(terms: List[str], column: Optional[str] = None) -> str:
+    """Build an FTS5 expression matching rows that contain every term as a substring, in any case, optionally in one column only."""
+    expression = ' AND '.join('"' + term.replace('"', '""') + '"' for term in terms)
+    return f'{column} : ({expression})' if column else expression
+
+def _rank(terms: List[str], title: str, body: str) -> Tuple[int, int, int]:
+    """Sort key of a match: more terms in the title, then more terms starting a word, then shorter titles first."""
+    title_hits = sum(term.lower() in title.lower() for term in terms)
+    word_starts = sum(
+        re.search(r'(?<!\w)' + re.escape(term), f'{title} {body}', re.IGNORECASE) is not None for term in terms
+    )
+    return -title_hits, -word_starts, len(title)
+
+def search(connection, query: str, entities: Optional[Iterable[str]] = None, limit: int = 20) -> List[dict]:
+    """
+    Find the active rows whose indexed text contains every term of `query`, best matches first.
+
+    Up to SEARCH_CANDIDATES matches are read and ranked here: first the
+    rows with every term in their title, then any other matches in index
+    order. A search costs the same whether a term matches a hundred rows
+    or a million, and name hits are never cut for body hits. When more
+    rows match, the best hits are the best of those candidates; adding a
+    term narrows the matches.
+
+    Args:
+        connection: A SQLite database connection.
+        query (str): Free text; see search_terms.
+        entities (Optional[Iterable[str]]): Only return these SEARCH_SOURCES entities; all when None.
+        limit (int): Maximum number of hits.
+
+    Returns:
+        List[dict]: type, id, title and detail per hit.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    params = {'candidates': SEARCH_CANDIDATES}
+    entity_filter = ''
+    if entities is not None:
+        params['entities'] = list(entities)
+        entity_filter = 'AND document.entity IN :entities'
+    statement = text(
+        f"SELECT search_index.rowid, document.entity, document.entity_id, search_index.title, search_index.body "
+        f"FROM search_index JOIN search_documents AS document ON document.rowid = search_index.rowid "
+        f"WHERE search_index MATCH :expression {entity_filter} LIMIT :candidates"
+    )
+    if entities is not None:
+        statement = statement.bindparams(bindparam('entities', expanding=True))
+    candidates = {}
+    for expression in (match_expression(terms, 'title'), match_expression(terms)):
+        for row in connection.execute(statement, {**params, 'expression': expression}):
+            candidates.setdefault(row.rowid, row)
+            if len(candidates) == SEARCH_CANDIDATES:
+                break
+        if len(candidates) == SEARCH_CANDIDATES:
+            break
+    matches = sorted(candidates.values(), key=lambda row: _rank(terms, row.title, row.body))
+    return [
+        {'type': row.entity, 'id': row.entity_id, 'title': row.title, 'detail': ' '.join(row.body.split())}
+        for row in matches[:limit]
+    ]
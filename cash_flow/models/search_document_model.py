@@ -0,0 +1,19 @@
+from sqlalchemy import Integer, String
+from extensions import db
+
+class SearchDocument(db.Model):
+    """
+    Row of the search_index full-text table, maintained by the triggers in cash_flow.models.search.
+
+    The FTS5 table is keyed by an integer rowid, so this table maps each
+    rowid to the entity type and id it indexes.
+    """
+    __tablename__ = 'search_documents'
+
+    rowid = db.Column(Integer, primary_key=True)
+    entity = db.Column(String(20), nullable=False)  # One of the SEARCH_SOURCES keys in cash_flow.models.search
+    entity_id = db.Column(String(36), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('entity', 'entity_id', name='uq_search_documents_entity'),
+    )
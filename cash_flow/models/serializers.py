@@ -0,0 +1,90 @@
+from datetime import date
+from sqlalchemy import Date, DateTime, Enum, Time, inspect
+from typing import Callable, Dict, Type
+
+# Each mapped class keeps its compiled serializer in its own __dict__ under this name. A dict keyed
+# by class would hash the class through the declarative metaclass, which costs more than serializing.
+SERIALIZER_ATTRIBUTE = '__serializer__'
+
+# ISO strings of Date column values. Due and payment dates repeat across rows and a dict hit is
+# about 10x cheaper than date.isoformat(); the cache is emptied when it outgrows _DATE_ISO_MAX.
+_DATE_ISO: Dict[date, str] = {}
+_DATE_ISO_MAX = 65536
+
+def _date_isoformat(value: date) -> str:
+    """Format a date missing from _DATE_ISO and remember it."""
+    if len(_DATE_ISO) >= _DATE_ISO_MAX:
+        _DATE_ISO.clear()
+    iso = _DATE_ISO[value] = value.isoformat()
+    return iso
+
+def _column_expression(index: int, column, value: str) -> str:
+    """Return the source expression that serializes one column read by `value`."""
+    column_type = column.columns[0].type
+    if isinstance(column_type, Enum) and column_type.enum_class is not None:
+        # _value_ is the member's plain attribute; .value goes through a much slower descriptor
+        return f'(v{index}._value_ if (v{index} := {value}) is not None else None)'
+    if isinstance(column_type, DateTime):
+        return f'(v{index}.isoformat() if (v{index} := {value}) is not None else None)'
+    if isinstance(column_type, Date):
+        return f'((_DATE_ISO.get(v{index}) or _date_isoformat(v{index})) if (v{index} := {value}) is not None else None)'
+    if isinstance(column_type, Time):
+        return f'(v{index}.isoformat() if (v{index} := {value}) is not None else None)'
+    return value
+
+def _dict_literal(cls: Type, columns, read: str) -> str:
+    """Return the source of the dict literal for `columns`, reading each with the `read` template."""
+    lines = [f'            {column.key!r}: {_column_expression(index, column, read.format(key=column.key))},'
+             for index, column in enumerate(columns)]
+    lines.append(f'            "__class__": {cls.__name__!r},')
+    return '{\n' + '\n'.join(lines) + '\n        }'
+
+def compile_serializer(cls: Type) -> Callable:
+    """
+    Compile a serializer for a mapped class from its mapper metadata.
+
+    The generated function builds the dict in one literal, in column order,
+    with enums serialized to their value and dates/datetimes to ISO 8601
+    (dates through the _DATE_ISO cache), followed by '__class__'. Columns named in the class's
+    `__serializer_exclude__` are left out.
+
+    Loaded values are read straight from the instance __dict__, skipping the
+    attribute descriptors; if any column is expired or deferred the function
+    falls back to attribute access, which loads it.
+
+    Args:
+        cls: The mapped model class.
+
+    Returns:
+        Callable: A function taking an instance and returning a dict.
+    """
+    exclude = set(getattr(cls, '__serializer_exclude__', ()))
+    columns = [column for column in inspect(cls).column_attrs if column.key not in exclude]
+    source = (
+        'def serialize(obj):\n'
+        '    state = obj.__dict__\n'
+        '    try:\n'
+        f'        return {_dict_literal(cls, columns, "state[{key!r}]")}\n'
+        '    except KeyError:\n'
+        f'        return {_dict_literal(cls, columns, "obj.{key}")}\n'
+    )
+    namespace = {'_DATE_ISO': _DATE_ISO, '_date_isoformat': _date_isoformat}
+    exec(compile(source, f'<serializer {cls.__name__}>', 'exec'), namespace)
+    return namespace['serialize']
+
+def get_serializer(cls: Type) -> Callable:
+    """Return the compiled serializer for a class, compiling it on first use."""
+    serializer = cls.__dict__.get(SERIALIZER_ATTRIBUTE)
+    if serializer is None:
+        serializer = compile_serializer(cls)
+        setattr(cls, SERIALIZER_ATTRIBUTE, serializer)
+    return serializer
+
+def build_serializers(base: Type):
+    """Compile serializers for every concrete subclass of `base` up front."""
+    pending = list(base.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if not cls.__dict__.get('__abstract__', False):
+            get_serializer(cls)
@@ -0,0 +1,182 @@
+import calendar
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, func, insert, or_, select, update
+from .account_model import Account
+from .balance_snapshot_model import BalanceSnapshot
+from .posting_model import Posting
+
+SNAPSHOT_INTERVALS = ('daily', 'monthly')
+
+# Differences below this are rounding noise from Float amounts
+TOLERANCE = 1e-6
+
+def period_ends(start: date, end: date, interval: str) -> List[date]:
+    """
+    Return the snapshot dates between start and end, both inclusive.
+
+    Args:
+        start (date): First day that may get a snapshot.
+        end (date): Last day that may get a snapshot.
+        interval (str): 'daily' for every day, 'monthly' for the last day of each month.
+
+    Returns:
+        List[date]: Snapshot dates in order.
+    """
+    if interval not in SNAPSHOT_INTERVALS:
+        raise ValueError(f"Unknown snapshot interval {interval!r}, expected one of {SNAPSHOT_INTERVALS}")
+    if interval == 'daily':
+        return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    ends = []
+    year, month = start.year, start.month
+    while True:
+        month_end = date(year, month, calendar.monthrange(year, month)[1])
+        if month_end > end:
+            return ends
+        ends.append(month_end)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def shift_snapshots(connection, dated_deltas: Dict[Tuple[str, date], float]):
+    """
+    Apply new postings to the snapshots they precede.
+
+    A back-dated posting changes every snapshot taken on or after its
+    effective date, so those are moved by the same amount rather than rebuilt.
+
+    Args:
+        connection: The connection of the current transaction.
+        dated_deltas (Dict[Tuple[str, date], float]): Amount by (account_id, effective_date).
+    """
+    if not dated_deltas:
+        return
+    snapshots = BalanceSnapshot.__table__
+    connection.execute(
+        update(snapshots)
+        .where(snapshots.c.account_id == bindparam('target_account_id'), snapshots.c.as_of >= bindparam('effective_date'))
+        .values(balance=snapshots.c.balance + bindparam('delta')),
+        [{'target_account_id': account_id, 'effective_date': effective_date, 'delta': delta}
+         for (account_id, effective_date), delta in dated_deltas.items()],
+    )
+
+def balances_as_of_statement(as_of: date, account_ids: Optional[Iterable[str]] = None):
+    """Build the statement of balances_as_of: (account id, balance) per account."""
+    accounts = Account.__table__
+    snapshots = BalanceSnapshot.__table__
+    postings = Posting.__table__
+
+    latest = (
+        select(snapshots.c.account_id, func.max(snapshots.c.as_of).label('as_of'))
+        .where(snapshots.c.as_of <= as_of).group_by(snapshots.c.account_id).subquery()
+    )
+    snapshot = snapshots.alias('snapshot')
+    statement = (
+        select(accounts.c.id, func.coalesce(snapshot.c.balance, 0.0) + func.coalesce(func.sum(postings.c.amount), 0.0))
+        .select_from(accounts)
+        .outerjoin(latest, latest.c.account_id == accounts.c.id)
+        .outerjoin(snapshot, and_(snapshot.c.account_id == accounts.c.id, snapshot.c.as_of == latest.c.as_of))
+        .outerjoin(postings, and_(
+            postings.c.account_id == accounts.c.id,
+            postings.c.effective_date <= as_of,
+            or_(latest.c.as_of.is_(None), postings.c.effective_date > latest.c.as_of),
+        ))
+        .group_by(accounts.c.id, snapshot.c.balance)
+    )
+    if account_ids is not None:
+        statement = statement.where(accounts.c.id.in_(list(account_ids)))
+    return statement
+
+def balances_as_of(connection, as_of: date, account_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    Return account balances at the end of a day.
+
+    Each account starts from its latest snapshot on or before `as_of` and
+    adds only the postings effective after that snapshot, up to `as_of`.
+    Accounts without an earlier snapshot replay all their postings. All
+    accounts are computed in one grouped query.
+
+    Args:
+        connection: A database connection.
+        as_of (date): Day whose closing balances are wanted.
+        account_ids (Optional[Iterable[str]]): Restrict to these accounts; all accounts when None.
+
+    Returns:
+        Dict[str, float]: Balance by account id.
+    """
+    statement = balances_as_of_statement(as_of, account_ids)
+    return {account_id: balance for account_id, balance in connection.execute(statement)}
+
+def build_snapshots(connection, through: date, interval: str) -> int:
+    """
+    Add snapshots for every account at each period end after the latest existing snapshot.
+
+    The balances at the latest snapshot (or before the first posting) are
+    loaded once, then the postings up to `through` are read in one grouped
+    query and accumulated period by period.
+
+    Args:
+        connection: The connection to write with; the caller commits.
+        through (date): Last day that may get a snapshot.
+        interval (str): 'daily' or 'monthly'.
+
+    Returns:
+        int: Number of snapshot rows written.
+    """
+    snapshots = BalanceSnapshot.__table__
+    postings = Posting.__table__
+
+    last = connection.scalar(select(func.max(snapshots.c.as_of)))
+    if last is None:
+        first = connection.scalar(select(func.min(postings.c.effective_date)).where(postings.c.account_id.isnot(None)))
+        if first is None:
+            return 0
+        last = first - timedelta(days=1)
+    ends = period_ends(last + timedelta(days=1), through, interval)
+    if not ends:
+        return 0
+
+    balances = balances_as_of(connection, last)
+    deltas = connection.execute(
+        select(postings.c.account_id, postings.c.effective_date, func.sum(postings.c.amount))
+        .where(postings.c.account_id.isnot(None), postings.c.effective_date > last, postings.c.effective_date <= ends[-1])
+        .group_by(postings.c.account_id, postings.c.effective_date)
+        .order_by(postings.c.effective_date)
+    ).all()
+
+    rows = []
+    position = 0
+    for end in ends:
+        while position < len(deltas) and deltas[position][1] <= end:
+            account_id, _, amount = deltas[position]
+            balances[account_id] = balances.get(account_id, 0.0) + amount
+            position += 1
+        rows.extend({'account_id': account_id, 'as_of': end, 'balance': balance}
+                    for account_id, balance in balances.items())
+    if rows:
+        connection.execute(insert(snapshots), rows)
+    return len(rows)
+
+def verify_snapshots(connection) -> List[str]:
+    """
+    Check the most recent snapshot of every account against a full replay of its postings.
+
+    Returns:
+        List[str]: One description per mismatch; empty if the snapshots are consistent.
+    """
+    snapshots = BalanceSnapshot.__table__
+    postings = Posting.__table__
+    last = connection.scalar(select(func.max(snapshots.c.as_of)))
+    if last is None:
+        return []
+    replayed = dict(connection.execute(
+        select(postings.c.account_id, func.sum(postings.c.amount))
+        .where(postings.c.account_id.isnot(None), postings.c.effective_date <= last)
+        .group_by(postings.c.account_id)
+    ).all())
+    problems = []
+    for account_id, balance in connection.execute(
+        select(snapshots.c.account_id, snapshots.c.balance).where(snapshots.c.as_of == last)
+    ):
+        if abs(balance - replayed.get(account_id, 0.0)) > TOLERANCE:
+            problems.append(f'snapshot {account_id} as of {last}: {balance} != postings {replayed.get(account_id, 0.0)}')
+    return problems
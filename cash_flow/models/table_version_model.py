@@ -0,0 +1,9 @@
+from sqlalchemy import Integer, String
+from extensions import db
+
+class TableVersion(db.Model):
+    """Write counter of a table, bumped by cash_flow.models.table_versions whenever the table changes."""
+    __tablename__ = 'table_versions'
+
+    table_name = db.Column(String(64), primary_key=True)
+    version = db.Column(Integer, nullable=False, default=0)
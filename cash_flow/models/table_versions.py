@@ -0,0 +1,75 @@
+from typing import Dict, Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from .table_version_model import TableVersion
+
+# Tables whose writes are counted; these are the ones behind cached list views
+VERSIONED_TABLES = ('accounts', 'vendors', 'product_services')
+
+# connection.info key holding the versioned tables written since the last bump
+_PENDING_KEY = 'cash_flow_pending_table_versions'
+
+def bump_versions(connection, tables: Iterable[str]):
+    """Increment the version of each table in the current transaction, starting its counter at 1."""
+    tables = sorted(tables)
+    if not tables:
+        return
+    versions = TableVersion.__table__
+    dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+    statement = dialect.insert(versions)
+    statement = statement.on_conflict_do_update(
+        index_elements=['table_name'], set_={'version': versions.c.version + 1},
+    )
+    connection.execute(statement, [{'table_name': table, 'version': 1} for table in tables])
+
+def table_versions(connection, tables: Iterable[str]) -> Dict[str, int]:
+    """
+    Read the current version of each table.
+
+    Returns:
+        Dict[str, int]: Version by table name; tables without a counter row read as 0.
+    """
+    tables = list(tables)
+    versions = TableVersion.__table__
+    found = dict(connection.execute(
+        select(versions.c.table_name, versions.c.version).where(versions.c.table_name.in_(tables))
+    ).all())
+    return {table: found.get(table, 0) for table in tables}
+
+def _flush_pending(connection):
+    """Bump the tables written on a connection since its last bump."""
+    pending = connection.info.pop(_PENDING_KEY, None)
+    if pending:
+        bump_versions(connection, pending)
+
+@event.listens_for(Engine, 'after_execute')
+def record_table_writes(connection, clauseelement, multiparams, params, execution_options, result):
+    """
+    Note every INSERT, UPDATE or DELETE of a versioned table.
+
+    Listening on the Core connection catches ORM flushes as well as the
+    Core writes of the bulk endpoints, the CSV importer and the ledger
+    listeners that move account balances.
+    """
+    if getattr(clauseelement, 'is_dml', False):
+        name = getattr(clauseelement.table, 'name', None)
+        if name in VERSIONED_TABLES:
+            connection.info.setdefault(_PENDING_KEY, set()).add(name)
+
+@event.listens_for(Session, 'after_flush_postexec')
+def bump_flushed_tables(session, flush_context):
+    """Bump the versions of the tables a flush wrote, including writes made by other after_flush listeners."""
+    _flush_pending(session.connection())
+
+@event.listens_for(Engine, 'commit')
+def bump_committed_tables(connection):
+    """Bump the versions of tables written outside a flush, such as bulk Core inserts, before they commit."""
+    _flush_pending(connection)
+
+@event.listens_for(Engine, 'rollback')
+def discard_pending_tables(connection):
+    """Forget the writes of a transaction that was rolled back."""
+    connection.info.pop(_PENDING_KEY, None)
@@ -7,17 +7,9 @@ class Transaction(BaseModel):
 
     name = db.Column(Float, nullable=False)
     description = db.Column(String(100), nullable=True)
-    user_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False)
-    account_id = db.Column(db.String(36), ForeignKey('accounts.id'), nullable=False)
+    user_id = db.Column(db.String(36), ForeignKey('users.id'), nullable=False, index=True)
+    account_id = db.Column(db.String(36), ForeignKey('accounts.id'), nullable=False, index=True)
     transaction_type = db.Column(String(50), nullable=False)  # e.g., 'income', 'expense', 'transfer'
-
-    def to_dict(self):
-        obj_dict = super().to_dict()
-        obj_dict.update({
-            'name': self.name,
-            'description': self.description,
-            'user_id': self.user_id,
-            'account_id': self.account_id,
-            'transaction_type': self.transaction_type
-        })
-        return obj_dict
+    amount = db.Column(Float, nullable=True)  # Posted to the account ledger for income and expense transactions
+    income_category_id = db.Column(db.String(36), ForeignKey('income_category.id'), nullable=True)  # Set for income
+    expense_category_id = db.Column(db.String(36), ForeignKey('expense_category.id'), nullable=True)  # Set for expenses
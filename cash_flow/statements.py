@@ -0,0 +1,259 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from jinja2 import Environment
+from sqlalchemy import Date, String, and_, create_engine, func, literal, select, true, type_coerce, union_all
+from cash_flow.models.customer_model import Customer
+from cash_flow.models.invoice_model import Invoice
+from cash_flow.models.payment import Payment
+
+STATEMENT_FORMATS = ('json', 'html')
+
+# File suffix and media type of each format; JSON statements are written one per line
+STATEMENT_MEDIA = {'json': ('ndjson', 'application/x-ndjson'), 'html': ('html', 'text/html')}
+
+HTML_HEADER = '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Customer statements</title></head><body>\n'
+HTML_FOOTER = '</body></html>\n'
+
+HTML_STATEMENT = Environment(autoescape=True).from_string('''<section class="statement" id="customer-{{ s.customer.id }}">
+<h2>{{ s.customer.name }}</h2>
+<p>{{ s.customer.address }}<br>{{ s.customer.email }}</p>
+<p>Statement for {{ s.period.from }} to {{ s.period.to }}</p>
+<table>
+<thead><tr><th>Date</th><th>Type</th><th>Reference</th><th>Due</th><th>Amount</th><th>Balance</th></tr></thead>
+<tbody>
+<tr><td>{{ s.period.from }}</td><td colspan="4">Opening balance</td><td>{{ '%.2f'|format(s.opening_balance) }}</td></tr>
+{% for line in s.lines %}<tr><td>{{ line.date }}</td><td>{{ line.type }}</td><td>{{ line.id }}</td><td>{{ line.due_date or '' }}</td><td>{{ '%.2f'|format(line.amount) }}</td><td>{{ '%.2f'|format(line.balance) }}</td></tr>
+{% endfor %}<tr><td>{{ s.period.to }}</td><td colspan="4">Closing balance</td><td>{{ '%.2f'|format(s.closing_balance) }}</td></tr>
+</tbody>
+</table>
+</section>
+''')
+
+def _period_bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    """Return the [start, end] period as half-open datetimes for comparing with created_at."""
+    return datetime.combine(start, time.min), datetime.combine(end + timedelta(days=1), time.min)
+
+def _customer_range(column, after: Optional[str], through: Optional[str], customer_id: Optional[str] = None):
+    """Restrict a customer id column to (after, through], or to one customer."""
+    conditions = [column == customer_id] if customer_id is not None else []
+    if after is not None:
+        conditions.append(column > after)
+    if through is not None:
+        conditions.append(column <= through)
+    return and_(*conditions) if conditions else true()
+
+def opening_balances(connection, start: date, after: Optional[str] = None, through: Optional[str] = None,
+                     customer_id: Optional[str] = None) -> Dict[str, float]:
+    """
+    Return what each customer owed before `start`: invoices created before it less payments dated before it.
+
+    Args:
+        connection: A database connection.
+        start (date): First day of the statement period.
+        after (Optional[str]): Only customers with a greater id.
+        through (Optional[str]): Only customers with this id or a smaller one.
+        customer_id (Optional[str]): Only this customer.
+
+    Returns:
+        Dict[str, float]: Opening balance by customer id, for customers with earlier activity.
+    """
+    invoices = Invoice.__table__
+    payments = Payment.__table__
+    period_start, _ = _period_bounds(start, start)
+    in_range = _customer_range(invoices.c.customer_id, after, through, customer_id)
+    invoiced = (
+        select(invoices.c.customer_id, invoices.c.total_amount.label('amount'))
+        .where(invoices.c.deleted_at.is_(None), invoices.c.created_at < period_start, in_range)
+    )
+    paid = (
+        select(invoices.c.customer_id, (-payments.c.amount).label('amount'))
+        .select_from(payments)
+        .join(invoices, invoices.c.id == payments.c.invoice_id)
+        .where(payments.c.deleted_at.is_(None), invoices.c.deleted_at.is_(None), payments.c.payment_date < start, in_range)
+    )
+    activity = union_all(invoiced, paid).subquery()
+    rows = connection.execute(
+        select(activity.c.customer_id, func.sum(activity.c.amount)).group_by(activity.c.customer_id)
+    )
+    return {customer_id: amount for customer_id, amount in rows}
+
+def statement_lines(start: date, end: date, after: Optional[str], through: Optional[str], customer_id: Optional[str]):
+    """Select every invoice and payment in the period, ordered by customer, then date, invoices first."""
+    invoices = Invoice.__table__
+    payments = Payment.__table__
+    period_start, period_end = _period_bounds(start, end)
+    in_range = _customer_range(invoices.c.customer_id, after, through, customer_id)
+    invoiced = (
+        select(
+            invoices.c.customer_id, type_coerce(func.date(invoices.c.created_at), Date).label('date'),
+            literal('invoice', String).label('type'), invoices.c.id, invoices.c.due_date,
+            invoices.c.total_amount.label('amount'),
+        )
+        .where(invoices.c.deleted_at.is_(None), invoices.c.created_at >= period_start,
+               invoices.c.created_at < period_end, in_range)
+    )
+    paid = (
+        select(
+            invoices.c.customer_id, payments.c.payment_date.label('date'),
+            literal('payment', String).label('type'), payments.c.id, literal(None, Date).label('due_date'),
+            (-payments.c.amount).label('amount'),
+        )
+        .select_from(payments)
+        .join(invoices, invoices.c.id == payments.c.invoice_id)
+        .where(payments.c.deleted_at.is_(None), invoices.c.deleted_at.is_(None),
+               payments.c.payment_date >= start, payments.c.payment_date <= end, in_range)
+    )
+    lines = union_all(invoiced, paid).subquery()
+    return select(lines).order_by(lines.c.customer_id, lines.c.date, lines.c.type, lines.c.id)
+
+def iter_statements(connection, start: date, end: date, after: Optional[str] = None, through: Optional[str] = None,
+                    customer_id: Optional[str] = None, batch_size: int = 1000) -> Iterator[dict]:
+    """
+    Yield the statement of every active customer for the period, in customer id order.
+
+    Three queries serve any number of customers: the customers, their
+    opening balances, and every invoice and payment line of the period
+    sorted by customer. Customers and lines are streamed with yield_per
+    and merged as they arrive, so memory holds one batch of each plus the
+    opening balances.
+
+    Args:
+        connection: A database connection.
+        start (date): First day of the period.
+        end (date): Last day of the period.
+        after (Optional[str]): Only customers with a greater id.
+        through (Optional[str]): Only customers with this id or a smaller one.
+        customer_id (Optional[str]): Only this customer.
+        batch_size (int): Rows fetched per round trip.
+
+    Yields:
+        dict: customer, period, opening_balance, lines (with running balance), totals and closing_balance.
+    """
+    customers = Customer.__table__
+    openings = opening_balances(connection, start, after, through, customer_id)
+    streaming = connection.execution_options(yield_per=batch_size)
+    customer_rows = streaming.execute(
+        select(customers.c.id, customers.c.first_name, customers.c.last_name, customers.c.email, customers.c.address)
+        .where(customers.c.deleted_at.is_(None), _customer_range(customers.c.id, after, through, customer_id))
+        .order_by(customers.c.id)
+    )
+    line_rows = iter(streaming.execute(statement_lines(start, end, after, through, customer_id)))
+    period = {'from': start.isoformat(), 'to': end.isoformat()}
+
+    pending = next(line_rows, None)
+    for customer in customer_rows:
+        # Lines of customers that are soft deleted sort before the next active one and are skipped
+        while pending is not None and pending.customer_id < customer.id:
+            pending = next(line_rows, None)
+        balance = opening = openings.get(customer.id, 0.0)
+        lines: List[dict] = []
+        invoiced = paid = 0.0
+        while pending is not None and pending.customer_id == customer.id:
+            balance += pending.amount
+            if pending.type == 'invoice':
+                invoiced += pending.amount
+            else:
+                paid -= pending.amount
+            lines.append({
+                'date': pending.date.isoformat(), 'type': pending.type, 'id': pending.id,
+                'due_date': pending.due_date.isoformat() if pending.due_date else None,
+                'amount': pending.amount, 'balance': balance,
+            })
+            pending = next(line_rows, None)
+        yield {
+            'customer': {
+                'id': customer.id, 'name': f'{customer.first_name} {customer.last_name}',
+                'email': customer.email, 'address': customer.address,
+            },
+            'period': period,
+            'opening_balance': opening,
+            'lines': lines,
+            'invoiced': invoiced,
+            'paid': paid,
+            'closing_balance': balance,
+        }
+
+def render_statement(statement: dict, fmt: str) -> str:
+    """Render one statement as a line of JSON or an HTML section."""
+    if fmt == 'json':
+        return json.dumps(statement, separators=(',', ':')) + '\n'
+    return HTML_STATEMENT.render(s=statement)
+
+def render_statements(statements: Iterator[dict], fmt: str) -> Iterator[str]:
+    """Render statements as newline-delimited JSON or one HTML document."""
+    if fmt == 'html':
+        yield HTML_HEADER
+    for statement in statements:
+        yield render_statement(statement, fmt)
+    if fmt == 'html':
+        yield HTML_FOOTER
+
+def customer_partitions(connection, parts: int) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Split the active customers into up to `parts` contiguous (after, through] id ranges of similar size.
+
+    Returns:
+        List[Tuple[Optional[str], Optional[str]]]: Ranges covering every customer; None is unbounded.
+    """
+    customers = Customer.__table__
+    active = customers.c.deleted_at.is_(None)
+    count = connection.scalar(select(func.count()).select_from(customers).where(active))
+    size = -(-count // parts) if count else 0
+    bounds: List[Optional[str]] = [None]
+    for offset in range(size, count, size or 1):
+        bounds.append(connection.scalar(
+            select(customers.c.id).where(active).order_by(customers.c.id).offset(offset - 1).limit(1)
+        ))
+    bounds.append(None)
+    return list(zip(bounds, bounds[1:]))
+
+def _write_partition(database_uri: str, out_dir: str, index: int, after: Optional[str], through: Optional[str],
+                     start: date, end: date, fmt: str, batch_size: int) -> Tuple[str, int]:
+    """Write the statements of one customer range to its own file; runs in a worker process."""
+    engine = create_engine(database_uri)
+    suffix, _ = STATEMENT_MEDIA[fmt]
+    path = os.path.join(out_dir, f'statements-{start.isoformat()}-{end.isoformat()}-{index:03d}.{suffix}')
+    written = 0
+    try:
+        with engine.connect() as connection, open(path, 'w', encoding='utf-8') as out:
+            def counted():
+                nonlocal written
+                for statement in iter_statements(connection, start, end, after, through, batch_size=batch_size):
+                    written += 1
+                    yield statement
+            for chunk in render_statements(counted(), fmt):
+                out.write(chunk)
+    finally:
+        engine.dispose()
+    return path, written
+
+def write_statements(database_uri: str, out_dir: str, start: date, end: date, fmt: str,
+                     workers: int, batch_size: int) -> List[Tuple[str, int]]:
+    """
+    Generate the statements of every customer on a pool of worker processes.
+
+    Customers are split into one id range per worker. Each worker opens
+    its own connection, streams its range through iter_statements and
+    writes one file, so rendering runs in parallel and no worker holds
+    more than a batch of rows.
+
+    Returns:
+        List[Tuple[str, int]]: (file path, statements written) per range.
+    """
+    engine = create_engine(database_uri)
+    try:
+        with engine.connect() as connection:
+            partitions = customer_partitions(connection, workers)
+    finally:
+        engine.dispose()
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_write_partition, database_uri, out_dir, index, after, through, start, end, fmt, batch_size)
+            for index, (after, through) in enumerate(partitions)
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,321 @@
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import select
+from cash_flow.models import Customer, ProductService
+
+def normalize_name(name: str) -> str:
+    """Fold case, strip accents and collapse whitespace so lookups ignore them."""
+    if name.isascii():
+        return ' '.join(name.lower().split())
+    decomposed = unicodedata.normalize('NFKD', name.casefold())
+    return ' '.join(''.join(ch for ch in decomposed if not unicodedata.combining(ch)).split())
+
+def trigrams(text: str) -> set:
+    """Return the distinct three-character substrings of a normalized string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def word_suffixes(norm: str) -> List[str]:
+    """Return a normalized name from each of its word starts: 'jane smith' gives 'jane smith' and 'smith'."""
+    suffixes = [norm]
+    space = norm.find(' ')
+    while space != -1:
+        suffixes.append(norm[space + 1:])
+        space = norm.find(' ', space + 1)
+    return suffixes
+
+class TypeaheadIndex:
+    """
+    In-memory autocomplete index over the names of one kind of entity.
+
+    Every indexed name gets a slot number. A sorted array of the name from
+    each word start (with its slot) answers prefix lookups by bisection,
+    so "smi" finds "Jane Smith". Trigram postings, arrays of slots in
+    ascending order, answer infix lookups: the shortest posting of the
+    query's trigrams is scanned and each slot is checked against its name.
+
+    Changes never shift slots: a renamed or removed entity marks its slot
+    dead and a rename appends a new slot, so postings stay sorted by
+    appending. Names added after load() go to a small sorted delta array
+    instead of the main one, which would have to move millions of entries
+    per insert. Dead slots and the delta are folded in when the index is
+    rebuilt.
+    """
+
+    def __init__(self):
+        self._ids: List[Optional[str]] = []  # Entity id by slot; None once the slot is dead
+        self._names: List[str] = []  # Display name by slot
+        self._norms: List[str] = []  # Normalized name by slot
+        self._slot_by_id: Dict[str, int] = {}
+        self._keys: List[str] = []  # Normalized name from each word start, sorted
+        self._key_slots = array('i')  # Slot of each key
+        self._delta_keys: List[str] = []  # Keys of names added since load(), sorted
+        self._delta_slots: List[int] = []
+        self._postings: Dict[str, array] = {}
+        self._string_bytes = 0
+        self.dead = 0
+
+    def __len__(self):
+        return len(self._slot_by_id)
+
+    def _add(self, entity_id: str, name: str) -> Tuple[int, List[str]]:
+        """Give a name a new slot and post its trigrams; return the slot and its prefix keys for the caller to place."""
+        norm = normalize_name(name)
+        slot = len(self._ids)
+        self._ids.append(entity_id)
+        self._names.append(name)
+        self._norms.append(norm)
+        self._slot_by_id[entity_id] = slot
+        self._string_bytes += sys.getsizeof(entity_id) + sys.getsizeof(name) + sys.getsizeof(norm)
+        for gram in trigrams(norm):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array('i')
+                self._string_bytes += sys.getsizeof(gram)
+            postings.append(slot)
+        keys = word_suffixes(norm)
+        self._string_bytes += sum(sys.getsizeof(key) for key in keys[1:])
+        return slot, keys
+
+    def upsert(self, entity_id: str, name: str):
+        """Index an entity under its current name, replacing any previous name."""
+        slot = self._slot_by_id.get(entity_id)
+        if slot is not None:
+            if self._names[slot] == name:
+                return
+            self.remove(entity_id)
+        slot, keys = self._add(entity_id, name)
+        for key in keys:
+            position = bisect_left(self._delta_keys, key)
+            self._delta_keys.insert(position, key)
+            self._delta_slots.insert(position, slot)
+
+    def remove(self, entity_id: str):
+        """Stop returning an entity; its slot stays in the arrays until the index is rebuilt."""
+        slot = self._slot_by_id.pop(entity_id, None)
+        if slot is not None:
+            self._ids[slot] = None
+            self.dead += 1
+
+    def load(self, rows: Iterable[Tuple[str, str]]):
+        """Index (id, name) pairs in bulk into an empty index, sorting the prefix keys once."""
+        pairs = []
+        for entity_id, name in rows:
+            slot, keys = self._add(entity_id, name)
+            pairs.extend((key, slot) for key in keys)
+        pairs.sort()
+        self._keys = [key for key, _ in pairs]
+        self._key_slots = array('i', (slot for _, slot in pairs))
+
+    def lookup(self, query: str, limit: int) -> List[Tuple[str, str]]:
+        """
+        Return up to `limit` (id, name) pairs matching a query.
+
+        Names with a word starting with the query come first, in alphabetical
+        order of the matching word; names containing the query elsewhere
+        fill the rest, in the order they were indexed.
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+        found: List[int] = []
+        seen = set()
+        prefixed = sorted(
+            self._prefixed(self._keys, self._key_slots, query, limit)
+            + self._prefixed(self._delta_keys, self._delta_slots, query, limit)
+        )
+        for _, slot in prefixed:
+            if slot not in seen:
+                seen.add(slot)
+                found.append(slot)
+                if len(found) == limit:
+                    break
+
+        grams = trigrams(query)
+        if len(found) < limit and grams:
+            shortest = min((self._postings.get(gram, ()) for gram in grams), key=len)
+            norms = self._norms
+            for slot in shortest:
+                if self._ids[slot] is not None and slot not in seen and query in norms[slot]:
+                    seen.add(slot)
+                    found.append(slot)
+                    if len(found) == limit:
+                        break
+        return [(self._ids[slot], self._names[slot]) for slot in found]
+
+    def _prefixed(self, keys: List[str], slots, query: str, limit: int) -> List[Tuple[str, int]]:
+        """Return the first `limit` live (key, slot) pairs of a sorted key array that start with the query."""
+        matches = []
+        position = bisect_left(keys, query)
+        while len(matches) < limit and position < len(keys) and keys[position].startswith(query):
+            slot = slots[position]
+            if self._ids[slot] is not None:
+                matches.append((keys[position], slot))
+            position += 1
+        return matches
+
+    def memory(self) -> int:
+        """Estimate the bytes held by the index: its containers plus every string and array they reference."""
+        containers = (
+            sys.getsizeof(self._ids) + sys.getsizeof(self._names) + sys.getsizeof(self._norms)
+            + sys.getsizeof(self._slot_by_id) + sys.getsizeof(self._keys) + sys.getsizeof(self._key_slots)
+            + sys.getsizeof(self._delta_keys) + sys.getsizeof(self._delta_slots) + sys.getsizeof(self._postings)
+        )
+        return containers + self._string_bytes + sum(sys.getsizeof(postings) for postings in self._postings.values())
+
+    def stats(self) -> dict:
+        """Return entry, key and posting counts and the estimated memory footprint."""
+        return {
+            "entries": len(self._slot_by_id),
+            "dead_slots": self.dead,
+            "prefix_keys": len(self._keys) + len(self._delta_keys),
+            "trigrams": len(self._postings),
+            "postings": sum(len(postings) for postings in self._postings.values()),
+            "memory_bytes": self.memory(),
+        }
+
+def _customer_name(row) -> str:
+    return f'{row.first_name} {row.last_name}'
+
+def _product_name(row) -> str:
+    return row.name
+
+# kind -> (model, columns read, display name of a row)
+TYPEAHEAD_SOURCES: Dict[str, Tuple[type, tuple, Callable]] = {
+    'customer': (Customer, (Customer.first_name, Customer.last_name), _customer_name),
+    'product_service': (ProductService, (ProductService.name,), _product_name),
+}
+
+class Typeahead:
+    """
+    Per-worker typeahead indexes of customer and product names.
+
+    Each index is built on its first lookup. Afterwards, at most once every
+    `max_staleness` seconds, rows updated since the last refresh are read
+    through the (updated_at, id) index and applied, so writes from any
+    worker show up; re-reading an `overlap` window before the watermark
+    catches transactions that commit late. Soft-deleted rows are removed.
+    Hard deletes leave no row to read, so every `rebuild_interval` seconds
+    the index is rebuilt from scratch, which also drops dead slots.
+
+    One thread at a time refreshes or rebuilds a kind. It reads the rows
+    and builds a new index without holding the lock lookups take, then
+    swaps the new index in, or applies the changes it read, under that
+    lock; meanwhile other threads keep answering from the current index.
+    """
+
+    def __init__(self, max_staleness: float, rebuild_interval: float, overlap: float = 5.0):
+        self.max_staleness = max_staleness
+        self.rebuild_interval = rebuild_interval
+        self.overlap = timedelta(seconds=overlap)
+        self._indexes: Dict[str, TypeaheadIndex] = {}
+        self._watermarks: Dict[str, datetime] = {}
+        self._built_at: Dict[str, float] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        self._build_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()  # Held briefly, by lookups and to swap in or apply changes
+        self._refresh_locks = {kind: threading.Lock() for kind in TYPEAHEAD_SOURCES}
+        self.lookups = 0
+
+    def _build(self, session, kind: str):
+        """Load every active row of a kind into a new index, then swap it in for the current one."""
+        model, columns, display = TYPEAHEAD_SOURCES[kind]
+        started = time.monotonic()
+        watermark = datetime.utcnow()
+        rows = session.execute(select(model.id, *columns).where(model.deleted_at.is_(None)))
+        index = TypeaheadIndex()
+        index.load((row.id, display(row)) for row in rows)
+        built_at = time.monotonic()
+        with self._lock:
+            self._indexes[kind] = index
+            self._watermarks[kind] = watermark
+            self._built_at[kind] = self._refreshed_at[kind] = built_at
+            self._build_seconds[kind] = built_at - started
+
+    def _apply_changes(self, session, kind: str):
+        """Read rows updated since the watermark, less the overlap window, then apply them to the current index."""
+        model, columns, display = TYPEAHEAD_SOURCES[kind]
+        watermark = datetime.utcnow()
+        rows = session.execute(
+            select(model.id, model.deleted_at, *columns)
+            .where(model.updated_at >= self._watermarks[kind] - self.overlap)
+            .order_by(model.updated_at, model.id)
+        ).all()
+        with self._lock:
+            index = self._indexes[kind]
+            for row in rows:
+                if row.deleted_at is None:
+                    index.upsert(row.id, display(row))
+                else:
+                    index.remove(row.id)
+            self._watermarks[kind] = watermark
+            self._refreshed_at[kind] = time.monotonic()
+
+    def _due(self, kind: str) -> Optional[Callable]:
+        """Return the method that would bring a kind's index up to date, or None if it is fresh."""
+        now = time.monotonic()
+        with self._lock:
+            if kind not in self._indexes or now - self._built_at[kind] >= self.rebuild_interval:
+                return self._build
+            if now - self._refreshed_at[kind] >= self.max_staleness:
+                return self._apply_changes
+            return None
+
+    def _ensure_fresh(self, session, kind: str):
+        if self._due(kind) is None:
+            return
+        refresh_lock = self._refresh_locks[kind]
+        # Wait for the first build, but serve the current index while another thread refreshes it
+        with self._lock:
+            built = kind in self._indexes
+        if not refresh_lock.acquire(blocking=not built):
+            return
+        try:
+            # Checked again, as the thread that held the refresh lock may have just done it
+            update = self._due(kind)
+            if update is not None:
+                update(session, kind)
+        finally:
+            refresh_lock.release()
+
+    def lookup(self, session, kind: str, query: str, limit: int) -> List[dict]:
+        """Return up to `limit` {id, name} matches for a query, building or refreshing the index first if needed."""
+        self._ensure_fresh(session, kind)
+        with self._lock:
+            self.lookups += 1
+            return [{'id': entity_id, 'name': name} for entity_id, name in self._indexes[kind].lookup(query, limit)]
+
+    def stats(self) -> dict:
+        """Return the size, memory footprint and age of each index built so far."""
+        with self._lock:
+            now = time.monotonic()
+            indexes = {}
+            for kind, index in self._indexes.items():
+                indexes[kind] = {
+                    **index.stats(),
+                    "build_seconds": self._build_seconds[kind],
+                    "seconds_since_build": now - self._built_at[kind],
+                    "seconds_since_refresh": now - self._refreshed_at[kind],
+                }
+            return {
+                "lookups": self.lookups,
+                "memory_bytes": sum(entry["memory_bytes"] for entry in indexes.values()),
+                "indexes": indexes,
+            }
+
+def init_typeahead(app) -> Typeahead:
+    """Create the typeahead indexes for an app from its config; they are built on first use."""
+    typeahead = Typeahead(app.config['TYPEAHEAD_MAX_STALENESS'], app.config['TYPEAHEAD_REBUILD_INTERVAL'])
+    app.extensions['typeahead'] = typeahead
+    return typeahead
+
+def get_typeahead() -> Typeahead:
+    """Return the typeahead indexes of the current app."""
+    return current_app.extensions['typeahead']
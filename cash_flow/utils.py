@@ -0,0 +1,35 @@
+# utils.py
+import re
+from typing import Optional
+
+_NON_DIGITS = re.compile(r'\D')
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """
+    Normalize an email address for duplicate detection.
+
+    Args:
+        email (Optional[str]): The raw email address.
+
+    Returns:
+        Optional[str]: The trimmed, lower-cased address, or None if empty.
+    """
+    if not email:
+        return None
+    normalized = email.strip().lower()
+    return normalized or None
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Normalize a phone number for duplicate detection by keeping only its digits.
+
+    Args:
+        phone (Optional[str]): The raw phone number.
+
+    Returns:
+        Optional[str]: The digits of the number, or None if it has none.
+    """
+    if not phone:
+        return None
+    normalized = _NON_DIGITS.sub('', phone)
+    return normalized or None
@@ -1,10 +1,17 @@
 from .account_view import create_account
 from .blueprint import cash_flow
-from .customer_view import create_customer, update_customer, soft_delete_customer, delete_customer, restore_customer, get_all_customers
+from .customer_view import create_customer, update_customer, soft_delete_customer, delete_customer, restore_customer, get_all_customers, merge_duplicate_customers
 from .customer_contact_view import create_customer_contact, update_customer_contact, soft_delete_customer_contact, delete_customer_contact
 from .vendor_view import create_vendor, get_vendors, update_vendor, soft_delete_vendor, restore_vendor, delete_vendor
 from .vendor_contact_view import create_vendor_contact, update_vendor_contact, get_vendor_contacts, soft_delete_vendor_contact, restore_vendor_contact, delete_vendor_contact
 from .product_service_view import create_product_service, get_all, update_product_service, restore_product_service, delete_product_service
 from .invoice_view import create_invoice, get_all_invoices, update_invoice, soft_delete_invoice, restore_invoice, delete_invoice
 from .payment_view import create_payment, get_db_session, update_payment, soft_delete_payment, restore_payment, delete_payment
-from .transfer_view import create_transfer, get_transfer, update_transfer, soft_delete_transfer, restore_transfer, delete_transfer
\ No newline at end of file
+from .transfer_view import create_transfer, get_transfer, update_transfer, soft_delete_transfer, restore_transfer, delete_transfer
+from .export_view import export_csv
+from .report_view import get_cash_flow_report, get_receivables_aging
+from .statement_view import stream_statements, get_customer_statement
+from .changes_view import get_changes
+from .search_view import search_entities
+from .typeahead_view import typeahead
+from .admin_view import list_cache_stats, typeahead_stats
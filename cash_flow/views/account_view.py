@@ -5,6 +5,9 @@ from extensions import db
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import uuid
 from .blueprint import cash_flow
+from .list_cache import cached_paginated_response
+from .export_view import parse_date_arg, EXPORT_ERRORS
+from cash_flow.models.snapshots import balances_as_of
 
 @cash_flow.route('/create_account', methods=['POST'])
 #@jwt_required()
@@ -56,9 +59,55 @@ def get_all_accounts():
     """
     try:
         # Filter accounts where deleted_at is None
-        accounts = Account.query.filter(Account.deleted_at.is_(None)).all()
-        accounts_list = [account.to_dict() for account in accounts]  # Serialize accounts
-        return jsonify(accounts_list), 200
+        accounts = Account.query.filter(Account.deleted_at.is_(None))
+        return cached_paginated_response(accounts, Account)  # Serialize one page of accounts
+    except Exception as e:
+        return jsonify({
+            "error": "An unexpected error occurred",
+            "details": str(e)
+        }), 500
+
+@cash_flow.route('/accounts/<string:account_id>/balance', methods=['GET'])
+def get_account_balance(account_id):
+    """
+    Return an account's balance, kept current by the ledger on every transfer and payment.
+    With `?as_of=YYYY-MM-DD` return its balance at the end of that day instead.
+    """
+    try:
+        is_valid, as_of = parse_date_arg('as_of')
+        if not is_valid:
+            return jsonify({"error": EXPORT_ERRORS['invalid_date'].format('as_of')}), 400
+
+        # A primary key lookup of one column, no postings are summed
+        row = Account.active_query().with_entities(Account.balance).filter(Account.id == account_id).first()
+        if row is None:
+            return jsonify({"error": "Account not found"}), 404
+        if as_of is None:
+            return jsonify({"account_id": account_id, "balance": row.balance or 0.0}), 200
+
+        balances = balances_as_of(db.session.connection(), as_of, [account_id])
+        return jsonify({"account_id": account_id, "as_of": as_of.isoformat(), "balance": balances.get(account_id, 0.0)}), 200
+
+    except Exception as e:
+        return jsonify({
+            "error": "An unexpected error occurred",
+            "details": str(e)
+        }), 500
+
+@cash_flow.route('/accounts/balances', methods=['GET'])
+def get_account_balances():
+    """
+    Return the balance of every account (or of the `account_id` values given) at the end of `as_of`.
+    """
+    try:
+        is_valid, as_of = parse_date_arg('as_of')
+        if not is_valid or as_of is None:
+            return jsonify({"error": EXPORT_ERRORS['invalid_date'].format('as_of')}), 400
+
+        account_ids = request.args.getlist('account_id') or None
+        balances = balances_as_of(db.session.connection(), as_of, account_ids)
+        return jsonify({"as_of": as_of.isoformat(), "balances": balances}), 200
+
     except Exception as e:
         return jsonify({
             "error": "An unexpected error occurred",
@@ -0,0 +1,20 @@
+from flask import jsonify
+from flask_jwt_extended import jwt_required
+from auth.utils import roles_required
+from cash_flow.typeahead import get_typeahead
+from .blueprint import cash_flow
+from .list_cache import get_list_cache
+
+@cash_flow.route('/admin/list-cache-stats', methods=['GET'])
+@jwt_required()
+@roles_required('admin')
+def list_cache_stats():
+    """Report list cache hits, misses and size for this worker."""
+    return jsonify(get_list_cache().stats()), 200
+
+@cash_flow.route('/admin/typeahead-stats', methods=['GET'])
+@jwt_required()
+@roles_required('admin')
+def typeahead_stats():
+    """Report the size and memory footprint of this worker's typeahead indexes."""
+    return jsonify(get_typeahead().stats()), 200
@@ -0,0 +1,177 @@
+# bulk.py
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Type
+
+from flask import current_app, jsonify, request
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from extensions import db
+from .utils import logger, ERROR_MESSAGES, validate_batch_with_pydantic
+
+# Error messages shared by the bulk create views
+BULK_ERRORS = {
+    'not_a_list': 'Request body must be a JSON array',
+    'too_many_items': 'A bulk request may contain at most {} items',
+    'validation_failed': 'Validation failed',
+    'database_error': 'Database error occurred',
+}
+
+# Ids per IN (...) lookup, kept well under SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+def chunked(items: List, size: int) -> Iterable[List]:
+    """Yield successive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def find_existing(column, values: Iterable, active_only: bool = True) -> Set:
+    """
+    Return which of the given values exist in a column, using batched IN lookups.
+
+    Args:
+        column: The model column to look in (e.g. Customer.id).
+        values (Iterable): The values to look up.
+        active_only (bool): Ignore soft-deleted rows.
+
+    Returns:
+        Set: The values that were found.
+    """
+    model = column.class_
+    wanted = list({value for value in values if value is not None})
+    found = set()
+    for chunk in chunked(wanted, LOOKUP_CHUNK_SIZE):
+        query = select(column).where(column.in_(chunk))
+        if active_only:
+            query = query.where(model.deleted_at.is_(None))
+        found.update(db.session.execute(query).scalars())
+    return found
+
+def check_references(rows: Dict[int, Dict], field: str, column, message: str) -> Dict[int, str]:
+    """
+    Flag rows whose `field` does not reference an active row of `column`.
+
+    Rows where the field is None are not checked, so optional references pass.
+
+    Returns:
+        Dict[int, str]: error message by row index.
+    """
+    existing = find_existing(column, (row[field] for row in rows.values()))
+    return {index: message for index, row in rows.items()
+            if row[field] is not None and row[field] not in existing}
+
+def check_unique(rows: Dict[int, Dict], field: str, column, message: str,
+                 normalize: Callable = lambda value: value) -> Dict[int, str]:
+    """
+    Flag rows whose normalized `field` is already taken in `column`, or repeats an earlier row of the batch.
+
+    Returns:
+        Dict[int, str]: error message by row index.
+    """
+    values = {index: normalize(row[field]) for index, row in rows.items()}
+    taken = find_existing(column, values.values(), active_only=False)
+    errors = {}
+    for index, value in values.items():
+        if value is None:
+            continue
+        if value in taken:
+            errors[index] = message
+        taken.add(value)
+    return errors
+
+def _parse_flag(name: str) -> bool:
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+def bulk_create_response(model: Type, schema: Type,
+                         prepare: Optional[Callable[[Dict], Dict]] = None,
+                         check: Optional[Callable[[Dict[int, Dict]], Dict[int, object]]] = None,
+                         after_insert: Optional[Callable[[object, List[Dict]], None]] = None):
+    """
+    Create many rows of a model from a JSON array in the request body.
+
+    Items are validated in one batched Pydantic pass, then by `check` (batched
+    reference and uniqueness lookups), and inserted with executemany in chunks
+    of BULK_CHUNK_SIZE rows. Each chunk commits on its own, so a failed chunk
+    only loses its own rows. With `?atomic=1` any failure rejects the whole
+    request and all rows are inserted in a single transaction.
+
+    Bulk inserts bypass ORM events and validators, so `prepare` must set any
+    derived columns and `after_insert` must do any follow-up work a flush would
+    have done.
+
+    Args:
+        model: The model to insert into.
+        schema: The Pydantic schema each item must match.
+        prepare: Maps a validated item to insert values.
+        check: Returns errors by index for validated items that cannot be inserted.
+        after_insert: Called with the connection and inserted values after each chunk.
+
+    Returns:
+        Response: {"created", "failed", "results"} with a 201 if every item was
+        created, 207 if only some were, and 400 if none were.
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({"error": ERROR_MESSAGES['invalid_json']}), 400
+    if not isinstance(data, list):
+        return jsonify({"error": BULK_ERRORS['not_a_list']}), 400
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if len(data) > max_items:
+        return jsonify({"error": BULK_ERRORS['too_many_items'].format(max_items)}), 413
+
+    atomic = _parse_flag('atomic')
+    rows, failures = validate_batch_with_pydantic(schema, data)
+    results: Dict[int, Dict] = {
+        index: {"index": index, "error": BULK_ERRORS['validation_failed'], "details": details}
+        for index, details in failures.items()
+    }
+    if check and rows:
+        for index, error in check(rows).items():
+            results[index] = {"index": index, "error": error}
+            del rows[index]
+
+    if atomic and results:
+        return _bulk_result(results, 0, len(data)), 400
+
+    values = []
+    for index, row in rows.items():
+        row = prepare(row) if prepare else row
+        values.append({**row, 'id': str(uuid.uuid4())})
+    indexes = list(rows)
+
+    created = 0
+    chunk_size = len(values) if atomic else current_app.config['BULK_CHUNK_SIZE']
+    session = db.session
+    for start in range(0, len(values), max(chunk_size, 1)):
+        chunk = values[start:start + chunk_size]
+        # Stamped per chunk, just before it commits, so the changes feed and list ETags never see a
+        # chunk appear with an updated_at older than rows other requests committed in the meantime
+        now = datetime.utcnow()
+        for row in chunk:
+            row['created_at'] = row['updated_at'] = now
+        try:
+            session.execute(insert(model), chunk)
+            if after_insert:
+                after_insert(session.connection(), chunk)
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Bulk insert into {model.__tablename__} failed: {str(e)}")
+            if atomic:
+                return jsonify({"error": BULK_ERRORS['database_error'], "details": str(e)}), 500
+            for index in indexes[start:start + chunk_size]:
+                results[index] = {"index": index, "error": BULK_ERRORS['database_error'], "details": str(e)}
+            continue
+        for index, row in zip(indexes[start:start + chunk_size], chunk):
+            results[index] = {"index": index, "id": row['id']}
+        created += len(chunk)
+
+    status = 201 if created == len(data) else 207 if created else 400
+    return _bulk_result(results, created, len(data)), status
+
+def _bulk_result(results: Dict[int, Dict], created: int, total: int):
+    return jsonify({
+        "created": created,
+        "failed": sorted(index for index, result in results.items() if 'error' in result),
+        "results": [results[index] for index in range(total) if index in results],
+    })
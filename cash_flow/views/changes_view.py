@@ -0,0 +1,151 @@
+import base64
+import binascii
+import heapq
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from flask import current_app, jsonify, request
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from sqlalchemy.exc import SQLAlchemyError
+from cash_flow.models import (
+    Account, Customer, CustomerContact, Vendor, VendorContact, ProductService, Invoice, Payment, Transfer,
+)
+from .blueprint import cash_flow
+from .pagination import PAGINATION_ERRORS, parse_limit
+from .report_view import parse_list_arg
+from .utils import logger
+
+# Entity types served by the changes feed; names are compared in this order to break updated_at ties
+CHANGE_TYPES = {
+    'account': Account,
+    'customer': Customer,
+    'customer_contact': CustomerContact,
+    'invoice': Invoice,
+    'payment': Payment,
+    'product_service': ProductService,
+    'transfer': Transfer,
+    'vendor': Vendor,
+    'vendor_contact': VendorContact,
+}
+
+CHANGES_ERRORS = {
+    'invalid_token': 'Invalid since token',
+    'invalid_types': f"types must be a comma-separated list of {', '.join(CHANGE_TYPES)}",
+}
+
+# Position in the feed: (updated_at, type, id) of the last change returned
+ChangePosition = Tuple[datetime, str, str]
+
+def encode_change_token(position: ChangePosition) -> str:
+    """Build an opaque continuation token from the position of the last change returned."""
+    updated_at, change_type, row_id = position
+    payload = json.dumps([updated_at.isoformat(), change_type, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_change_token(token: str) -> Tuple[bool, Optional[ChangePosition]]:
+    """
+    Decode a token produced by encode_change_token.
+
+    Returns:
+        Tuple[bool, Optional[ChangePosition]]: (True, position) if valid, (False, None) otherwise.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        updated_at, change_type, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return True, (datetime.fromisoformat(updated_at), str(change_type), str(row_id))
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        return False, None
+
+def changed_rows_query(change_type: str, after: Optional[ChangePosition], before: datetime, limit: int) -> Query:
+    """
+    Select up to `limit` rows of one type that follow `after` in feed order and were updated before `before`.
+
+    The feed is ordered by (updated_at, type, id), so rows of a type that
+    sorts after the token's type may share its updated_at, rows of an
+    earlier type must be strictly newer, and rows of the same type seek
+    past (updated_at, id). Each case is one range scan of ix_<table>_updated_at.
+    """
+    model = CHANGE_TYPES[change_type]
+    query = model.query.filter(model.updated_at < before)
+    if after is not None:
+        updated_at, after_type, after_id = after
+        if change_type == after_type:
+            query = query.filter(tuple_(model.updated_at, model.id) > tuple_(updated_at, after_id))
+        elif change_type > after_type:
+            query = query.filter(model.updated_at >= updated_at)
+        else:
+            query = query.filter(model.updated_at > updated_at)
+    return query.order_by(model.updated_at, model.id).limit(limit)
+
+def changed_rows(change_type: str, after: Optional[ChangePosition], before: datetime, limit: int) -> List:
+    """Fetch the rows selected by changed_rows_query."""
+    return changed_rows_query(change_type, after, before, limit).all()
+
+def change_entry(change_type: str, row) -> dict:
+    """Describe a changed row as an upsert with its data, or a tombstone if it is soft deleted."""
+    entry = {
+        'type': change_type,
+        'id': row.id,
+        'updated_at': row.updated_at.isoformat(),
+    }
+    if row.deleted_at is not None:
+        entry.update(op='delete', deleted_at=row.deleted_at.isoformat())
+    else:
+        entry.update(op='upsert', data=row.to_dict())
+    return entry
+
+@cash_flow.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    Return what changed since a continuation token, across entity types, in updated_at order.
+
+    Each type is read with its own range scan of at most `limit` + 1 rows,
+    and the results are merged, so a sync costs time proportional to the
+    number of changes rather than the size of the tables. Rows updated in
+    the last CHANGES_SETTLE_SECONDS are held back until transactions that
+    wrote them have committed, so a change is never skipped because it
+    committed after a newer one was already synced. Rows that were hard
+    deleted are gone and have no tombstone.
+
+    Query parameters:
+        since: Token returned by the previous call; every change when omitted.
+        types: Comma-separated entity types; every type in CHANGE_TYPES when omitted.
+        limit: Maximum number of changes to return.
+
+    Returns:
+        JSON with `changes`, `next_token` to pass as `since` next time, and `has_more`.
+    """
+    is_valid, change_types = parse_list_arg('types', CHANGE_TYPES)
+    if not is_valid:
+        return jsonify({"error": CHANGES_ERRORS['invalid_types']}), 400
+    is_valid, limit = parse_limit(request.args.get('limit'))
+    if not is_valid:
+        return jsonify({"error": PAGINATION_ERRORS['invalid_limit']}), 400
+    since = request.args.get('since')
+    after = None
+    if since:
+        is_valid, after = decode_change_token(since)
+        if not is_valid:
+            return jsonify({"error": CHANGES_ERRORS['invalid_token']}), 400
+
+    try:
+        before = datetime.utcnow() - timedelta(seconds=current_app.config['CHANGES_SETTLE_SECONDS'])
+        streams = [
+            [((row.updated_at, change_type, row.id), row) for row in changed_rows(change_type, after, before, limit + 1)]
+            for change_type in sorted(set(change_types or CHANGE_TYPES))
+        ]
+        merged = list(heapq.merge(*streams, key=lambda item: item[0]))
+        page = merged[:limit]
+        if page:
+            since = encode_change_token(page[-1][0])
+        return jsonify({
+            "changes": [change_entry(change_type, row) for (_, change_type, _), row in page],
+            "next_token": since or None,
+            "has_more": len(merged) > limit,
+        }), 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error reading changes: {str(e)}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
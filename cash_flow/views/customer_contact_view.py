@@ -3,6 +3,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from extensions import db
 from cash_flow.models import CustomerContact
 from .blueprint import cash_flow
+from .pagination import paginated_response
 import uuid
 
 @cash_flow.route('/customer_contact', methods=['POST'])
@@ -51,11 +52,10 @@ def get_customer_contacts(customer_contact_id):
     """
     try:
         # Filter contact where deleted_at is None
-        customer_contacts = CustomerContact.query.filter(CustomerContact.deleted_at.is_(None)).all()
+        customer_contacts = CustomerContact.query.filter(CustomerContact.deleted_at.is_(None))
 
-        #serialize customers
-        customer_contact_list = [customer_contacts.to_dict() for customer_contact in customer_contacts]
-        return jsonify(customer_contact_list), 200
+        #serialize one page of contacts
+        return paginated_response(customer_contacts, CustomerContact)
     
     except Exception as e:
         return jsonify({
@@ -1,11 +1,30 @@
 from flask import request, jsonify, Blueprint
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from cash_flow.models import Customer
 from extensions import db
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from .blueprint import cash_flow
+from .utils import find_duplicate_fields, ERROR_MESSAGES, CustomerCreateSchema, CustomerMergeSchema, validate_with_pydantic
+from .bulk import bulk_create_response, check_unique
+from cash_flow.utils import normalize_email, normalize_phone
+from .pagination import paginated_response
+from cash_flow.duplicates import merge_customers
 import uuid
 
+def duplicate_customer_response(email, phone, exclude_id=None):
+    """
+    Build the error response for an email or phone that is already registered.
+    Returns None if neither is taken.
+    """
+    email_taken, phone_taken = find_duplicate_fields(Customer, email, phone, exclude_id)
+    if email_taken and phone_taken:
+        return jsonify({'msg': 'Both Email and phone number area already registered, Kindly use different ones'}), 400
+    if email_taken:
+        return jsonify({"msg": "Email is already registered, Kindly use a different email" }), 400
+    if phone_taken:
+        return jsonify({"msg": "Phone Number is already registered, Kindly use a differrent Phone Number" }), 400
+    return None
+
 @cash_flow.route('/new_customer', methods=['POST'])
 def create_customer():
     try:
@@ -26,17 +45,7 @@ def create_customer():
         phone = data.get('phone')
         address = data.get('address')
 
-        # Validate user Email and phone number
-        existing_details = Customer.query.filter((Customer.email == email) | (Customer.phone == phone)).first()
-        if existing_details:
-            if existing_details.email == email and existing_details.phone == phone:
-                return jsonify({'msg': 'Both Email and phone number area already registered, Kindly use different ones'}), 400
-            if existing_details.email == email:
-                return jsonify({"msg": "Email is already registered, Kindly use a different email" }), 400
-            if existing_details.phone == phone:
-                return jsonify({"msg": "Phone Number is already registered, Kindly use a differrent Phone Number" }), 400
-
-        #Create New User
+        #Create New User, the unique indexes on email_norm and phone_norm reject duplicates
         new_customer = Customer(
             first_name = first_name,
             last_name = last_name,
@@ -49,6 +58,12 @@ def create_customer():
         new_customer.save(db.session)
 
         return jsonify({'message': 'Registration Success'})
+    except IntegrityError as e:
+        db.session.rollback()
+        duplicate_response = duplicate_customer_response(email, phone)
+        if duplicate_response:
+            return duplicate_response
+        return jsonify({'error': 'Database error occurred', 'details': str(e)}), 500
     #just incase, and reduce debuging time
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -56,6 +71,29 @@ def create_customer():
     except Exception as e:
         return jsonify({'error': 'An unexpected error occurred', 'detailes': str(e)}), 500
 
+@cash_flow.route('/new_customer/bulk', methods=['POST'])
+def create_customers_bulk():
+    """Register many customers from a JSON array."""
+    def check(rows):
+        email_errors = check_unique(rows, 'email', Customer.email_norm, ERROR_MESSAGES['email_exists'], normalize_email)
+        phone_errors = check_unique(rows, 'phone', Customer.phone_norm, ERROR_MESSAGES['phone_exists'], normalize_phone)
+        errors = {**email_errors, **phone_errors}
+        for index in email_errors.keys() & phone_errors.keys():
+            errors[index] = ERROR_MESSAGES['both_exist']
+        return errors
+
+    def prepare(row):
+        # The email/phone validators do not run on bulk inserts
+        return {**row, 'email_norm': normalize_email(row['email']), 'phone_norm': normalize_phone(row['phone'])}
+
+    try:
+        return bulk_create_response(Customer, CustomerCreateSchema, prepare=prepare, check=check)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({'error': 'Database error occurred', 'details': str(e)}), 500
+    except Exception as e:
+        return jsonify({'error': 'An unexpected error occurred', 'details': str(e)}), 500
+
 @cash_flow.route('/customer/<string:customer_id>', methods=['PUT'])
 def update_customer(customer_id):
     """
@@ -87,6 +125,12 @@ def update_customer(customer_id):
         # Save the updated customer
         try:
             customer.save(db.session)
+        except IntegrityError as db_error:
+            db.session.rollback()
+            duplicate_response = duplicate_customer_response(data.get('email'), data.get('phone'), customer_id)
+            if duplicate_response:
+                return duplicate_response
+            return jsonify({"error": "Failed to save customer", "details": str(db_error)}), 500
         except Exception as db_error:
             db.session.rollback()
             return jsonify({"error": "Failed to save customer", "details": str(db_error)}), 500
@@ -106,10 +150,9 @@ def get_all_customers():
     """
     try:
         # first fileter customers where deleted_at is None
-        customers = Customer.query.filter(Customer.deleted_at.is_(None)).all()
-        # serialize customers
-        customers_list = [customer.to_dict() for customer in customers]
-        return jsonify(customers_list), 200
+        customers = Customer.query.filter(Customer.deleted_at.is_(None))
+        # serialize one page of customers
+        return paginated_response(customers, Customer)
     except Exception as e:
         return jsonify({
             "error": "An unexpected error occurred", 
@@ -160,6 +203,43 @@ def restore_customer(customer_id):
             "details": str(e)
         }), 500
 
+@cash_flow.route('/customers/merge', methods=['POST'])
+def merge_duplicate_customers():
+    """
+    Merge duplicate customers into one, e.g. a proposal of `flask find-duplicate-customers`.
+
+    The invoices and contacts of every duplicate move to the kept customer
+    and the duplicates are soft deleted, all in one transaction.
+
+    Request body:
+        keep_id: The customer that remains.
+        duplicate_ids: The customers merged into it.
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({"error": ERROR_MESSAGES['invalid_json']}), 400
+    is_valid, result = validate_with_pydantic(CustomerMergeSchema, data)
+    if not is_valid:
+        return jsonify({"error": "Validation failed", "details": result}), 400
+    keep_id = result['keep_id']
+    duplicate_ids = list(dict.fromkeys(result['duplicate_ids']))
+    if keep_id in duplicate_ids:
+        return jsonify({"error": "A customer cannot be merged into itself"}), 400
+
+    try:
+        ids = [keep_id] + duplicate_ids
+        found = {customer_id for (customer_id,) in Customer.active_query().with_entities(Customer.id).filter(Customer.id.in_(ids))}
+        missing = [customer_id for customer_id in ids if customer_id not in found]
+        if missing:
+            return jsonify({"error": "Customer not found", "details": missing}), 404
+
+        merged = merge_customers(db.session.connection(), keep_id, duplicate_ids)
+        db.session.commit()
+        return jsonify({"message": "Customers merged successfully", "keep_id": keep_id, "merged": merged}), 200
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({'error': 'Database error occurred', 'details': str(e)}), 500
+
 @cash_flow.route('/cutomer/<string:customer_id>', methods=['DELETE'])
 def delete_customer(customer_id):
     """
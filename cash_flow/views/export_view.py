@@ -0,0 +1,173 @@
+import csv
+import enum
+import io
+import zlib
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from cash_flow.models import Account, Customer, Invoice, Payment, Transfer
+from extensions import db
+from .blueprint import cash_flow
+from .utils import logger
+
+# Error messages for the export endpoints
+EXPORT_ERRORS = {
+    'unknown_entity': 'Unknown export {}, expected one of: {}',
+    'invalid_date': '{} must be a date in YYYY-MM-DD format',
+    'invalid_range': 'from must not be after to',
+}
+
+def _invoice_export():
+    """Invoices with the customer name joined in."""
+    statement = (
+        select(
+            Invoice.id, Invoice.created_at, Invoice.due_date, Invoice.customer_id,
+            Customer.first_name.label('customer_first_name'), Customer.last_name.label('customer_last_name'),
+            Invoice.total_amount, Invoice.amount_paid,
+            (Invoice.total_amount - Invoice.amount_paid).label('balance_due'), Invoice.status,
+        )
+        .join(Customer, Customer.id == Invoice.customer_id)
+        .where(Invoice.deleted_at.is_(None))
+    )
+    return statement, Invoice.created_at, Invoice.id
+
+def _payment_export():
+    """Payments with their invoice, customer and account joined in."""
+    statement = (
+        select(
+            Payment.id, Payment.payment_date, Payment.amount, Payment.payment_method,
+            Payment.invoice_id, Invoice.customer_id, Invoice.total_amount.label('invoice_total_amount'),
+            Payment.account_id, Account.name.label('account_name'), Payment.created_at,
+        )
+        .join(Invoice, Invoice.id == Payment.invoice_id)
+        .outerjoin(Account, Account.id == Payment.account_id)
+        .where(Payment.deleted_at.is_(None))
+    )
+    return statement, Payment.payment_date, Payment.id
+
+def _transfer_export():
+    """Transfers with both account names joined in."""
+    from_account = aliased(Account)
+    to_account = aliased(Account)
+    statement = (
+        select(
+            Transfer.id, Transfer.created_at, Transfer.amount,
+            Transfer.from_account_id, from_account.name.label('from_account_name'),
+            Transfer.to_account_id, to_account.name.label('to_account_name'), Transfer.description,
+        )
+        .join(from_account, from_account.id == Transfer.from_account_id)
+        .join(to_account, to_account.id == Transfer.to_account_id)
+        .where(Transfer.deleted_at.is_(None))
+    )
+    return statement, Transfer.created_at, Transfer.id
+
+# entity -> builder of (statement, date column filtered by from/to, tie-breaker column)
+EXPORTS = {
+    'invoices': _invoice_export,
+    'payments': _payment_export,
+    'transfers': _transfer_export,
+}
+
+def parse_date_arg(name: str) -> Tuple[bool, Optional[date]]:
+    """
+    Parse an optional YYYY-MM-DD query parameter.
+
+    Returns:
+        Tuple[bool, Optional[date]]: (True, date or None) if valid, (False, None) otherwise.
+    """
+    raw_value = request.args.get(name)
+    if not raw_value:
+        return True, None
+    try:
+        return True, date.fromisoformat(raw_value)
+    except ValueError:
+        return False, None
+
+def filter_date_range(statement, column, start: Optional[date], end: Optional[date]):
+    """Restrict a statement to rows whose `column` falls within [start, end], both inclusive."""
+    is_datetime = column.type.python_type is datetime
+    if start:
+        statement = statement.where(column >= (datetime.combine(start, time.min) if is_datetime else start))
+    if end:
+        if is_datetime:
+            statement = statement.where(column < datetime.combine(end + timedelta(days=1), time.min))
+        else:
+            statement = statement.where(column <= end)
+    return statement
+
+def csv_value(value):
+    """Format one value for CSV: enums as their value, dates as ISO 8601, NULL as empty."""
+    if value is None:
+        return ''
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def generate_csv(statement, batch_size: int) -> Iterator[str]:
+    """
+    Yield CSV text for a statement, one chunk per batch of rows.
+
+    The statement runs with yield_per, so only one batch is held in memory.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(statement.selected_columns.keys())
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        writer.writerows([csv_value(value) for value in row] for row in partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def gzip_chunks(chunks: Iterator[str]) -> Iterator[bytes]:
+    """Compress a stream of text chunks into one gzip stream."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode('utf-8'))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+@cash_flow.route('/export/<string:entity>.csv', methods=['GET'])
+def export_csv(entity: str):
+    """
+    Stream invoices, payments or transfers as CSV.
+
+    Query parameters `from` and `to` (YYYY-MM-DD, inclusive) filter on the
+    invoice or transfer creation date and the payment date. With `gzip=1`
+    the body is gzip-compressed (Content-Encoding: gzip).
+    """
+    build_export = EXPORTS.get(entity)
+    if build_export is None:
+        return jsonify({"error": EXPORT_ERRORS['unknown_entity'].format(entity, ', '.join(sorted(EXPORTS)))}), 404
+
+    dates: Dict[str, Optional[date]] = {}
+    for name in ('from', 'to'):
+        is_valid, dates[name] = parse_date_arg(name)
+        if not is_valid:
+            return jsonify({"error": EXPORT_ERRORS['invalid_date'].format(name)}), 400
+    if dates['from'] and dates['to'] and dates['from'] > dates['to']:
+        return jsonify({"error": EXPORT_ERRORS['invalid_range']}), 400
+
+    try:
+        statement, date_column, id_column = build_export()
+        statement = filter_date_range(statement, date_column, dates['from'], dates['to'])
+        statement = statement.order_by(date_column, id_column)
+
+        chunks = generate_csv(statement, current_app.config['STREAM_BATCH_SIZE'])
+        headers = {'Content-Disposition': f'attachment; filename="{entity}.csv"'}
+        if request.args.get('gzip', '').lower() in ('1', 'true', 'yes'):
+            chunks = gzip_chunks(chunks)
+            headers['Content-Encoding'] = 'gzip'
+        return Response(stream_with_context(chunks), mimetype='text/csv', headers=headers)
+
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
@@ -1,6 +1,8 @@
 from flask import jsonify, Blueprint, request
-from cash_flow.models import Invoice
+from cash_flow.models import Invoice, Customer
 from .blueprint import cash_flow
+from .pagination import paginated_response
+from .bulk import bulk_create_response, check_references
 from extensions import db
 from sqlalchemy.exc import SQLAlchemyError
 from .utils import (
@@ -44,17 +46,33 @@ def create_invoice():
         logger.error(f"An unexpected error occurred: {str(e)}")
         return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
 
+@cash_flow.route('/invoice/bulk', methods=['POST'])
+def create_invoices_bulk():
+    """
+    Create many invoices from a JSON array.
+    """
+    def check(rows):
+        return check_references(rows, 'customer_id', Customer.id, "Customer not found")
+
+    try:
+        return bulk_create_response(Invoice, InvoiceCreateSchema, check=check)
+    except SQLAlchemyError as e:
+        get_db_session().rollback()
+        logger.error(f"Database error occurred: {str(e)}")
+        return jsonify({"error": "Database error occurred", "details": str(e)}), 500
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
+
 @cash_flow.route('/invoice', methods=['GET'])
 def get_all_invoices():
     """
     Fetch all invoices.
     """
     try:
-        # Fetch all invoices from the database
-        invoices = Invoice.query.filter(Invoice.deleted_at.is_(None)).all()
-        invoices_list = [invoice.to_dict() for invoice in invoices]
-
-        return jsonify(invoices_list), 200
+        # Fetch one page of invoices from the database
+        invoices = Invoice.query.filter(Invoice.deleted_at.is_(None))
+        return paginated_response(invoices, Invoice)
 
     except Exception as e:
         logger.error(f"An unexpected error occurred: {str(e)}")
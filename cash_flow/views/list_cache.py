@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Type
+
+from flask import Response, current_app, request
+from sqlalchemy.orm import Query
+from extensions import db
+from cash_flow.models.table_versions import table_versions
+from cash_flow.views.pagination import conditional_response, page_response, wants_stream
+
+class ListCache:
+    """
+    Per-worker read-through cache of list view responses.
+
+    Entries are keyed by endpoint and query string and hold the encoded
+    response body together with the versions of the tables it was read
+    from. A lookup reads the current versions (one primary key query) and
+    only serves an entry whose versions still match, so any committed
+    write to those tables, from any worker, invalidates it. Entries are
+    evicted least recently used first once their bodies exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[tuple, Tuple[tuple, bytes]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, key: tuple, versions: tuple) -> Optional[bytes]:
+        """Return the body cached under key if it was built at these table versions."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._discard(key)
+                self.invalidations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, versions: tuple, body: bytes):
+        """Cache a body built at the given table versions, evicting old entries to stay within max_bytes."""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (versions, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _discard(self, key: tuple):
+        _, body = self._entries.pop(key)
+        self._bytes -= len(body)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit and miss counters and the current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+def init_list_cache(app) -> ListCache:
+    """Create the list cache for an app from its config."""
+    cache = ListCache(app.config['LIST_CACHE_MAX_BYTES'])
+    app.extensions['list_cache'] = cache
+    return cache
+
+def get_list_cache() -> ListCache:
+    """Return the list cache of the current app."""
+    return current_app.extensions['list_cache']
+
+def cached_paginated_response(query: Query, model: Type):
+    """
+    Serve a paginated list view through the list cache.
+
+    Conditional requests are answered first (see conditional_response).
+    Streamed responses and errors are never cached. The table versions are
+    read before the page is built, so a write that lands in between leaves
+    an entry with outdated versions that the next lookup discards.
+
+    Args:
+        query (Query): The base query, already filtered.
+        model: The SQLAlchemy model being listed.
+
+    Returns:
+        A Flask (response, status) tuple.
+    """
+    return conditional_response(model, lambda: _cached_page_response(query, model))
+
+def _cached_page_response(query: Query, model: Type):
+    cache = get_list_cache()
+    if wants_stream() or cache.max_bytes <= 0:
+        return page_response(query, model)
+
+    key = (request.endpoint, tuple(sorted(request.args.items(multi=True))))
+    versions = tuple(table_versions(db.session.connection(), [model.__tablename__]).values())
+    body = cache.get(key, versions)
+    if body is not None:
+        return Response(body, mimetype='application/json'), 200
+
+    response, status = page_response(query, model)
+    if status == 200:
+        cache.put(key, versions, response.get_data())
+    return response, status
@@ -0,0 +1,260 @@
+# pagination.py
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple, Type
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Query
+from extensions import db
+
+# Error messages shared by the paginated list views
+PAGINATION_ERRORS = {
+    'invalid_cursor': 'Invalid pagination cursor',
+    'invalid_limit': 'limit must be a positive integer',
+}
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """
+    Build an opaque cursor from the sort key of the last row on a page.
+
+    Args:
+        created_at (datetime): created_at of the last row returned.
+        row_id (str): id of the last row returned.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[bool, Optional[Tuple[datetime, str]]]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): The cursor sent back by the client.
+
+    Returns:
+        Tuple[bool, Optional[Tuple[datetime, str]]]: (True, (created_at, id)) if valid, (False, None) otherwise.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return True, (datetime.fromisoformat(created_at), str(row_id))
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        return False, None
+
+def parse_limit(raw_limit: Optional[str]) -> Tuple[bool, Optional[int]]:
+    """
+    Parse the limit query parameter, clamping it to PAGINATION_MAX_LIMIT.
+
+    Args:
+        raw_limit (Optional[str]): The raw limit value from the query string.
+
+    Returns:
+        Tuple[bool, Optional[int]]: (True, limit) if valid, (False, None) otherwise.
+    """
+    max_limit = current_app.config['PAGINATION_MAX_LIMIT']
+    if raw_limit is None or raw_limit == '':
+        return True, min(current_app.config['PAGINATION_DEFAULT_LIMIT'], max_limit)
+    try:
+        limit = int(raw_limit)
+    except ValueError:
+        return False, None
+    if limit < 1:
+        return False, None
+    return True, min(limit, max_limit)
+
+def keyset_query(query: Query, model: Type, after: Optional[Tuple[datetime, str]] = None) -> Query:
+    """
+    Order a query by (created_at, id) and seek past the given sort key.
+
+    Args:
+        query (Query): The base query, already filtered.
+        model: The SQLAlchemy model being listed.
+        after (Optional[Tuple[datetime, str]]): Decoded cursor of the previous page.
+
+    Returns:
+        Query: The ordered (and possibly seeked) query.
+    """
+    if after is not None:
+        query = query.filter(tuple_(model.created_at, model.id) > tuple_(*after))
+    return query.order_by(model.created_at, model.id)
+
+def paginate_query(query: Query, model: Type, limit: int,
+                   after: Optional[Tuple[datetime, str]] = None) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of rows using keyset pagination.
+
+    One extra row is fetched to know whether another page exists, so every
+    page costs a single indexed range scan regardless of its position.
+
+    Args:
+        query (Query): The base query, already filtered.
+        model: The SQLAlchemy model being listed.
+        limit (int): Maximum number of rows to return.
+        after (Optional[Tuple[datetime, str]]): Decoded cursor of the previous page.
+
+    Returns:
+        Tuple[List, Optional[str]]: (rows, next_cursor); next_cursor is None on the last page.
+    """
+    rows = keyset_query(query, model, after).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]
+        next_cursor = encode_cursor(last_row.created_at, last_row.id)
+    return rows, next_cursor
+
+def wants_stream() -> bool:
+    """
+    Check whether the current request asked for a streamed NDJSON response,
+    either with `?stream=1` or with `Accept: application/x-ndjson`.
+    """
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+def stream_response(query: Query, model: Type, after: Optional[Tuple[datetime, str]] = None) -> Response:
+    """
+    Stream every row of a list query as newline-delimited JSON.
+
+    Rows are read in batches of STREAM_BATCH_SIZE with yield_per and written
+    out one line at a time, so memory stays flat regardless of table size and
+    the first line is sent before the last row is read.
+
+    Args:
+        query (Query): The base query, already filtered.
+        model: The SQLAlchemy model being listed.
+        after (Optional[Tuple[datetime, str]]): Decoded cursor to resume after.
+
+    Returns:
+        Response: A streaming application/x-ndjson response.
+    """
+    batch_size = current_app.config['STREAM_BATCH_SIZE']
+    rows = keyset_query(query, model, after).yield_per(batch_size)
+    dumps = current_app.json.dumps
+
+    def generate():
+        for row in rows:
+            yield dumps(row.to_dict()) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+def list_etag_statement(model: Type):
+    """Select the write watermark of a table for list_etag: its max(updated_at) and row count."""
+    return select(
+        select(func.max(model.updated_at)).scalar_subquery(),
+        select(func.count()).select_from(model).scalar_subquery(),
+    )
+
+def list_etag(model: Type) -> str:
+    """
+    Build the weak ETag of the current list request from the table's write watermark.
+
+    The watermark is max(updated_at) and the row count of the whole table,
+    read in one statement. They are separate scalar subqueries so the max
+    is a seek on ix_<table>_updated_at and only the count scans, over the
+    narrowest index, which is an order of magnitude faster than one
+    aggregate computing both.
+    Every insert, update, soft delete and restore moves max(updated_at)
+    and every hard delete changes the count, so the tag changes whenever
+    any page could. The endpoint, query parameters and response format
+    are mixed in so each page has its own tag.
+
+    Args:
+        model: The SQLAlchemy model being listed.
+
+    Returns:
+        str: The opaque tag, without the W/ prefix and quotes.
+    """
+    latest, count = db.session.execute(list_etag_statement(model)).one()
+    watermark = json.dumps([
+        request.endpoint, sorted(request.args.items(multi=True)), wants_stream(),
+        latest.isoformat() if latest else None, count,
+    ], separators=(',', ':'))
+    return hashlib.blake2b(watermark.encode('utf-8'), digest_size=16).hexdigest()
+
+def conditional_response(model: Type, build: Callable):
+    """
+    Answer a list request with 304 Not Modified when the client already has the current page.
+
+    The client's If-None-Match is compared with list_etag before any row
+    is read; otherwise `build` makes the response, which is tagged.
+
+    Args:
+        model: The SQLAlchemy model being listed.
+        build (Callable): Returns the (response, status) tuple of the full list response.
+
+    Returns:
+        A Flask (response, status) tuple.
+    """
+    etag = list_etag(model)
+    if request.if_none_match.contains_weak(etag):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag, weak=True)
+        return not_modified, 304
+
+    response, status = build()
+    if status == 200:
+        response.set_etag(etag, weak=True)
+    return response, status
+
+def page_response(query: Query, model: Type):
+    """
+    Build the JSON response for a paginated list view.
+
+    Reads the `cursor` and `limit` query parameters from the current request.
+    When the client asks for a stream (see wants_stream) the rows after the
+    cursor are streamed as NDJSON instead and `limit` is ignored without being
+    validated.
+
+    Args:
+        query (Query): The base query, already filtered.
+        model: The SQLAlchemy model being listed.
+
+    Returns:
+        A Flask (response, status) tuple.
+    """
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        is_valid, after = decode_cursor(cursor)
+        if not is_valid:
+            return jsonify({"error": PAGINATION_ERRORS['invalid_cursor']}), 400
+
+    if wants_stream():
+        return stream_response(query, model, after), 200
+
+    is_valid, limit = parse_limit(request.args.get('limit'))
+    if not is_valid:
+        return jsonify({"error": PAGINATION_ERRORS['invalid_limit']}), 400
+
+    rows, next_cursor = paginate_query(query, model, limit, after)
+    return jsonify({
+        "items": [row.to_dict() for row in rows],
+        "next_cursor": next_cursor,
+        "limit": limit,
+    }), 200
+
+def paginated_response(query: Query, model: Type):
+    """
+    Build the response for a paginated list view, honouring If-None-Match.
+
+    See page_response for the parameters read and conditional_response for
+    the ETag.
+
+    Args:
+        query (Query): The base query, already filtered.
+        model: The SQLAlchemy model being listed.
+
+    Returns:
+        A Flask (response, status) tuple.
+    """
+    return conditional_response(model, lambda: page_response(query, model))
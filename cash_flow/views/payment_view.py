@@ -1,6 +1,12 @@
 from flask import jsonify, Blueprint, request
-from cash_flow.models import Payment
+from cash_flow.models import Payment, Invoice, Account
+from cash_flow.models.payment import PaymentMethod
+from cash_flow.models.events import refresh_invoice_totals
+from cash_flow.models.ledger import payment_legs, sync_postings
+from types import SimpleNamespace
 from .blueprint import cash_flow
+from .pagination import paginated_response
+from .bulk import bulk_create_response, check_references
 from extensions import db
 from sqlalchemy.exc import SQLAlchemyError
 from .utils import (
@@ -30,6 +36,9 @@ def create_payment():
         if not is_valid:
             return jsonify({"error": "Validation failed", "details": validated_data}), 400
 
+        # Map the schema enum onto the model enum
+        validated_data['payment_method'] = PaymentMethod(validated_data['payment_method'].value)
+
         # Create and save the new payment
         new_payment = Payment(**validated_data)
         new_payment.save(get_db_session())
@@ -44,17 +53,45 @@ def create_payment():
         logger.error(f"An unexpected error occurred: {str(e)}")
         return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
 
+@cash_flow.route('/payment/bulk', methods=['POST'])
+def create_payments_bulk():
+    """
+    Create many payments from a JSON array.
+    """
+    def check(rows):
+        errors = check_references(rows, 'account_id', Account.id, "Account not found")
+        errors.update(check_references(rows, 'invoice_id', Invoice.id, "Invoice not found"))
+        return errors
+
+    def prepare(row):
+        return {**row, 'payment_method': PaymentMethod(row['payment_method'].value)}
+
+    def after_insert(connection, chunk):
+        # Bulk inserts skip the flush hooks that keep invoice totals and the ledger in step
+        refresh_invoice_totals(connection, {row['invoice_id'] for row in chunk})
+        sync_postings(connection, 'payment', {
+            row['id']: payment_legs(SimpleNamespace(deleted_at=None, **row)) for row in chunk
+        })
+
+    try:
+        return bulk_create_response(Payment, PaymentCreateSchema, prepare=prepare, check=check, after_insert=after_insert)
+    except SQLAlchemyError as e:
+        get_db_session().rollback()
+        logger.error(f"Database error occurred: {str(e)}")
+        return jsonify({"error": "Database error occurred", "details": str(e)}), 500
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
+
 @cash_flow.route('/payment', methods=['GET'])
 def get_payment():
     """
     Fetch all payments.
     """
     try:
-        # Fetch all payments from the database
-        payments = Payment.query.filter(Payment.deleted_at.is_(None)).all()
-        payments_list = [payment.to_dict() for payment in payments]
-
-        return jsonify(payments_list), 200
+        # Fetch one page of payments from the database
+        payments = Payment.query.filter(Payment.deleted_at.is_(None))
+        return paginated_response(payments, Payment)
 
     except Exception as e:
         logger.error(f"An unexpected error occurred: {str(e)}")
@@ -81,6 +118,10 @@ def update_payment(payment_id: str):
         if not is_valid:
             return jsonify({"error": "Validation failed", "details": validated_data}), 400
 
+        # Map the schema enum onto the model enum
+        if validated_data.get('payment_method') is not None:
+            validated_data['payment_method'] = PaymentMethod(validated_data['payment_method'].value)
+
         # Update payment fields
         for field, value in validated_data.items():
             setattr(payment, field, value)
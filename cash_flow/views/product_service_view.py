@@ -1,8 +1,10 @@
 from flask import jsonify, Blueprint, request
 from cash_flow.models import ProductService
 from .blueprint import cash_flow
+from .list_cache import cached_paginated_response
+from .bulk import bulk_create_response, check_unique
 from extensions import db
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from .utils import (
     logger, ERROR_MESSAGES, handle_duplicate_entry_contact, ProductServiceCreateSchema,
     validate_with_pydantic, ProductServiceUpdateSchema
@@ -29,22 +31,40 @@ def create_product_service():
         if not is_valid:
             return jsonify({"error": "Verification faild", "details": validated_data}), 400
         
-        # check for duplicate product or service names befor saving
-        name_value = validated_data.get('name')
+        # Create and save the new product or service; the unique index rejects duplicate names
+        new_product_service = ProductService(**validated_data)
+        new_product_service.save(get_db_session())
+
+        return jsonify({"message": "Created successfully"}), 201
+    except IntegrityError as e:
+        get_db_session().rollback()
         is_duplicate, duplicate_message = handle_duplicate_entry_contact(
             ProductService,
             field='name',
-            value=name_value
+            value=validated_data.get('name')
         )
-
         if is_duplicate:
             return jsonify({"error": duplicate_message}), 400
-        
-        # Create and save the new vendor
-        new_product_service = ProductService(**validated_data)
-        new_product_service.save(get_db_session())
+        logger.error(f"Database error occured: {str(e)}")
+        return jsonify({"error": "Database error occured", "details": str(e)}), 500
+    except SQLAlchemyError as e:
+        get_db_session().rollback()
+        logger.error(f"Database error occured: {str(e)}")
+        return jsonify({"error": "Database error occured", "details": str(e)}), 500
+    except  Exception as e:
+        logger.error(f"An unexpected error occured: {str(e)}")
+        return jsonify({"error": "An unxpected error occured", "details": str(e)}), 500
 
-        return jsonify({"message": "Created successfully"}), 201
+@cash_flow.route('/product_service/bulk', methods=['POST'])
+def create_product_services_bulk():
+    """
+    Create many products or services from a JSON array
+    """
+    def check(rows):
+        return check_unique(rows, 'name', ProductService.name, "Name is already registered")
+
+    try:
+        return bulk_create_response(ProductService, ProductServiceCreateSchema, check=check)
     except SQLAlchemyError as e:
         get_db_session().rollback()
         logger.error(f"Database error occured: {str(e)}")
@@ -60,9 +80,8 @@ def get_all():
     fetch all products and services in the db
     """
     try:
-        products_services = ProductService.query.filter(ProductService.deleted_at.is_(None)).all()
-        products_services_list = [products_service.to_dict() for products_service in products_services]
-        return jsonify(products_services_list), 200
+        products_services = ProductService.query.filter(ProductService.deleted_at.is_(None))
+        return cached_paginated_response(products_services, ProductService)
     
     except Exception as e:
         logger.error(f"An unexpected error occurred: {str(e)}")
@@ -77,7 +96,7 @@ def update_product_service(product_service_id: str):
     try:
         #fetch and validate user from database
         product_service = ProductService.query.get(product_service_id)
-        if not product_service_id:
+        if not product_service:
             return jsonify({"error": "Product or service service not found"}), 404
         
         #Get the request data
@@ -90,24 +109,26 @@ def update_product_service(product_service_id: str):
         if not is_valid:
             return jsonify({"error": "Validation faild", "details": validate_data}), 400
         
-        #check for duplicate name
-        name_value = validate_data.get('name')
-        is_duplicate, duplicate_message = handle_duplicate_entry_contact(
-            ProductService,
-            field='name',
-            value=name_value
-        )
-        if is_duplicate:
-            return jsonify({"error": duplicate_message}), 400
-        
         #updated product or service fields
         for field, value in validate_data.items():
             setattr(product_service, field, value)
 
-        # now save the updated product or service fields
+        # now save the updated product or service fields; the unique index rejects duplicate names
         product_service.save(get_db_session())
         return jsonify(product_service.to_dict()), 200
     
+    except IntegrityError as e:
+        get_db_session().rollback()
+        is_duplicate, duplicate_message = handle_duplicate_entry_contact(
+            ProductService,
+            field='name',
+            value=validate_data.get('name')
+        )
+        if is_duplicate:
+            return jsonify({"error": duplicate_message}), 400
+        logger.error(f'Database error occured: {str(e)}')
+        return jsonify({"error": "An unexpected error occured", "details": str(e)}), 500
+
     except SQLAlchemyError as e:
         get_db_session().rollback()
         logger.error(f'Database error occured: {str(e)}')
@@ -0,0 +1,101 @@
+from flask import request, jsonify
+from sqlalchemy.exc import SQLAlchemyError
+from extensions import db
+from .blueprint import cash_flow
+from .export_view import parse_date_arg, EXPORT_ERRORS
+from cash_flow.models.ledger import (
+    FLOW_PAYMENT, FLOW_INCOME, FLOW_EXPENSE, FLOW_TRANSFER_IN, FLOW_TRANSFER_OUT, FLOW_OPENING, FLOW_ADJUSTMENT
+)
+from cash_flow.models.rollups import REPORT_GROUPINGS, cash_flow_report
+from cash_flow.models.aging import receivables_aging
+from datetime import datetime
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FLOW_TYPES = (FLOW_PAYMENT, FLOW_INCOME, FLOW_EXPENSE, FLOW_TRANSFER_IN, FLOW_TRANSFER_OUT, FLOW_OPENING, FLOW_ADJUSTMENT)
+
+REPORT_ERRORS = {
+    'invalid_group_by': f"group_by must be a comma-separated list of {', '.join(REPORT_GROUPINGS)}",
+    'invalid_type': f"type must be a comma-separated list of {', '.join(FLOW_TYPES)}",
+}
+
+def parse_list_arg(name: str, allowed: Iterable[str]) -> Tuple[bool, Optional[List[str]]]:
+    """
+    Parse an optional comma-separated query parameter whose values must all be in `allowed`.
+
+    Returns:
+        Tuple[bool, Optional[List[str]]]: (True, values or None) if valid, (False, None) otherwise.
+    """
+    value = request.args.get(name)
+    if not value:
+        return True, None
+    values = [item.strip() for item in value.split(',') if item.strip()]
+    if any(item not in allowed for item in values):
+        return False, None
+    return True, values
+
+@cash_flow.route('/reports/cash_flow', methods=['GET'])
+def get_cash_flow_report():
+    """
+    Report inflow, outflow and net cash flow from the daily rollups.
+
+    Query parameters:
+        from, to: Inclusive date range (YYYY-MM-DD); open-ended when omitted.
+        group_by: Comma-separated day, month, account, category and/or type; one total row when omitted.
+        type: Comma-separated flow types to include, e.g. income,expense to leave out transfers.
+        account_id: Restrict to these accounts; may be repeated.
+    """
+    is_valid, start = parse_date_arg('from')
+    if not is_valid:
+        return jsonify({"error": EXPORT_ERRORS['invalid_date'].format('from')}), 400
+    is_valid, end = parse_date_arg('to')
+    if not is_valid:
+        return jsonify({"error": EXPORT_ERRORS['invalid_date'].format('to')}), 400
+    if start and end and start > end:
+        return jsonify({"error": EXPORT_ERRORS['invalid_range']}), 400
+    is_valid, group_by = parse_list_arg('group_by', REPORT_GROUPINGS)
+    if not is_valid:
+        return jsonify({"error": REPORT_ERRORS['invalid_group_by']}), 400
+    is_valid, flow_types = parse_list_arg('type', FLOW_TYPES)
+    if not is_valid:
+        return jsonify({"error": REPORT_ERRORS['invalid_type']}), 400
+
+    try:
+        rows = cash_flow_report(
+            db.session.connection(), start, end, group_by or [],
+            flow_types=flow_types, account_ids=request.args.getlist('account_id') or None,
+        )
+        return jsonify({
+            "from": start.isoformat() if start else None,
+            "to": end.isoformat() if end else None,
+            "group_by": group_by or [],
+            "rows": rows,
+        }), 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error building cash flow report: {str(e)}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
+
+@cash_flow.route('/reports/ar_aging', methods=['GET'])
+def get_receivables_aging():
+    """
+    Report outstanding invoice balances per customer in current, 1-30, 31-60, 61-90 and 90+ days past due buckets.
+
+    Query parameters:
+        as_of: Day the aging is taken at (YYYY-MM-DD); today when omitted.
+        customer_id: Restrict to these customers; may be repeated.
+    """
+    is_valid, as_of = parse_date_arg('as_of')
+    if not is_valid:
+        return jsonify({"error": EXPORT_ERRORS['invalid_date'].format('as_of')}), 400
+    as_of = as_of or datetime.utcnow().date()
+
+    try:
+        rows, totals = receivables_aging(db.session.connection(), as_of, request.args.getlist('customer_id') or None)
+        return jsonify({"as_of": as_of.isoformat(), "customers": rows, "totals": totals}), 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error building receivables aging: {str(e)}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
@@ -0,0 +1,57 @@
+from flask import request, jsonify
+from sqlalchemy.exc import SQLAlchemyError
+from extensions import db
+from .blueprint import cash_flow
+from .report_view import parse_list_arg
+from cash_flow.models.search import MIN_TERM_LENGTH, SEARCH_SOURCES, search, search_terms
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Hits returned when no limit is given, and the most a request may ask for
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+SEARCH_ERRORS = {
+    'missing_query': f'q must contain a term of at least {MIN_TERM_LENGTH} characters',
+    'invalid_types': f"types must be a comma-separated list of {', '.join(SEARCH_SOURCES)}",
+    'invalid_limit': f'limit must be an integer between 1 and {SEARCH_MAX_LIMIT}',
+    'unsupported': 'Search requires the SQLite FTS5 index',
+}
+
+@cash_flow.route('/search', methods=['GET'])
+def search_entities():
+    """
+    Search customers, vendors, their contacts and products by any fragment of their text.
+
+    Every term of `q` must appear somewhere in a row's names, email, phone,
+    address, contact value or description, in any case. Hits with the terms
+    in their name rank first (see cash_flow.models.search.search).
+
+    Query parameters:
+        q: Free text; terms shorter than 3 characters are ignored.
+        types: Comma-separated entity types to search; all when omitted.
+        limit: Maximum number of hits (default 20, at most 100).
+    """
+    query = request.args.get('q', '')
+    if not search_terms(query):
+        return jsonify({"error": SEARCH_ERRORS['missing_query']}), 400
+    is_valid, entities = parse_list_arg('types', SEARCH_SOURCES)
+    if not is_valid:
+        return jsonify({"error": SEARCH_ERRORS['invalid_types']}), 400
+    try:
+        limit = int(request.args.get('limit') or SEARCH_DEFAULT_LIMIT)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        return jsonify({"error": SEARCH_ERRORS['invalid_limit']}), 400
+    if db.engine.dialect.name != 'sqlite':
+        return jsonify({"error": SEARCH_ERRORS['unsupported']}), 501
+
+    try:
+        hits = search(db.session.connection(), query, entities, limit)
+        return jsonify({"q": query, "hits": hits}), 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error searching for {query!r}: {str(e)}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
@@ -0,0 +1,80 @@
+from flask import Response, current_app, request, jsonify, stream_with_context
+from extensions import db
+from .blueprint import cash_flow
+from .export_view import parse_date_arg, EXPORT_ERRORS
+from cash_flow.statements import STATEMENT_FORMATS, STATEMENT_MEDIA, iter_statements, render_statements
+from cash_flow.models.customer_model import Customer
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_ERRORS = {
+    'missing_period': 'from and to are required',
+    'invalid_format': f"format must be one of {', '.join(STATEMENT_FORMATS)}",
+}
+
+def parse_statement_args():
+    """
+    Parse the `from`, `to` and `format` query parameters of the statement views.
+
+    Returns:
+        Tuple[Optional[Response], Optional[date], Optional[date], str]: An error response or None, then the period and format.
+    """
+    dates = {}
+    for name in ('from', 'to'):
+        is_valid, dates[name] = parse_date_arg(name)
+        if not is_valid:
+            return (jsonify({"error": EXPORT_ERRORS['invalid_date'].format(name)}), 400), None, None, ''
+    if dates['from'] is None or dates['to'] is None:
+        return (jsonify({"error": STATEMENT_ERRORS['missing_period']}), 400), None, None, ''
+    if dates['from'] > dates['to']:
+        return (jsonify({"error": EXPORT_ERRORS['invalid_range']}), 400), None, None, ''
+    fmt = request.args.get('format', 'json')
+    if fmt not in STATEMENT_FORMATS:
+        return (jsonify({"error": STATEMENT_ERRORS['invalid_format']}), 400), None, None, ''
+    return None, dates['from'], dates['to'], fmt
+
+@cash_flow.route('/statements', methods=['GET'])
+def stream_statements():
+    """
+    Stream the statement of every customer for a period.
+
+    Query parameters `from` and `to` (YYYY-MM-DD, inclusive) give the
+    period. With `format=json` (the default) the body is one JSON statement
+    per line; with `format=html` it is one HTML document.
+    """
+    error, start, end, fmt = parse_statement_args()
+    if error:
+        return error
+
+    try:
+        statements = iter_statements(
+            db.session.connection(), start, end, batch_size=current_app.config['STREAM_BATCH_SIZE']
+        )
+        _, mimetype = STATEMENT_MEDIA[fmt]
+        return Response(stream_with_context(render_statements(statements, fmt)), mimetype=mimetype)
+
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
+
+@cash_flow.route('/customers/<string:customer_id>/statement', methods=['GET'])
+def get_customer_statement(customer_id):
+    """
+    Return the statement of one customer for a period as JSON or HTML.
+    """
+    error, start, end, fmt = parse_statement_args()
+    if error:
+        return error
+
+    try:
+        if not Customer.active_query().filter_by(id=customer_id).first():
+            return jsonify({"error": "Customer not found"}), 404
+        statement = next(iter_statements(db.session.connection(), start, end, customer_id=customer_id))
+        if fmt == 'json':
+            return jsonify(statement), 200
+        return Response(render_statements(iter([statement]), fmt), mimetype=STATEMENT_MEDIA[fmt][1])
+
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
@@ -1,6 +1,7 @@
 from flask import jsonify, Blueprint, request
 from cash_flow.models import Transfer
 from .blueprint import cash_flow
+from .pagination import paginated_response
 from extensions import db
 from sqlalchemy.exc import SQLAlchemyError
 from .utils import (
@@ -50,11 +51,9 @@ def get_transfer():
     Fetch all transfers.
     """
     try:
-        # Fetch all transfers from the database
-        transfers = Transfer.query.filter(Transfer.deleted_at.is_(None)).all()
-        transfers_list = [transfer.to_dict() for transfer in transfers]
-
-        return jsonify(transfers_list), 200
+        # Fetch one page of transfers from the database
+        transfers = Transfer.query.filter(Transfer.deleted_at.is_(None))
+        return paginated_response(transfers, Transfer)
 
     except Exception as e:
         logger.error(f"An unexpected error occurred: {str(e)}")
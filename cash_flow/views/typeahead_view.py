@@ -0,0 +1,49 @@
+from flask import request, jsonify
+from sqlalchemy.exc import SQLAlchemyError
+from extensions import db
+from .blueprint import cash_flow
+from cash_flow.typeahead import TYPEAHEAD_SOURCES, get_typeahead
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Suggestions returned when no limit is given, and the most a request may ask for
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+TYPEAHEAD_ERRORS = {
+    'invalid_type': f"type must be one of {', '.join(TYPEAHEAD_SOURCES)}",
+    'invalid_limit': f'limit must be an integer between 1 and {TYPEAHEAD_MAX_LIMIT}',
+}
+
+@cash_flow.route('/typeahead', methods=['GET'])
+def typeahead():
+    """
+    Suggest customers or products whose name starts with, or contains, what has been typed so far.
+
+    Served from this worker's in-memory index (see cash_flow.typeahead),
+    so keystrokes do not query the database.
+
+    Query parameters:
+        type: customer or product_service.
+        q: The text typed so far; an empty q returns no suggestions.
+        limit: Maximum number of suggestions (default 10, at most 50).
+    """
+    kind = request.args.get('type', '')
+    if kind not in TYPEAHEAD_SOURCES:
+        return jsonify({"error": TYPEAHEAD_ERRORS['invalid_type']}), 400
+    try:
+        limit = int(request.args.get('limit') or TYPEAHEAD_DEFAULT_LIMIT)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= TYPEAHEAD_MAX_LIMIT:
+        return jsonify({"error": TYPEAHEAD_ERRORS['invalid_limit']}), 400
+    query = request.args.get('q', '')
+
+    try:
+        results = get_typeahead().lookup(db.session, kind, query, limit)
+        return jsonify({"type": kind, "q": query, "results": results}), 200
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error loading the {kind} typeahead index: {str(e)}")
+        return jsonify({"error": "Database error", "details": str(e)}), 500
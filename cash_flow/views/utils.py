@@ -1,10 +1,13 @@
 # utils.py
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional, Type, Tuple, Text
-from pydantic import BaseModel, EmailStr, ValidationError, Field
+from pydantic import BaseModel, EmailStr, ValidationError, Field, TypeAdapter
+from sqlalchemy import or_
 from sqlalchemy.orm import Query
 from sqlalchemy.exc import SQLAlchemyError
 from cash_flow.models import Vendor
+from cash_flow.utils import normalize_email, normalize_phone
 from datetime import date
 from cash_flow.models import Invoice
 from enum import Enum as PyEnum
@@ -19,9 +22,25 @@ ERROR_MESSAGES = {
     'missing_fields': 'Missing Required field(s): {}',
     'email_exists': 'Email is already registered, Kindly use a different email',
     'phone_exists': 'Phone Number is already registered, Kindly use a different Phone Number',
+    'both_exist': 'Both Email and phone number are already registered',
 }
 
 # Pydantic Schemas for Data Validation
+class CustomerCreateSchema(BaseModel):
+    first_name: str
+    last_name: str
+    email: EmailStr
+    phone: str
+    address: str
+    description: Optional[str] = None
+
+class CustomerMergeSchema(BaseModel):
+    """
+    Schema for merging duplicate customers into one.
+    """
+    keep_id: str = Field(..., description="ID of the customer that remains")
+    duplicate_ids: List[str] = Field(..., min_length=1, description="IDs of the customers merged into it")
+
 class VendorCreateSchema(BaseModel):
     first_name: str
     last_name: str
@@ -146,35 +165,62 @@ def validate_required_fields(data: Dict, required_fields: List[str]) -> tuple[bo
         return False, ERROR_MESSAGES['missing_fields'].format(", ".join(missing_fields))
     return True, None
 
-def handle_duplicate_entry(model: Type, email: Optional[str] = None, phone: Optional[str] = None) -> tuple[bool, Optional[str]]:
+def find_duplicate_fields(model: Type, email: Optional[str] = None, phone: Optional[str] = None,
+                          exclude_id: Optional[str] = None) -> Tuple[bool, bool]:
+    """
+    Look up which of the given email and phone are already taken, comparing normalized values.
+
+    Args:
+        model: The SQLAlchemy model to query (must have email_norm and phone_norm).
+        email (Optional[str]): The email to check.
+        phone (Optional[str]): The phone number to check.
+        exclude_id (Optional[str]): ID of the record being updated, ignored in the lookup.
+
+    Returns:
+        Tuple[bool, bool]: (email_taken, phone_taken).
+    """
+    email_norm = normalize_email(email)
+    phone_norm = normalize_phone(phone)
+    conditions = []
+    if email_norm:
+        conditions.append(model.email_norm == email_norm)
+    if phone_norm:
+        conditions.append(model.phone_norm == phone_norm)
+    if not conditions:
+        return False, False
+
+    query: Query = model.query.filter(or_(*conditions))
+    if exclude_id:
+        query = query.filter(model.id != exclude_id)
+    existing_records = query.all()
+    email_taken = bool(email_norm) and any(record.email_norm == email_norm for record in existing_records)
+    phone_taken = bool(phone_norm) and any(record.phone_norm == phone_norm for record in existing_records)
+    return email_taken, phone_taken
+
+def handle_duplicate_entry(model: Type, email: Optional[str] = None, phone: Optional[str] = None,
+                           exclude_id: Optional[str] = None) -> tuple[bool, Optional[str]]:
     """
     Check if a record with the given email or phone already exists in the database.
+
+    Uniqueness is enforced by the database, so views call this only after an
+    IntegrityError to turn it into a friendly message.
     
     Args:
         model: The SQLAlchemy model to query.
         email (Optional[str]): The email to check.
         phone (Optional[str]): The phone number to check.
+        exclude_id (Optional[str]): ID of the record being updated, ignored in the lookup.
     
     Returns:
         tuple[bool, Optional[str]]: (True, error_message) if duplicate exists, (False, None) otherwise.
     """
-    query: Query = model.query
-    if email and phone:
-        existing_record = query.filter((model.email == email) | (model.phone == phone)).first()
-    elif email:
-        existing_record = query.filter(model.email == email).first()
-    elif phone:
-        existing_record = query.filter(model.phone == phone).first()
-    else:
-        return False, None
-
-    if existing_record:
-        if existing_record.email == email and existing_record.phone == phone:
-            return True, 'Both Email and phone number are already registered'
-        if existing_record.email == email:
-            return True, ERROR_MESSAGES['email_exists']
-        if existing_record.phone == phone:
-            return True, ERROR_MESSAGES['phone_exists']
+    email_taken, phone_taken = find_duplicate_fields(model, email, phone, exclude_id)
+    if email_taken and phone_taken:
+        return True, ERROR_MESSAGES['both_exist']
+    if email_taken:
+        return True, ERROR_MESSAGES['email_exists']
+    if phone_taken:
+        return True, ERROR_MESSAGES['phone_exists']
     return False, None
 
 def handle_duplicate_entry_contact(model: Type, field: str, value: str) -> Tuple[bool, Optional[str]]:
@@ -206,11 +252,47 @@ def validate_with_pydantic(schema: Type[BaseModel], data: Dict) -> tuple[bool, O
         tuple[bool, Optional[Dict]]: (True, validated_data) if valid, (False, error_details) if invalid.
     """
     try:
-        validated_data = schema(**data).dict(exclude_unset=True)
+        validated_data = schema(**data).model_dump(exclude_unset=True)
         return True, validated_data
     except ValidationError as e:
         return False, e.errors()
 
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+def validate_batch_with_pydantic(schema: Type[BaseModel], items: List) -> tuple[Dict[int, Dict], Dict[int, List]]:
+    """
+    Validate a list of items against a Pydantic schema in one pass.
+
+    Unlike validate_with_pydantic, fields the client left out are kept with
+    their schema default. The rows go to one executemany INSERT, which needs
+    the same keys in every row; the optional create fields all default to
+    None, which is what the nullable columns would store anyway.
+
+    Args:
+        schema: The Pydantic schema each item must match.
+        items (List): The items to validate.
+
+    Returns:
+        tuple[Dict[int, Dict], Dict[int, List]]: (validated_data by index, error_details by index).
+    """
+    adapter = _list_adapter(schema)
+    indexes = list(range(len(items)))
+    failures: Dict[int, List] = {}
+    while indexes:
+        try:
+            validated = adapter.validate_python([items[index] for index in indexes])
+        except ValidationError as e:
+            # Errors are located by position in this pass; drop the failed items and validate the rest again
+            for error in e.errors(include_url=False, include_context=False):
+                index = indexes[error['loc'][0]]
+                failures.setdefault(index, []).append({**error, 'loc': error['loc'][1:]})
+            indexes = [index for index in indexes if index not in failures]
+            continue
+        return {index: item.model_dump() for index, item in zip(indexes, validated)}, failures
+    return {}, failures
+
 def validate_vendor_id(vendor_id: str) -> tuple[bool, Optional[str]]:
     """
     Validate if the vendor_id exists in the database.
@@ -4,6 +4,7 @@ from extensions import db
 from cash_flow.models import VendorContact
 from cash_flow.models import Vendor
 from .blueprint import cash_flow
+from .pagination import paginated_response
 from .utils import (
     logger, ERROR_MESSAGES, validate_with_pydantic,
     VendorContactCreateSchema, VendorContactUpdateSchema, validate_vendor_id, handle_duplicate_entry_contact
@@ -68,9 +69,8 @@ def get_vendor_contacts():
     Fetch all vendor contacts except the soft-deleted ones.
     """
     try:
-        vendor_contacts = VendorContact.query.filter(VendorContact.deleted_at.is_(None)).all()
-        vendor_contact_list = [vendor_contact.to_dict() for vendor_contact in vendor_contacts]
-        return jsonify(vendor_contact_list), 200
+        vendor_contacts = VendorContact.query.filter(VendorContact.deleted_at.is_(None))
+        return paginated_response(vendor_contacts, VendorContact)
     except Exception as e:
         logger.error(f"An unexpected error occurred: {str(e)}")
         return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
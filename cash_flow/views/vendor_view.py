@@ -1,8 +1,9 @@
 from flask import Blueprint, jsonify, request
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from extensions import db
 from cash_flow.models import Vendor
 from .blueprint import cash_flow
+from .list_cache import cached_paginated_response
 from .utils import (
     logger, ERROR_MESSAGES, validate_required_fields, handle_duplicate_entry,
     VendorCreateSchema, VendorUpdateSchema, validate_with_pydantic
@@ -31,19 +32,21 @@ def create_vendor():
         if not is_valid:
             return jsonify({"error": "Validation failed", "details": validated_data}), 400
 
-        # Check for duplicate email or phone
-        is_duplicate, duplicate_message = handle_duplicate_entry(
-            Vendor, email=validated_data.get('email'), phone=validated_data.get('phone')
-        )
-        if is_duplicate:
-            return jsonify({"error": duplicate_message}), 400
-
-        # Create and save the new vendor
+        # Create and save the new vendor; the unique indexes reject duplicate email or phone
         new_vendor = Vendor(**validated_data)
         new_vendor.save(get_db_session())
 
         return jsonify({"message": "Vendor created successfully"}), 201
 
+    except IntegrityError as e:
+        get_db_session().rollback()
+        is_duplicate, duplicate_message = handle_duplicate_entry(
+            Vendor, email=validated_data.get('email'), phone=validated_data.get('phone')
+        )
+        if is_duplicate:
+            return jsonify({"error": duplicate_message}), 400
+        logger.error(f"Database error occurred: {str(e)}")
+        return jsonify({"error": "Database error occurred", "details": str(e)}), 500
     except SQLAlchemyError as e:
         get_db_session().rollback()
         logger.error(f"Database error occurred: {str(e)}")
@@ -58,9 +61,8 @@ def get_vendors():
     Fetch all vendors except the soft-deleted ones.
     """
     try:
-        vendors = Vendor.query.filter(Vendor.deleted_at.is_(None)).all()
-        vendors_list = [vendor.to_dict() for vendor in vendors]
-        return jsonify(vendors_list), 200
+        vendors = Vendor.query.filter(Vendor.deleted_at.is_(None))
+        return cached_paginated_response(vendors, Vendor)
     except Exception as e:
         logger.error(f"An unexpected error occurred: {str(e)}")
         return jsonify({"error": "An unexpected error occurred", "details": str(e)}), 500
@@ -94,6 +96,15 @@ def update_vendor(vendor_id: str):
         vendor.save(get_db_session())
         return jsonify(vendor.to_dict()), 200
 
+    except IntegrityError as e:
+        get_db_session().rollback()
+        is_duplicate, duplicate_message = handle_duplicate_entry(
+            Vendor, email=validated_data.get('email'), phone=validated_data.get('phone'), exclude_id=vendor_id
+        )
+        if is_duplicate:
+            return jsonify({"error": duplicate_message}), 400
+        logger.error(f"Database error occurred: {str(e)}")
+        return jsonify({"error": "Database error occurred", "details": str(e)}), 500
     except SQLAlchemyError as e:
         get_db_session().rollback()
         logger.error(f"Database error occurred: {str(e)}")
@@ -10,6 +10,9 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'fallback-jwt-secret-key')
 
+    # Error log file, rotated at 100 kB; empty disables file logging
+    LOG_FILE = os.getenv('LOG_FILE', 'app.log')
+
     # Email configuration
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
     MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
@@ -17,3 +20,63 @@ class Config:
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', MAIL_USERNAME)
+
+    # Pagination for list endpoints
+    PAGINATION_DEFAULT_LIMIT = int(os.getenv('PAGINATION_DEFAULT_LIMIT', 50))
+    PAGINATION_MAX_LIMIT = int(os.getenv('PAGINATION_MAX_LIMIT', 500))
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 1000))
+
+    # Seconds a worker may serve revocation checks from its cache before re-reading the blocklist
+    REVOCATION_CACHE_MAX_STALENESS = float(os.getenv('REVOCATION_CACHE_MAX_STALENESS', 5))
+
+    # Background pruning of expired token blocklist rows
+    BLOCKLIST_PRUNE_INTERVAL = float(os.getenv('BLOCKLIST_PRUNE_INTERVAL', 3600))
+    BLOCKLIST_PRUNE_BATCH_SIZE = int(os.getenv('BLOCKLIST_PRUNE_BATCH_SIZE', 1000))
+
+    # Password hashing (werkzeug method spec, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_SALT_LENGTH = int(os.getenv('PASSWORD_HASH_SALT_LENGTH', 16))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 2))
+
+    # Mail outbox background sender
+    MAIL_OUTBOX_POLL_INTERVAL = float(os.getenv('MAIL_OUTBOX_POLL_INTERVAL', 5))
+    MAIL_OUTBOX_BATCH_SIZE = int(os.getenv('MAIL_OUTBOX_BATCH_SIZE', 50))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('MAIL_OUTBOX_MAX_ATTEMPTS', 8))
+    MAIL_OUTBOX_BACKOFF_BASE = float(os.getenv('MAIL_OUTBOX_BACKOFF_BASE', 30))
+    MAIL_OUTBOX_BACKOFF_MAX = float(os.getenv('MAIL_OUTBOX_BACKOFF_MAX', 3600))
+    MAIL_OUTBOX_LEASE = float(os.getenv('MAIL_OUTBOX_LEASE', 300))
+    # Sent messages are deleted this many seconds after sending (0 keeps them), checked every prune interval
+    MAIL_OUTBOX_RETENTION = float(os.getenv('MAIL_OUTBOX_RETENTION', 7 * 24 * 3600))
+    MAIL_OUTBOX_PRUNE_INTERVAL = float(os.getenv('MAIL_OUTBOX_PRUNE_INTERVAL', 3600))
+    MAIL_OUTBOX_PRUNE_BATCH_SIZE = int(os.getenv('MAIL_OUTBOX_PRUNE_BATCH_SIZE', 1000))
+
+    # JSON encoder for API responses: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+
+    # Bulk create endpoints
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 50000))
+    BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 1000))
+
+    # Account balance snapshots: 'daily' or 'monthly'
+    BALANCE_SNAPSHOT_INTERVAL = os.getenv('BALANCE_SNAPSHOT_INTERVAL', 'daily')
+
+    # Month-end customer statements: worker processes used by `flask generate-statements`
+    STATEMENT_WORKERS = int(os.getenv('STATEMENT_WORKERS', os.cpu_count() or 1))
+
+    # Per-worker cache of list view responses (products, accounts, vendors); 0 disables it
+    LIST_CACHE_MAX_BYTES = int(os.getenv('LIST_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+    # Delta sync: rows updated this recently are held back until their transactions have committed
+    CHANGES_SETTLE_SECONDS = float(os.getenv('CHANGES_SETTLE_SECONDS', 2))
+
+    # Per-worker typeahead indexes of customer and product names: seconds between incremental
+    # refreshes, and between full rebuilds that drop hard-deleted rows
+    TYPEAHEAD_MAX_STALENESS = float(os.getenv('TYPEAHEAD_MAX_STALENESS', 2))
+    TYPEAHEAD_REBUILD_INTERVAL = float(os.getenv('TYPEAHEAD_REBUILD_INTERVAL', 3600))
+
+    # Duplicate customer detection (`flask find-duplicate-customers`): lowest pair score proposed for
+    # a merge, and largest blocking-key bucket whose pairs are compared
+    DUPLICATE_MIN_SCORE = float(os.getenv('DUPLICATE_MIN_SCORE', 0.85))
+    DUPLICATE_MAX_BLOCK_SIZE = int(os.getenv('DUPLICATE_MAX_BLOCK_SIZE', 500))
@@ -0,0 +1,98 @@
+# json_provider.py
+import dataclasses
+import decimal
+import enum
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib provider is used without it
+    orjson = None
+
+def json_default(o):
+    """
+    Serialize the types the API returns that json cannot encode natively.
+
+    Dates and times are written as ISO 8601, Decimals and UUIDs as strings
+    and enums (InvoiceStatus, PaymentMethod) as their value.
+    """
+    if isinstance(o, (date, datetime, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if isinstance(o, enum.Enum):
+        return o.value
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Flask's default provider with ISO 8601 dates and enum support.
+
+    Text is written as UTF-8 rather than \\u escapes, and dumps() is
+    compact, so the output is byte for byte the same as orjson's.
+    """
+
+    default = staticmethod(json_default)
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs) -> str:
+        if "indent" not in kwargs:
+            kwargs.setdefault("separators", (",", ":"))
+        return super().dumps(obj, **kwargs)
+
+class OrjsonJSONProvider(StdlibJSONProvider):
+    """
+    JSON provider backed by orjson.
+
+    Output matches StdlibJSONProvider (sorted keys, ISO 8601 dates, enum
+    values) and pretty-printing in debug mode. Calls that pass stdlib
+    json keyword arguments fall back to the stdlib encoder.
+    """
+
+    def _option(self, indent: bool = False) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=json_default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        data = orjson.dumps(obj, default=json_default, option=self._option(indent))
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
+
+def init_json_provider(app):
+    """
+    Install the JSON provider selected by JSON_PROVIDER on an app.
+
+    'auto' uses orjson when it is installed, 'orjson' requires it and
+    'stdlib' always uses the standard library encoder.
+    """
+    choice = app.config['JSON_PROVIDER']
+    if choice == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER is 'orjson' but orjson is not installed")
+    if choice not in ('auto', 'orjson', 'stdlib'):
+        raise RuntimeError(f"Unknown JSON_PROVIDER {choice!r}")
+
+    provider_class = OrjsonJSONProvider if choice != 'stdlib' and orjson is not None else StdlibJSONProvider
+    app.json = provider_class(app)
+    return app.json
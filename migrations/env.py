@@ -51,6 +51,19 @@ def get_metadata():
     return target_db.metadata
 
 
+# The FTS5 table of cash_flow.models.search and the shadow tables SQLite
+# creates for it are managed by raw SQL, not models, so autogenerate must
+# not drop them
+UNMANAGED_TABLE = 'search_index'
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and reflected and compare_to is None and \
+            (name == UNMANAGED_TABLE or name.startswith(UNMANAGED_TABLE + '_')):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +78,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +107,8 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
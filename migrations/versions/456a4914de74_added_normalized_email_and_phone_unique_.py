@@ -0,0 +1,95 @@
+"""added normalized email and phone unique indexes
+
+Revision ID: 456a4914de74
+Revises: dd8ad0c8f31a
+Create Date: 2026-10-18 10:41:09.350822
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '456a4914de74'
+down_revision = 'dd8ad0c8f31a'
+branch_labels = None
+depends_on = None
+
+# Kept in sync with cash_flow.utils; migrations must not import application code
+def normalize_email(email):
+    normalized = email.strip().lower() if email else ''
+    return normalized or None
+
+
+def normalize_phone(phone):
+    normalized = re.sub(r'\D', '', phone) if phone else ''
+    return normalized or None
+
+
+def backfill(table):
+    """Fill email_norm/phone_norm, keeping only the oldest row's value when existing rows collide."""
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(
+        f"SELECT id, email, phone FROM {table} ORDER BY created_at, id"
+    )).fetchall()
+
+    seen_emails, seen_phones = set(), set()
+    for row_id, email, phone in rows:
+        email_norm = normalize_email(email)
+        phone_norm = normalize_phone(phone)
+        if email_norm in seen_emails:
+            email_norm = None
+        if phone_norm in seen_phones:
+            phone_norm = None
+        seen_emails.add(email_norm)
+        seen_phones.add(phone_norm)
+        connection.execute(
+            sa.text(f"UPDATE {table} SET email_norm = :email_norm, phone_norm = :phone_norm WHERE id = :id"),
+            {"email_norm": email_norm, "phone_norm": phone_norm, "id": row_id},
+        )
+
+
+def check_product_names():
+    """Refuse to upgrade while product names repeat, since the unique name index cannot be built over them."""
+    rows = op.get_bind().execute(sa.text(
+        "SELECT name, group_concat(id, ', ') FROM product_services WHERE name IS NOT NULL "
+        "GROUP BY name HAVING count(*) > 1 ORDER BY name"
+    )).fetchall()
+    if rows:
+        duplicates = '\n'.join(f'  {name!r}: {ids}' for name, ids in rows)
+        raise RuntimeError(
+            'product_services has duplicate names, so ix_product_services_name cannot be created. '
+            'Rename or delete all but one product of each name (soft-deleted products count too), '
+            f'then run the upgrade again:\n{duplicates}'
+        )
+
+
+def upgrade():
+    # Checked before any change, as SQLite cannot roll back the ALTERs below
+    check_product_names()
+
+    for table in ('customers', 'vendors'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('email_norm', sa.String(length=100), nullable=True))
+            batch_op.add_column(sa.Column('phone_norm', sa.String(length=20), nullable=True))
+
+        backfill(table)
+
+        op.create_index(op.f(f'ix_{table}_email_norm'), table, ['email_norm'], unique=True)
+        op.create_index(op.f(f'ix_{table}_phone_norm'), table, ['phone_norm'], unique=True)
+
+    op.create_index(op.f('ix_product_services_name'), 'product_services', ['name'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_product_services_name'), table_name='product_services')
+
+    for table in ('vendors', 'customers'):
+        op.drop_index(op.f(f'ix_{table}_phone_norm'), table_name=table)
+        op.drop_index(op.f(f'ix_{table}_email_norm'), table_name=table)
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('phone_norm')
+            batch_op.drop_column('email_norm')
@@ -0,0 +1,28 @@
+"""added covering index over open invoices for receivables aging
+
+Revision ID: 504167398347
+Revises: 1d4e8dcae5a9
+Create Date: 2026-10-18 17:02:51.336904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '504167398347'
+down_revision = '1d4e8dcae5a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_invoices_aging', 'invoices', ['customer_id', 'due_date', 'total_amount', 'amount_paid', 'created_at'], unique=False,
+        sqlite_where=sa.text('deleted_at IS NULL AND amount_paid < total_amount'),
+        postgresql_where=sa.text('deleted_at IS NULL AND amount_paid < total_amount'),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_invoices_aging', table_name='invoices')
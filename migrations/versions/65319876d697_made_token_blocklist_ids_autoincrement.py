@@ -0,0 +1,32 @@
+"""made token blocklist ids autoincrement
+
+Revision ID: 65319876d697
+Revises: dd3d2502cee1
+Create Date: 2026-10-18 21:42:17.318904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '65319876d697'
+down_revision = 'dd3d2502cee1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Other databases never hand out an id twice; SQLite needs AUTOINCREMENT, which only a rebuild can add
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('token_blocklist', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('token_blocklist', schema=None, recreate='always') as batch_op:
+        pass
@@ -0,0 +1,34 @@
+"""added expires_at to token blocklist
+
+Revision ID: 709b790d9cf5
+Revises: 456a4914de74
+Create Date: 2026-10-18 11:20:52.671390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '709b790d9cf5'
+down_revision = '456a4914de74'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_token_blocklist_expires_at'), ['expires_at'], unique=False)
+
+    # Existing rows only revoked access tokens, which use flask-jwt-extended's default 15 minute lifetime
+    op.execute(
+        "UPDATE token_blocklist SET expires_at = datetime(created_at, '+15 minutes') "
+        "WHERE expires_at IS NULL AND created_at IS NOT NULL"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_expires_at'))
+        batch_op.drop_column('expires_at')
@@ -0,0 +1,32 @@
+"""added updated_at indexes for list etags
+
+Revision ID: 7fae150dcd6f
+Revises: 44fd6c9eda6e
+Create Date: 2026-10-18 19:48:12.530671
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7fae150dcd6f'
+down_revision = '44fd6c9eda6e'
+branch_labels = None
+depends_on = None
+
+# Tables inheriting BaseModel
+BASE_TABLES = [
+    'accounts', 'transactions', 'expense_category', 'income_category', 'vendors', 'vendor_contacts',
+    'customers', 'customer_contacts', 'product_services', 'invoices', 'payments', 'transfers',
+]
+
+
+def upgrade():
+    for table in BASE_TABLES:
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at', 'id'], unique=False)
+
+
+def downgrade():
+    for table in reversed(BASE_TABLES):
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
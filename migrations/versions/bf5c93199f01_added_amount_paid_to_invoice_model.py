@@ -0,0 +1,39 @@
+"""added amount_paid to invoice model
+
+Revision ID: bf5c93199f01
+Revises: 0cd4b94859f4
+Create Date: 2026-10-18 09:12:41.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bf5c93199f01'
+down_revision = '0cd4b94859f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('amount_paid', sa.Float(), server_default='0', nullable=False))
+
+    # Backfill from existing payments, then derive the status from the new column
+    op.execute(
+        "UPDATE invoices SET amount_paid = ("
+        "SELECT COALESCE(SUM(payments.amount), 0) FROM payments "
+        "WHERE payments.invoice_id = invoices.id AND payments.deleted_at IS NULL)"
+    )
+    op.execute(
+        "UPDATE invoices SET status = CASE "
+        "WHEN total_amount - amount_paid <= 0 THEN 'PAID' "
+        "WHEN amount_paid > 0 THEN 'PARTIALLY_PAID' "
+        "ELSE 'UNPAID' END"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.drop_column('amount_paid')
@@ -0,0 +1,55 @@
+"""added soft delete and foreign key indexes
+
+Revision ID: dd8ad0c8f31a
+Revises: bf5c93199f01
+Create Date: 2026-10-18 10:03:27.904115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'dd8ad0c8f31a'
+down_revision = 'bf5c93199f01'
+branch_labels = None
+depends_on = None
+
+# Tables inheriting BaseModel, listed by (created_at, id) for non-deleted rows
+ACTIVE_TABLES = [
+    'accounts', 'transactions', 'expense_category', 'income_category', 'vendors', 'vendor_contacts',
+    'customers', 'customer_contacts', 'product_services', 'invoices', 'payments', 'transfers',
+]
+
+# Foreign key columns used for child lookups
+FOREIGN_KEYS = [
+    ('payments', 'invoice_id'),
+    ('payments', 'account_id'),
+    ('invoices', 'customer_id'),
+    ('customer_contacts', 'customer_id'),
+    ('vendor_contacts', 'vendor_id'),
+    ('transfers', 'from_account_id'),
+    ('transfers', 'to_account_id'),
+    ('transactions', 'user_id'),
+    ('transactions', 'account_id'),
+]
+
+
+def upgrade():
+    for table in ACTIVE_TABLES:
+        op.create_index(
+            f'ix_{table}_active_created_at', table, ['created_at', 'id'], unique=False,
+            sqlite_where=sa.text('deleted_at IS NULL'),
+            postgresql_where=sa.text('deleted_at IS NULL'),
+        )
+
+    for table, column in FOREIGN_KEYS:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+
+
+def downgrade():
+    for table, column in reversed(FOREIGN_KEYS):
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
+
+    for table in reversed(ACTIVE_TABLES):
+        op.drop_index(f'ix_{table}_active_created_at', table_name=table)
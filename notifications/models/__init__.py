@@ -0,0 +1 @@
+from .outbox_model import OutboxMessage
@@ -0,0 +1,40 @@
+from sqlalchemy import String, Text, DateTime, Integer
+from extensions import db
+from datetime import datetime
+
+class OutboxMessage(db.Model):
+    __tablename__ = 'mail_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)  # Unique identifier, also the send order
+    subject = db.Column(String(255), nullable=False)
+    recipients = db.Column(Text, nullable=False)  # Comma-separated list of addresses
+    body = db.Column(Text, nullable=True)  # Plain-text body
+    html = db.Column(Text, nullable=True)  # Optional HTML body
+    sender = db.Column(String(255), nullable=True)  # Defaults to MAIL_DEFAULT_SENDER when empty
+    status = db.Column(String(20), default='pending', nullable=False)  # 'pending', 'sent' or 'failed'
+    attempts = db.Column(Integer, default=0, nullable=False)  # Number of failed send attempts
+    next_attempt_at = db.Column(DateTime, default=datetime.utcnow, nullable=False)  # Not sent before this time
+    claimed_by = db.Column(String(36), nullable=True)  # Sender batch currently holding the message
+    locked_until = db.Column(DateTime, nullable=True)  # Claim expiry, after which another sender may retry
+    last_error = db.Column(Text, nullable=True)
+    created_at = db.Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_mail_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+        db.Index('ix_mail_outbox_status_sent_at', 'status', 'sent_at'),  # Pruning of old sent messages
+    )
+
+    def to_dict(self):
+        """Convert the OutboxMessage object to a dictionary for easy serialization."""
+        return {
+            'id': self.id,
+            'subject': self.subject,
+            'recipients': self.recipients.split(','),
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at,
+            'last_error': self.last_error,
+            'created_at': self.created_at,
+            'sent_at': self.sent_at,
+        }
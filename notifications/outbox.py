@@ -0,0 +1,254 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import delete, func, select, update
+from extensions import db
+from notifications.models import OutboxMessage
+
+def enqueue_mail(subject: str, recipients: List[str], body: Optional[str] = None,
+                 html: Optional[str] = None, sender: Optional[str] = None) -> OutboxMessage:
+    """
+    Add an email to the outbox in the current session.
+
+    The message is sent by the background sender once the caller commits,
+    so it is only sent if the surrounding transaction succeeds.
+
+    Args:
+        subject (str): Message subject.
+        recipients (List[str]): Recipient addresses.
+        body (Optional[str]): Plain-text body.
+        html (Optional[str]): HTML body.
+        sender (Optional[str]): From address, defaults to MAIL_DEFAULT_SENDER.
+
+    Returns:
+        OutboxMessage: The pending outbox row.
+    """
+    message = OutboxMessage(
+        subject=subject, recipients=','.join(recipients), body=body, html=html, sender=sender,
+        status='pending', attempts=0, next_attempt_at=datetime.utcnow(),
+    )
+    db.session.add(message)
+    return message
+
+class OutboxSender:
+    """
+    Background sender for the mail outbox.
+
+    A daemon thread per worker claims up to `batch_size` due messages with a
+    single UPDATE, so several workers never send the same message, and sends
+    the whole batch over one SMTP connection. Failed messages are retried
+    with exponential backoff until `max_attempts` is reached. Every
+    `prune_interval` seconds the thread also deletes messages sent more
+    than `retention` seconds ago, in chunks, so the table stays small.
+    """
+
+    def __init__(self, app, mail, poll_interval: float, batch_size: int, max_attempts: int,
+                 backoff_base: float, backoff_max: float, lease: float, retention: float = 0,
+                 prune_interval: float = 0, prune_batch_size: int = 1000):
+        self.app = app
+        self.mail = mail
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = timedelta(seconds=lease)
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self.prune_batch_size = prune_batch_size
+        self.sent = 0
+        self.failed = 0
+        self.total_pruned = 0
+        self.last_prune_at: Optional[datetime] = None
+        self._last_prune = None
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._prune_lock = threading.Lock()
+
+    def backoff(self, attempts: int) -> timedelta:
+        """Delay before the next attempt after `attempts` failures."""
+        return timedelta(seconds=min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max))
+
+    def _claim(self, now: datetime) -> List[OutboxMessage]:
+        """Claim a batch of due messages for this sender."""
+        claim_token = str(uuid.uuid4())
+        due_ids = select(OutboxMessage.id).where(
+            OutboxMessage.status == 'pending',
+            OutboxMessage.next_attempt_at <= now,
+            (OutboxMessage.locked_until.is_(None)) | (OutboxMessage.locked_until < now),
+        ).order_by(OutboxMessage.id).limit(self.batch_size)
+        db.session.execute(
+            update(OutboxMessage).where(OutboxMessage.id.in_(due_ids))
+            .values(claimed_by=claim_token, locked_until=now + self.lease),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        return OutboxMessage.query.filter_by(claimed_by=claim_token, status='pending') \
+            .order_by(OutboxMessage.id).all()
+
+    def _record_failure(self, message: OutboxMessage, error: Exception, now: datetime):
+        message.attempts += 1
+        message.last_error = str(error)[:1000]
+        message.claimed_by = None
+        message.locked_until = None
+        if message.attempts >= self.max_attempts:
+            message.status = 'failed'
+            self.failed += 1
+        else:
+            message.next_attempt_at = now + self.backoff(message.attempts)
+
+    def send_batch(self) -> int:
+        """
+        Claim and send one batch of due messages.
+
+        Returns:
+            int: Number of messages claimed.
+        """
+        now = datetime.utcnow()
+        messages = self._claim(now)
+        if not messages:
+            return 0
+
+        try:
+            with self.mail.connect() as connection:
+                for message in messages:
+                    try:
+                        connection.send(Message(
+                            message.subject, recipients=message.recipients.split(','),
+                            body=message.body, html=message.html, sender=message.sender,
+                        ))
+                        message.status = 'sent'
+                        message.sent_at = datetime.utcnow()
+                        message.claimed_by = None
+                        message.locked_until = None
+                        self.sent += 1
+                    except Exception as e:
+                        self._record_failure(message, e, now)
+                    db.session.commit()
+        except Exception as e:
+            # Connecting failed, or the connection broke: retry everything still unsent
+            current_app.logger.error(f"Mail outbox batch failed: {e}")
+            for message in messages:
+                if message.status == 'pending' and message.claimed_by is not None:
+                    self._record_failure(message, e, now)
+            db.session.commit()
+        return len(messages)
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete messages sent more than `retention` seconds ago, one chunk per transaction.
+
+        Pending and failed messages are kept.
+
+        Args:
+            now (Optional[datetime]): Current time, defaults to the current UTC time.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.retention)
+        deleted = 0
+        with self._prune_lock:
+            while True:
+                old_ids = select(OutboxMessage.id).where(
+                    OutboxMessage.status == 'sent', OutboxMessage.sent_at < cutoff,
+                ).limit(self.prune_batch_size)
+                result = db.session.execute(
+                    delete(OutboxMessage).where(OutboxMessage.id.in_(old_ids)),
+                    execution_options={"synchronize_session": False},
+                )
+                db.session.commit()
+                deleted += result.rowcount
+                if result.rowcount < self.prune_batch_size:
+                    break
+
+            self.total_pruned += deleted
+            self.last_prune_at = now
+            self._last_prune = time.monotonic()
+        return deleted
+
+    def _prune_due(self) -> bool:
+        if self.retention <= 0 or self.prune_interval <= 0:
+            return False
+        return self._last_prune is None or time.monotonic() - self._last_prune >= self.prune_interval
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            with self.app.app_context():
+                try:
+                    while self.send_batch() == self.batch_size:
+                        pass
+                    if self._prune_due():
+                        self.prune()
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Mail outbox sender failed: {e}")
+
+    def start(self):
+        """Start the background sender thread once per worker."""
+        if self.poll_interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='mail-outbox-sender', daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        """Ask the sender to look for new messages now instead of at the next poll."""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def stats(self) -> dict:
+        """Return outbox queue depth and send counters."""
+        counts = dict(db.session.query(OutboxMessage.status, func.count(OutboxMessage.id))
+                      .group_by(OutboxMessage.status).all())
+        oldest_pending = db.session.query(func.min(OutboxMessage.created_at)) \
+            .filter(OutboxMessage.status == 'pending').scalar()
+        return {
+            "pending": counts.get('pending', 0),
+            "sent": counts.get('sent', 0),
+            "failed": counts.get('failed', 0),
+            "oldest_pending_at": oldest_pending.isoformat() if oldest_pending else None,
+            "sent_by_this_worker": self.sent,
+            "failed_by_this_worker": self.failed,
+            "retention_seconds": self.retention,
+            "pruned_by_this_worker": self.total_pruned,
+            "last_prune_at": self.last_prune_at.isoformat() if self.last_prune_at else None,
+        }
+
+def init_outbox_sender(app, mail) -> OutboxSender:
+    """Create the outbox sender for an app and start it with the first request."""
+    sender = OutboxSender(
+        app, mail,
+        poll_interval=app.config['MAIL_OUTBOX_POLL_INTERVAL'],
+        batch_size=app.config['MAIL_OUTBOX_BATCH_SIZE'],
+        max_attempts=app.config['MAIL_OUTBOX_MAX_ATTEMPTS'],
+        backoff_base=app.config['MAIL_OUTBOX_BACKOFF_BASE'],
+        backoff_max=app.config['MAIL_OUTBOX_BACKOFF_MAX'],
+        lease=app.config['MAIL_OUTBOX_LEASE'],
+        retention=app.config['MAIL_OUTBOX_RETENTION'],
+        prune_interval=app.config['MAIL_OUTBOX_PRUNE_INTERVAL'],
+        prune_batch_size=app.config['MAIL_OUTBOX_PRUNE_BATCH_SIZE'],
+    )
+    app.extensions['outbox_sender'] = sender
+
+    # Started lazily so CLI commands such as `flask db upgrade` never spawn the thread
+    @app.before_request
+    def start_outbox_sender():
+        sender.start()
+
+    return sender
+
+def get_outbox_sender() -> OutboxSender:
+    """Return the outbox sender of the current app."""
+    return current_app.extensions['outbox_sender']
@@ -0,0 +1,68 @@
+"""
+Benchmark of the JSON providers on a large list response.
+
+Encodes a payload of invoice-like rows holding UUID, Decimal, enum, date
+and datetime values through provider.response(), as jsonify does, with
+the stdlib provider and, when it is installed, the orjson one. Prints the
+best of several runs and checks that both wrote the same bytes.
+
+Run from the repository root:
+
+    python tests/bench_json_provider.py [rows]
+"""
+import os
+import sys
+import timeit
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from json_provider import OrjsonJSONProvider, StdlibJSONProvider, orjson
+from cash_flow.models.invoice_model import InvoiceStatus
+
+def payload(rows: int) -> dict:
+    start = datetime(2030, 1, 1)
+    statuses = list(InvoiceStatus)
+    return {'items': [
+        {
+            'id': uuid.UUID(int=n),
+            'customer_id': uuid.UUID(int=n % 500),
+            'total_amount': Decimal(f'{100 + n % 1000}.50'),
+            'amount_paid': float(n % 100),
+            'status': statuses[n % len(statuses)],
+            'due_date': date(2030, 1, 1) + timedelta(days=n % 365),
+            'created_at': start + timedelta(seconds=n, microseconds=n),
+            'updated_at': start + timedelta(seconds=2 * n),
+            'deleted_at': None,
+            '__class__': 'Invoice',
+        }
+        for n in range(rows)
+    ], 'next_cursor': None}
+
+def best(fn, repeat: int = 5) -> float:
+    """Best time of one call, in milliseconds."""
+    return min(timeit.repeat(fn, repeat=repeat, number=1)) * 1000
+
+def main(rows: int):
+    app = Flask(__name__)
+    data = payload(rows)
+    providers = [StdlibJSONProvider(app)]
+    if orjson is not None:
+        providers.append(OrjsonJSONProvider(app))
+    else:
+        print('orjson is not installed, timing the stdlib provider only')
+
+    with app.app_context():
+        bodies = [provider.response(data).get_data() for provider in providers]
+        timings = [best(lambda provider=provider: provider.response(data)) for provider in providers]
+
+    print(f'{rows} rows, {len(bodies[0]) / 1e6:.1f} MB')
+    for provider, timing in zip(providers, timings):
+        print(f'  {type(provider).__name__:<20} {timing:8.1f} ms   {timings[0] / timing:.1f}x')
+    print('  same bytes' if all(body == bodies[0] for body in bodies) else '  OUTPUT DIFFERS')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,63 @@
+"""
+Microbenchmark of the compiled model serializers against the legacy to_dict.
+
+Serializes every loaded invoice and payment with each, on its own and
+followed by JSON encoding of the list (the legacy dicts still hold date
+objects, which the encoder converts). Prints the best of several runs.
+
+Run from the repository root:
+
+    python tests/bench_serializers.py [rows]
+"""
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.update(SQLALCHEMY_DATABASE_URI='sqlite://', LOG_FILE='', BLOCKLIST_PRUNE_INTERVAL='0',
+                  MAIL_OUTBOX_POLL_INTERVAL='0')
+
+from app import create_app
+from extensions import db
+from cash_flow.models import Customer, Invoice, Payment
+from cash_flow.models.payment import PaymentMethod
+from test_serializers import legacy_to_dict
+
+def populate(rows: int):
+    customer = Customer(first_name='Bench', last_name='Mark', email='bench@example.com', phone='555-000-0000',
+                        address='1 Main Street')
+    db.session.add(customer)
+    db.session.flush()
+    invoices = [Invoice(customer_id=customer.id, total_amount=100.0 + n, due_date=date(2030, 1, 1) + timedelta(days=n % 365))
+                for n in range(rows)]
+    db.session.add_all(invoices)
+    db.session.flush()
+    db.session.add_all([
+        Payment(invoice_id=invoice.id, amount=10.0, payment_date=invoice.due_date, payment_method=PaymentMethod.BANK)
+        for invoice in invoices
+    ])
+    db.session.commit()
+
+def best(fn, repeat: int = 15, number: int = 5) -> float:
+    """Best time of one call, in milliseconds."""
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number * 1000
+
+def main(rows: int):
+    app = create_app()
+    with app.app_context():
+        populate(rows)
+        loaded = Invoice.query.all() + Payment.query.all()
+        dumps = app.json.dumps
+
+        results = {
+            'to_dict': (best(lambda: [legacy_to_dict(o) for o in loaded]), best(lambda: [o.to_dict() for o in loaded])),
+            'to_dict + json': (best(lambda: dumps([legacy_to_dict(o) for o in loaded])),
+                               best(lambda: dumps([o.to_dict() for o in loaded]))),
+        }
+        print(f'{len(loaded)} rows ({rows} invoices, {rows} payments), {type(app.json).__name__}')
+        for label, (legacy, compiled) in results.items():
+            print(f'  {label:<15} legacy {legacy:7.2f} ms   compiled {compiled:7.2f} ms   {legacy / compiled:.1f}x')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
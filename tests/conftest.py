@@ -0,0 +1,79 @@
+import itertools
+import os
+from datetime import date
+
+# Point the app at a throwaway in-memory database, with its background threads and error log file off,
+# before config is imported
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+os.environ['LOG_FILE'] = ''
+os.environ['BLOCKLIST_PRUNE_INTERVAL'] = '0'
+os.environ['MAIL_OUTBOX_POLL_INTERVAL'] = '0'
+
+import pytest
+from app import create_app
+from extensions import db
+from cash_flow.models import Account, Customer, Invoice, Payment
+from cash_flow.models.payment import PaymentMethod
+
+@pytest.fixture
+def app():
+    """A fresh app over an empty in-memory database, with its app context pushed."""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_customer(app):
+    """Create and commit a customer; every call gets a unique email and phone."""
+    counter = itertools.count(1)
+
+    def make(**fields):
+        n = next(counter)
+        customer = Customer(**{
+            'first_name': 'Test', 'last_name': f'Customer{n}', 'email': f'customer{n}@example.com',
+            'phone': f'555-010-{n:04d}', 'address': f'{n} Main Street', **fields,
+        })
+        db.session.add(customer)
+        db.session.commit()
+        return customer
+    return make
+
+@pytest.fixture
+def make_account(app):
+    """Create and commit an account."""
+    def make(name='Checking', balance=0.0, **fields):
+        account = Account(name=name, balance=balance, account_type=fields.pop('account_type', 'bank'), **fields)
+        db.session.add(account)
+        db.session.commit()
+        return account
+    return make
+
+@pytest.fixture
+def make_invoice(app, make_customer):
+    """Create and commit an invoice, for a new customer unless one is given."""
+    def make(total_amount=100.0, customer=None, due_date=date(2030, 1, 31), **fields):
+        customer = customer or make_customer()
+        invoice = Invoice(customer_id=customer.id, total_amount=total_amount, due_date=due_date, **fields)
+        db.session.add(invoice)
+        db.session.commit()
+        return invoice
+    return make
+
+@pytest.fixture
+def make_payment(app):
+    """Create and commit a payment against an invoice."""
+    def make(invoice, amount, payment_date=date(2030, 1, 15), account=None, **fields):
+        payment = Payment(
+            invoice_id=invoice.id, amount=amount, payment_date=payment_date, payment_method=PaymentMethod.BANK,
+            account_id=account.id if account else None, **fields,
+        )
+        db.session.add(payment)
+        db.session.commit()
+        return payment
+    return make
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+import pytest
+from extensions import db
+from cash_flow.models import Invoice, Payment
+from cash_flow.models.aging import AGING_BUCKETS, TOLERANCE, receivables_aging
+
+def bucket_of(days_past_due):
+    for name, days in AGING_BUCKETS:
+        if days is None or days_past_due <= days:
+            return name
+
+def reference_aging(as_of):
+    """Age every invoice one by one, from its payments up to `as_of`."""
+    aged = {}
+    for invoice in Invoice.query.filter(Invoice.deleted_at.is_(None)):
+        if invoice.created_at.date() > as_of:
+            continue
+        paid = sum(p.amount for p in Payment.query.filter(
+            Payment.invoice_id == invoice.id, Payment.deleted_at.is_(None), Payment.payment_date <= as_of))
+        balance = invoice.total_amount - paid
+        if balance <= TOLERANCE:
+            continue
+        row = aged.setdefault(invoice.customer_id, {name: 0.0 for name, _ in AGING_BUCKETS} | {'invoice_count': 0})
+        row[bucket_of((as_of - invoice.due_date).days)] += balance
+        row['invoice_count'] += 1
+    return aged
+
+def created(day):
+    return f'{day.isoformat()}T09:00:00.000000'
+
+@pytest.fixture
+def receivables(make_customer, make_invoice, make_payment):
+    """Three customers with invoices created, due and paid at various points of early 2030."""
+    ada = make_customer(first_name='Ada', last_name='Byron')
+    alan = make_customer(first_name='Alan', last_name='Turing')
+    grace = make_customer(first_name='Grace', last_name='Hopper')
+    start = date(2030, 1, 1)
+
+    first = make_invoice(300.0, customer=ada, due_date=start + timedelta(days=30), created_at=created(start))
+    make_payment(first, 100.0, payment_date=start + timedelta(days=20))
+    make_payment(first, 50.0, payment_date=start + timedelta(days=95))
+    make_invoice(80.0, customer=ada, due_date=start + timedelta(days=60), created_at=created(start + timedelta(days=40)))
+
+    paid = make_invoice(500.0, customer=alan, due_date=start + timedelta(days=10), created_at=created(start))
+    make_payment(paid, 500.0, payment_date=start + timedelta(days=70))
+    deleted_payment = make_payment(paid, 1.0, payment_date=start + timedelta(days=5))
+    deleted_payment.soft_delete(db.session)
+    make_invoice(45.0, customer=alan, due_date=start + timedelta(days=120), created_at=created(start + timedelta(days=100)))
+
+    make_invoice(900.0, customer=grace, due_date=start, created_at=created(start)).soft_delete(db.session)
+    make_invoice(20.0, customer=grace, due_date=start - timedelta(days=5), created_at=created(start))
+    return ada, alan, grace
+
+def test_matches_aging_each_invoice_on_its_own(receivables):
+    connection = db.session.connection()
+    for offset in range(-1, 160, 3):
+        as_of = date(2030, 1, 1) + timedelta(days=offset)
+        rows, totals = receivables_aging(connection, as_of)
+        expected = reference_aging(as_of)
+
+        assert {row['customer_id'] for row in rows} == set(expected), as_of
+        for row in rows:
+            for name, _ in AGING_BUCKETS:
+                assert row[name] == pytest.approx(expected[row['customer_id']][name]), (as_of, name)
+            assert row['invoice_count'] == expected[row['customer_id']]['invoice_count']
+            assert row['total'] == pytest.approx(sum(row[name] for name, _ in AGING_BUCKETS))
+        assert totals['total'] == pytest.approx(sum(row['total'] for row in rows))
+        assert totals['invoice_count'] == sum(row['invoice_count'] for row in rows)
+
+@pytest.mark.parametrize('days_late, bucket', [
+    (-1, 'current'), (0, 'current'), (1, 'days_1_30'), (30, 'days_1_30'), (31, 'days_31_60'),
+    (60, 'days_31_60'), (61, 'days_61_90'), (90, 'days_61_90'), (91, 'days_over_90'),
+])
+def test_bucket_boundaries(make_invoice, days_late, bucket):
+    due = date(2030, 6, 1)
+    make_invoice(10.0, due_date=due, created_at=created(date(2030, 1, 1)))
+    [row], _ = receivables_aging(db.session.connection(), due + timedelta(days=days_late))
+    assert row[bucket] == 10.0 and row['total'] == 10.0
+
+def test_rows_are_ordered_by_name_and_filtered_by_customer(receivables):
+    ada, alan, grace = receivables
+    rows, _ = receivables_aging(db.session.connection(), date(2030, 4, 15))
+    assert [row['last_name'] for row in rows] == ['Byron', 'Hopper', 'Turing']
+
+    rows, totals = receivables_aging(db.session.connection(), date(2030, 4, 15), [grace.id])
+    assert [row['customer_id'] for row in rows] == [grace.id]
+    assert totals['days_over_90'] == 20.0
+
+def test_aging_endpoint(client, receivables):
+    ada, _, _ = receivables
+    body = client.get(f'/cash_flow/reports/ar_aging?as_of=2030-02-15&customer_id={ada.id}').get_json()
+    assert body['as_of'] == '2030-02-15'
+    [row] = body['customers']
+    # 200 left of the first invoice, 16 days late, and the second not yet due
+    assert (row['days_1_30'], row['current'], row['invoice_count']) == (200.0, 80.0, 2)
+    assert client.get('/cash_flow/reports/ar_aging?as_of=15-02-2030').status_code == 400
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from cash_flow.models import Customer, Invoice, Payment, ProductService
+from cash_flow.views import bulk
+
+def customer_item(n, **fields):
+    return {'first_name': 'Bulk', 'last_name': f'Customer{n}', 'email': f'bulk{n}@example.com',
+            'phone': f'555-030-{n:04d}', 'address': f'{n} Side Street', **fields}
+
+def test_all_items_created_is_201(client):
+    response = client.post('/cash_flow/new_customer/bulk', json=[customer_item(1), customer_item(2)])
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body['created'] == 2 and body['failed'] == []
+    ids = [result['id'] for result in body['results']]
+    customers = {customer.id: customer for customer in Customer.query}
+    assert set(ids) == set(customers)
+    # Normalized columns are set even though the model validators do not run
+    assert customers[ids[0]].email_norm == 'bulk1@example.com'
+    assert customers[ids[0]].phone_norm == '5550300001'
+
+def test_some_items_failing_is_207(client, make_customer):
+    make_customer(email='taken@example.com')
+    items = [
+        customer_item(1),
+        customer_item(2, email='not-an-email'),
+        customer_item(3, email='TAKEN@example.com'),
+        customer_item(4),
+        customer_item(5, phone='555-030-0004'),  # Repeats an earlier item of the batch
+    ]
+    response = client.post('/cash_flow/new_customer/bulk', json=items)
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert body['created'] == 2
+    assert body['failed'] == [1, 2, 4]
+    results = body['results']
+    assert [result['index'] for result in results] == [0, 1, 2, 3, 4]
+    assert results[1]['error'] == 'Validation failed' and results[1]['details']
+    assert 'id' in results[0] and 'id' in results[3]
+    assert Customer.query.count() == 3
+
+def test_nothing_created_is_400(client):
+    response = client.post('/cash_flow/product_service/bulk', json=[{'name': 'Widget', 'price': 'free', 'cost': 1}])
+    assert response.status_code == 400
+    assert response.get_json()['failed'] == [0]
+
+def test_atomic_request_rejects_everything_on_one_failure(client, make_invoice):
+    invoice = make_invoice()
+    items = [{'customer_id': invoice.customer_id, 'total_amount': 10, 'due_date': '2030-01-01'},
+             {'customer_id': 'missing', 'total_amount': 10, 'due_date': '2030-01-01'}]
+    response = client.post('/cash_flow/invoice/bulk?atomic=1', json=items)
+
+    assert response.status_code == 400
+    assert response.get_json()['failed'] == [1]
+    assert Invoice.query.count() == 1
+
+def test_bulk_payments_update_invoice_totals(client, make_invoice):
+    invoice = make_invoice(total_amount=100.0)
+    item = {'invoice_id': invoice.id, 'payment_date': '2030-01-10', 'amount': 30, 'payment_method': 'cash'}
+    response = client.post('/cash_flow/payment/bulk', json=[item, item, {**item, 'invoice_id': 'missing'}])
+
+    assert response.status_code == 207
+    assert response.get_json()['failed'] == [2]
+    db.session.expire_all()
+    assert db.session.get(Invoice, invoice.id).amount_paid == 60.0
+
+def test_each_chunk_is_stamped_when_it_is_inserted(app, client, monkeypatch):
+    class Clock(datetime):
+        now = datetime(2030, 1, 1)
+
+        @classmethod
+        def utcnow(cls):
+            cls.now += timedelta(seconds=1)
+            return cls.now
+
+    monkeypatch.setattr(bulk, 'datetime', Clock)
+    app.config['BULK_CHUNK_SIZE'] = 2
+    items = [{'name': f'Product {n}', 'price': 2, 'cost': 1} for n in range(5)]
+    response = client.post('/cash_flow/product_service/bulk', json=items)
+
+    assert response.status_code == 201
+    stamps = [(p.created_at, p.updated_at) for p in ProductService.query.order_by(ProductService.name)]
+    assert [created for created, _ in stamps] == [datetime(2030, 1, 1, 0, 0, s) for s in (1, 1, 2, 2, 3)]
+    assert all(created == updated for created, updated in stamps)
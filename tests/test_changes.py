@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+from extensions import db
+from cash_flow.models import CustomerContact, ProductService, Vendor
+from cash_flow.views.changes_view import CHANGE_TYPES, decode_change_token, encode_change_token
+
+SHARED = '2020-01-01T00:00:00.000000'
+TYPE_NAMES = {model: name for name, model in CHANGE_TYPES.items()}
+
+def changes(client, **params):
+    response = client.get('/cash_flow/changes', query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def sync(client, since=None, **params):
+    """Follow next_token until has_more is false, returning every change and the last token."""
+    seen = []
+    while True:
+        body = changes(client, **params, **({'since': since} if since else {}))
+        seen += body['changes']
+        since = body['next_token']
+        if not body['has_more']:
+            return seen, since
+
+@pytest.fixture
+def shared_timestamp(app, make_customer, make_account):
+    """Rows of five types, two of each, all last updated in the same microsecond, and one older account."""
+    app.config['CHANGES_SETTLE_SECONDS'] = 0
+    make_account(name='Older', updated_at='2019-12-31T00:00:00.000000')
+    rows = [make_account(name=f'Account {n}', updated_at=SHARED) for n in range(2)]
+    rows += [make_customer(updated_at=SHARED) for _ in range(2)]
+    rows += [Vendor(first_name='Ana', last_name=f'Lima {n}', email=f'ana{n}@example.com', phone=f'555-020-000{n}',
+                    updated_at=SHARED) for n in range(2)]
+    rows += [ProductService(name=f'Product {n}', price=1.0, cost=0.5, updated_at=SHARED) for n in range(2)]
+    db.session.add_all(rows[4:])
+    db.session.commit()
+    rows += [CustomerContact(customer_id=rows[2].id, contact_type='email', contact_value=f'c{n}@example.com',
+                             updated_at=SHARED) for n in range(2)]
+    db.session.add_all(rows[-2:])
+    db.session.commit()
+    return rows
+
+def test_token_round_trip():
+    position = (datetime(2030, 1, 2, 3, 4, 5, 6), 'invoice', 'abc')
+    assert decode_change_token(encode_change_token(position)) == (True, position)
+    assert decode_change_token('!!') == (False, None)
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 100])
+def test_paging_through_a_shared_updated_at_returns_each_row_once(client, shared_timestamp, limit):
+    seen, _ = sync(client, limit=limit)
+    # Ties on updated_at are broken by type name, then id
+    expected = sorted((TYPE_NAMES[type(row)], row.id) for row in shared_timestamp)
+    assert [(c['type'], c['id']) for c in seen[1:]] == expected
+    assert seen[0]['data']['name'] == 'Older'
+    assert all(c['op'] == 'upsert' for c in seen)
+
+def test_a_later_sync_returns_only_new_changes(client, shared_timestamp):
+    _, token = sync(client, limit=4)
+    assert changes(client, since=token) == {'changes': [], 'next_token': token, 'has_more': False}
+
+    vendor = Vendor.query.first()
+    vendor.description = 'Updated'
+    db.session.commit()
+    body = changes(client, since=token)
+    assert [(c['type'], c['id'], c['data']['description']) for c in body['changes']] == [('vendor', vendor.id, 'Updated')]
+    assert changes(client, since=body['next_token'])['changes'] == []
+
+def test_soft_delete_comes_back_as_a_tombstone(client, shared_timestamp):
+    _, token = sync(client)
+    product = ProductService.query.first()
+    product.soft_delete(db.session)
+
+    [change] = changes(client, since=token)['changes']
+    assert (change['type'], change['id'], change['op']) == ('product_service', product.id, 'delete')
+    assert change['deleted_at'] == product.deleted_at.isoformat()
+    assert 'data' not in change
+
+def test_types_filter(client, shared_timestamp):
+    seen, _ = sync(client, types='vendor,customer', limit=1)
+    assert [c['type'] for c in seen] == ['customer', 'customer', 'vendor', 'vendor']
+
+def test_recent_rows_are_held_back_until_they_settle(app, client, shared_timestamp, make_customer):
+    app.config['CHANGES_SETTLE_SECONDS'] = 60
+    seen, token = sync(client)
+    newest = make_customer()
+    assert newest.id not in {c['id'] for c in seen}
+    assert changes(client, since=token)['changes'] == []
+
+    app.config['CHANGES_SETTLE_SECONDS'] = 0
+    assert [c['id'] for c in changes(client, since=token)['changes']] == [newest.id]
+
+@pytest.mark.parametrize('params', [
+    {'since': 'not-a-token'}, {'since': 'WzEsMl0'}, {'types': 'customer,widget'}, {'types': 'Customer'}, {'limit': '0'},
+])
+def test_bad_parameters_are_rejected(client, params):
+    response = client.get('/cash_flow/changes', query_string=params)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
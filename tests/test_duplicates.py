@@ -0,0 +1,125 @@
+import itertools
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from extensions import db
+from cash_flow.models import Customer, CustomerContact, Invoice
+from cash_flow.duplicates import CustomerRecord, active_customer_records, find_duplicates, score_pair, soundex
+
+_ages = itertools.count()
+
+def record(first_name, last_name, email=None, phone=None):
+    """A CustomerRecord made from a row like active_customer_records reads; each one is newer than the last."""
+    n = next(_ages)
+    return CustomerRecord(SimpleNamespace(
+        id=f'c{n:03d}', created_at=datetime(2030, 1, 1) + timedelta(minutes=n),
+        first_name=first_name, last_name=last_name, email_norm=email, phone_norm=phone,
+    ))
+
+@pytest.mark.parametrize('word, code', [
+    ('Robert', 'R163'), ('Rupert', 'R163'), ('Ashcraft', 'A261'), ('Tymczak', 'T522'),
+    ('Pfister', 'P236'), ('Honeyman', 'H555'), ('Lee', 'L000'), ('Müller', 'M460'), ('', ''), ('42', ''),
+])
+def test_soundex(word, code):
+    assert soundex(word) == code
+
+def test_score_pair():
+    jane = record('Jane', 'Smith', 'jane.smith@example.com', '5550100001')
+    assert score_pair(jane, record('Smith', 'Jane', 'jane.smith@example.com', '5550100001')) == 1.0
+    assert score_pair(jane, record('Jayne', 'Smith', 'janesmith@example.com', '15550100001')) > 0.85
+    assert score_pair(jane, record('Omar', 'Haddad', 'omar@example.org', '5550199999')) < 0.5
+
+def test_score_pair_cut_off_never_changes_the_outcome():
+    people = [record(*fields) for fields in [
+        ('Jane', 'Smith', 'jane@example.com', '5550100001'), ('Jane', 'Smyth', 'jsmyth@example.com', None),
+        ('John', 'Smith', None, '5550100002'), ('J', 'S', 'js@example.com', '5550100001'),
+        ('Janet', 'Smithers', 'janet@example.com', '5559990001'),
+    ]]
+    for a, b in itertools.combinations(people, 2):
+        full = score_pair(a, b)
+        for min_score in (0.3, 0.6, 0.85, 0.95):
+            cut = score_pair(a, b, min_score)
+            assert cut == full if full >= min_score else cut < min_score
+
+def test_find_duplicates_groups_matches_under_the_oldest():
+    jane = record('Jane', 'Smith', 'jane.smith@example.com', '5550100001')
+    others = [
+        record('Jayne', 'Smith', 'jane.smith@example.com', '15550100001'),  # Misspelt, phone with a country code
+        record('Smith', 'Jane', 'j.smith@example.com', '5550100001'),  # First and last name swapped
+        record('Omar', 'Haddad', 'omar@example.com', '5550100002'),
+        record('Jane', 'Smithson', 'jsmithson@gmail.com', '5559990001'),
+    ]
+    proposals, stats = find_duplicates([jane, *others], min_score=0.85, max_block_size=50)
+
+    [proposal] = proposals
+    assert proposal['keep']['id'] == jane.id
+    assert [d['id'] for d in proposal['duplicates']] == [others[0].id, others[1].id]
+    assert all(d['score'] >= 0.85 for d in proposal['duplicates'])
+    assert 'phone' in proposal['duplicates'][0]['matched_on']
+    assert stats['customers'] == 5 and stats['proposals'] == 1
+    # Only pairs sharing a blocking key are scored
+    assert stats['pairs_compared'] < 10
+
+def test_blocks_above_the_size_limit_are_skipped():
+    people = [record('Ann', 'Lee', f'ann{n}@example.com', None) for n in range(4)]
+    _, stats = find_duplicates(people, min_score=0.85, max_block_size=3)
+    assert stats['skipped_blocks'] > 0 and stats['pairs_compared'] == 0
+
+def test_active_customer_records_are_oldest_first(make_customer):
+    first = make_customer(first_name='Élodie', created_at='2030-01-01T00:00:00.000000')
+    gone = make_customer(created_at='2030-01-02T00:00:00.000000')
+    last = make_customer(phone='+1 (555) 010-7777', created_at='2030-01-03T00:00:00.000000')
+    gone.soft_delete(db.session)
+
+    records = list(active_customer_records(db.session.connection(), batch_size=1))
+    assert [r.id for r in records] == [first.id, last.id]
+    assert records[0].first_name == 'elodie'
+    assert records[1].phone == '5550107777'
+
+def test_merge_endpoint_moves_invoices_and_contacts(client, make_customer, make_invoice, make_payment):
+    keep, duplicate, other = make_customer(), make_customer(), make_customer()
+    invoice = make_invoice(100.0, customer=duplicate)
+    make_payment(invoice, 40.0)
+    untouched = make_invoice(10.0, customer=other)
+    db.session.add(CustomerContact(customer_id=duplicate.id, contact_type='email', contact_value='old@example.com'))
+    db.session.commit()
+    keep_id, duplicate_id = keep.id, duplicate.id
+
+    response = client.post('/cash_flow/customers/merge', json={'keep_id': keep_id, 'duplicate_ids': [duplicate_id, duplicate_id]})
+    assert response.status_code == 200
+    assert response.get_json()['merged'] == {'invoices': 1, 'contacts': 1, 'customers': 1}
+
+    db.session.expire_all()
+    moved = db.session.get(Invoice, invoice.id)
+    assert (moved.customer_id, moved.amount_paid) == (keep_id, 40.0)
+    assert moved.updated_at > moved.created_at
+    assert CustomerContact.query.one().customer_id == keep_id
+    assert db.session.get(Customer, duplicate_id).deleted_at is not None
+    assert db.session.get(Invoice, untouched.id).customer_id == other.id
+
+def test_merge_endpoint_rejects_bad_requests(client, make_customer):
+    keep, gone = make_customer(), make_customer()
+    gone.soft_delete(db.session)
+
+    def merge(body):
+        return client.post('/cash_flow/customers/merge', json=body)
+
+    assert merge({'keep_id': keep.id, 'duplicate_ids': [keep.id]}).status_code == 400
+    assert merge({'keep_id': keep.id, 'duplicate_ids': []}).status_code == 400
+    response = merge({'keep_id': keep.id, 'duplicate_ids': [gone.id, 'missing']})
+    assert response.status_code == 404
+    assert response.get_json()['details'] == [gone.id, 'missing']
+
+def test_find_duplicate_customers_command(app, make_customer, tmp_path):
+    jane = make_customer(first_name='Jane', last_name='Smith', email='jane.smith@example.com', phone='555-010-0001')
+    twin = make_customer(first_name='Jane', last_name='Smyth', email='jane.smyth@example.com', phone='1 555 010 0001')
+    out = tmp_path / 'proposals.json'
+
+    result = app.test_cli_runner().invoke(args=['find-duplicate-customers', '--out', str(out), '--min-score', '0.8'])
+    assert result.exit_code == 0, result.output
+    report = json.loads(out.read_text())
+    [proposal] = report['proposals']
+    assert proposal['keep']['id'] == jane.id
+    assert [d['id'] for d in proposal['duplicates']] == [twin.id]
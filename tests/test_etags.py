@@ -0,0 +1,65 @@
+import pytest
+from extensions import db
+from cash_flow.models import Customer, ProductService
+
+URL = '/cash_flow/view_customers'
+
+def etag(client, url=URL):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+@pytest.fixture
+def customers(make_customer):
+    return [make_customer(created_at=f'2030-01-0{day}T00:00:00.000000') for day in (1, 2, 3)]
+
+def test_matching_if_none_match_is_304_without_a_body(client, customers):
+    tag = etag(client)
+    assert tag.startswith('W/"')
+
+    response = client.get(URL, headers={'If-None-Match': tag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == tag
+
+    # Any of several tags may match, and a stale one is answered in full
+    assert client.get(URL, headers={'If-None-Match': f'W/"stale", {tag}'}).status_code == 304
+    response = client.get(URL, headers={'If-None-Match': 'W/"stale"'})
+    assert response.status_code == 200 and len(response.get_json()['items']) == 3
+
+def test_tag_changes_after_every_kind_of_write(client, customers):
+    tags = [etag(client)]
+
+    customers[0].first_name = 'Changed'
+    db.session.commit()
+    tags.append(etag(client))
+
+    customers[1].soft_delete(db.session)
+    tags.append(etag(client))
+
+    # Not the newest row, so only the row count can move the tag
+    db.session.get(Customer, customers[2].id).delete(db.session)
+    tags.append(etag(client))
+
+    assert len(set(tags)) == 4
+    assert client.get(URL, headers={'If-None-Match': tags[0]}).status_code == 200
+    assert client.get(URL, headers={'If-None-Match': tags[-1]}).status_code == 304
+
+def test_tag_is_stable_without_writes(client, customers):
+    assert etag(client) == etag(client)
+
+def test_each_form_and_page_of_a_list_has_its_own_tag(client, customers):
+    page = etag(client)
+    streamed = etag(client, f'{URL}?stream=1')
+    assert len({page, streamed, etag(client, f'{URL}?limit=1')}) == 3
+    # The plain tag does not match the same list asked for as NDJSON
+    response = client.get(URL, headers={'Accept': 'application/x-ndjson', 'If-None-Match': page})
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    assert client.get(f'{URL}?stream=1', headers={'If-None-Match': streamed}).status_code == 304
+
+def test_cached_lists_answer_304_too(client):
+    db.session.add(ProductService(name='Widget', price=2.0, cost=1.0))
+    db.session.commit()
+    tag = etag(client, '/cash_flow/get_all')
+    response = client.get('/cash_flow/get_all', headers={'If-None-Match': tag})
+    assert response.status_code == 304 and response.get_data() == b''
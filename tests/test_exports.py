@@ -0,0 +1,77 @@
+import csv
+import gzip
+import io
+from datetime import date
+
+from extensions import db
+from cash_flow.models import Transfer
+
+def read_csv(response):
+    return list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+def make_transfer(source, target, amount, created_at):
+    transfer = Transfer(from_account_id=source.id, to_account_id=target.id, amount=amount, created_at=created_at)
+    db.session.add(transfer)
+    db.session.commit()
+    return transfer
+
+def test_invoice_export_joins_the_customer(client, make_customer, make_invoice, make_payment):
+    customer = make_customer(first_name='Zoë', last_name='Ørsted')
+    invoice = make_invoice(total_amount=100.0, customer=customer, due_date=date(2030, 2, 1))
+    make_payment(invoice, 40.0)
+
+    response = client.get('/cash_flow/export/invoices.csv')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="invoices.csv"'
+    [row] = read_csv(response)
+    assert row['id'] == invoice.id
+    assert (row['customer_first_name'], row['customer_last_name']) == ('Zoë', 'Ørsted')
+    assert row['due_date'] == '2030-02-01'
+    assert (float(row['amount_paid']), float(row['balance_due'])) == (40.0, 60.0)
+    assert row['status'] == 'partially_paid'
+
+def test_payment_export_filters_on_payment_date_inclusively(client, make_invoice, make_payment, make_account):
+    invoice = make_invoice(total_amount=1000.0)
+    account = make_account(name='Operating')
+    early = make_payment(invoice, 10.0, payment_date=date(2030, 1, 1))
+    first = make_payment(invoice, 20.0, payment_date=date(2030, 1, 10), account=account)
+    last = make_payment(invoice, 30.0, payment_date=date(2030, 1, 20))
+    make_payment(invoice, 40.0, payment_date=date(2030, 1, 21))
+    deleted = make_payment(invoice, 50.0, payment_date=date(2030, 1, 15))
+    deleted.soft_delete(db.session)
+
+    rows = read_csv(client.get('/cash_flow/export/payments.csv?from=2030-01-10&to=2030-01-20'))
+    assert [row['id'] for row in rows] == [first.id, last.id]
+    assert rows[0]['account_name'] == 'Operating'
+    assert rows[1]['account_name'] == '' and rows[1]['account_id'] == ''
+    assert rows[0]['payment_method'] == 'bank'
+    assert early.id not in {row['id'] for row in read_csv(client.get('/cash_flow/export/payments.csv?from=2030-01-02'))}
+
+def test_transfer_export_includes_the_whole_last_day(client, make_account):
+    checking, savings = make_account(name='Checking'), make_account(name='Savings')
+    inside = make_transfer(checking, savings, 5.0, '2030-01-10T23:59:59.999000')
+    make_transfer(checking, savings, 7.0, '2030-01-11T00:00:00.000000')
+
+    rows = read_csv(client.get('/cash_flow/export/transfers.csv?to=2030-01-10'))
+    assert [row['id'] for row in rows] == [inside.id]
+    assert (rows[0]['from_account_name'], rows[0]['to_account_name']) == ('Checking', 'Savings')
+
+def test_output_does_not_depend_on_batching_or_gzip(app, client, make_invoice):
+    for amount in range(1, 6):
+        make_invoice(total_amount=float(amount))
+    plain = client.get('/cash_flow/export/invoices.csv').get_data()
+
+    app.config['STREAM_BATCH_SIZE'] = 2
+    assert client.get('/cash_flow/export/invoices.csv').get_data() == plain
+    response = client.get('/cash_flow/export/invoices.csv?gzip=1')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == plain
+    assert len(plain.splitlines()) == 6
+
+def test_bad_requests(client):
+    assert client.get('/cash_flow/export/vendors.csv').status_code == 404
+    assert client.get('/cash_flow/export/invoices.csv?from=2030-13-01').status_code == 400
+    response = client.get('/cash_flow/export/invoices.csv?from=2030-02-01&to=2030-01-01')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'from must not be after to'
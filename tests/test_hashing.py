@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from auth.hashing import HashPoolSaturated, PasswordHasher, init_password_hasher
+from auth.models import User
+
+PASSWORD = 'Corr3ct!Horse'
+
+def use_hasher(app, method, **config):
+    """Replace the app's hasher with one built from changed config, as a restart with new settings would."""
+    app.config.update(PASSWORD_HASH_METHOD=method, **config)
+    return init_password_hasher(app)
+
+@pytest.fixture
+def user(app, client):
+    use_hasher(app, 'pbkdf2:sha256:1000')
+    response = client.post('/auth/register', json={'username': 'ada', 'email': 'ada@example.com', 'password': PASSWORD})
+    assert response.status_code == 201
+    return User.query.filter_by(username='ada').one()
+
+def login(client, password=PASSWORD):
+    return client.post('/auth/login', json={'username': 'ada', 'password': password})
+
+@pytest.fixture
+def blocked(monkeypatch):
+    """Make every password check wait until the returned event is set."""
+    release = threading.Event()
+    monkeypatch.setattr('auth.hashing.check_password_hash', lambda *args: release.wait(5))
+    yield release
+    release.set()
+
+def occupy(hasher, count):
+    """Start `count` verifications that hold their slots until released."""
+    threads = [threading.Thread(target=hasher.verify, args=('hash', 'password')) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def test_pool_raises_when_every_slot_is_taken(blocked):
+    hasher = PasswordHasher('pbkdf2:sha256:1000', 16, workers=1, queue_size=1, queue_timeout=0.05)
+    threads = occupy(hasher, 2)
+    with pytest.raises(HashPoolSaturated):
+        hasher.hash(PASSWORD)
+
+    # Slots are given back as the hashes finish
+    blocked.set()
+    for thread in threads:
+        thread.join()
+    assert hasher.verify('hash', PASSWORD)
+
+def test_saturated_login_and_register_are_503_with_retry_after(app, client, user, blocked):
+    hasher = use_hasher(app, 'pbkdf2:sha256:1000', PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_SIZE=0,
+                        PASSWORD_HASH_QUEUE_TIMEOUT=0.05)
+    threads = occupy(hasher, 1)
+
+    for response in (login(client), client.post('/auth/register', json={
+            'username': 'alan', 'email': 'alan@example.com', 'password': PASSWORD})):
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    blocked.set()
+    for thread in threads:
+        thread.join()
+
+def test_login_rehashes_when_the_method_changes(app, client, user):
+    old_hash = user.password_hash
+    assert old_hash.startswith('pbkdf2:sha256:1000$')
+
+    # Same settings: the hash is left alone
+    assert login(client).status_code == 200
+    assert User.query.filter_by(username='ada').one().password_hash == old_hash
+
+    use_hasher(app, 'pbkdf2:sha256:2000')
+    assert login(client, 'Wr0ng!Horse').status_code == 401
+    assert User.query.filter_by(username='ada').one().password_hash == old_hash
+
+    assert login(client).status_code == 200
+    new_hash = User.query.filter_by(username='ada').one().password_hash
+    assert new_hash.startswith('pbkdf2:sha256:2000$')
+    assert login(client).status_code == 200
+    assert User.query.filter_by(username='ada').one().password_hash == new_hash
+
+def test_needs_rehash_compares_method_and_salt_length():
+    hasher = PasswordHasher('scrypt', 16, workers=1, queue_size=0, queue_timeout=1)
+    assert hasher.method_prefix == 'scrypt:32768:8:1'
+    assert not hasher.needs_rehash(hasher.hash(PASSWORD))
+    assert hasher.needs_rehash(PasswordHasher('pbkdf2:sha256:1000', 16, 1, 0, 1).hash(PASSWORD))
+    assert hasher.needs_rehash(PasswordHasher('scrypt', 8, 1, 0, 1).hash(PASSWORD))
@@ -0,0 +1,106 @@
+import csv
+
+import pytest
+from extensions import db
+from cash_flow.importer import CsvImporter
+from cash_flow.models import ProductService
+
+CSV = '''name,description,price,cost,stock_quantity
+Widget,,9.50,4.25,10
+Gadget,,0,1,
+Existing,,5,2,
+Bolt, Zinc plated ,1,0.5,3
+Widget,,3,1,
+,,3,1,
+Nut,,1,0.5,-1
+Screw,,2,1,
+"Washer, steel",,0.2,0.1,
+'''
+
+# (line, start of the error) of every rejected row, by line
+EXPECTED_REJECTS = [
+    ('3', 'price: Input should be greater than 0'),
+    ('4', 'Name is already registered'),
+    ('6', 'Name is already registered'),
+    ('7', 'name: Input should be a valid string'),
+    ('8', 'stock_quantity: Input should be greater than or equal to 0'),
+]
+EXPECTED_NAMES = ['Bolt', 'Existing', 'Screw', 'Washer, steel', 'Widget']
+
+class Crash(Exception):
+    pass
+
+@pytest.fixture
+def source(app, tmp_path):
+    """The CSV above, next to a database that already has a product named Existing."""
+    db.session.add(ProductService(name='Existing', price=1.0, cost=0.5))
+    db.session.commit()
+    path = tmp_path / 'products.csv'
+    path.write_text(CSV, encoding='utf-8')
+    return path
+
+def importer(path, chunk_size=2):
+    return CsvImporter(db.engine, 'products', str(path), chunk_size)
+
+def rejects(path):
+    with open(f'{path}.rejects.csv', newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+def assert_imported_once(path):
+    db.session.expire_all()
+    assert sorted(p.name for p in ProductService.query) == EXPECTED_NAMES
+    header, *lines = rejects(path)
+    assert header == ['line', 'error', 'name', 'description', 'price', 'cost', 'stock_quantity']
+    found = sorted(((line, error) for line, error, *_ in lines), key=lambda reject: int(reject[0]))
+    assert [line for line, _ in found] == [line for line, _ in EXPECTED_REJECTS]
+    assert all(error.startswith(prefix) for (_, error), (_, prefix) in zip(found, EXPECTED_REJECTS)), found
+
+def test_import_inserts_valid_rows_and_writes_rejects(source):
+    stats = importer(source).run()
+    assert (stats['inserted'], stats['rejected'], stats['skipped']) == (4, 5, 0)
+    assert_imported_once(source)
+
+    bolt = ProductService.query.filter_by(name='Bolt').one()
+    assert (bolt.description, bolt.price, bolt.stock_quantity) == ('Zinc plated', 1.0, 3)
+    assert bolt.id and bolt.created_at and bolt.updated_at
+    # Rejected rows are written back as they were read
+    assert ['3', 'price: Input should be greater than 0', 'Gadget', '', '0', '1', ''] in rejects(source)
+    assert not (source.parent / 'products.csv.checkpoint').exists()
+
+# Nine data rows in chunks of two make five chunks, each writing a pending and then a committed checkpoint.
+# A crash on the pending write resumes before that chunk; a crash on the committed write resumes after it,
+# unless the chunk inserted nothing (lines 6-7), in which case it is simply read again.
+@pytest.mark.parametrize('crash_on, rows_done', [(1, 0), (2, 2), (3, 2), (4, 4), (5, 4), (6, 4), (7, 6), (8, 8), (9, 8), (10, 9)])
+def test_resume_after_a_crash_neither_repeats_rows_nor_rejects(source, monkeypatch, crash_on, rows_done):
+    write_checkpoint = CsvImporter.write_checkpoint
+    calls = []
+
+    def crashing(self, *args, **kwargs):
+        calls.append(args)
+        if len(calls) == crash_on:
+            raise Crash()
+        write_checkpoint(self, *args, **kwargs)
+
+    monkeypatch.setattr(CsvImporter, 'write_checkpoint', crashing)
+    with pytest.raises(Crash):
+        importer(source).run()
+    monkeypatch.undo()
+
+    resumed = importer(source)
+    assert resumed.read_checkpoint()['rows_done'] == rows_done
+    stats = resumed.run()
+    assert stats['skipped'] == rows_done
+    assert_imported_once(source)
+
+def test_restart_ignores_the_checkpoint(source):
+    (source.parent / 'products.csv.checkpoint').write_text(
+        '{"rows_done": 8, "rejects_offset": 0, "pending": null}', encoding='utf-8')
+    stats = importer(source, chunk_size=100).run(resume=False)
+    assert (stats['inserted'], stats['skipped']) == (4, 0)
+    assert_imported_once(source)
+
+def test_import_command(app, source):
+    result = app.test_cli_runner().invoke(args=['import', 'products', str(source), '--chunk-size', '3'])
+    assert result.exit_code == 0, result.output
+    assert 'Imported 4 products, rejected 5, skipped 0' in result.output
+    assert_imported_once(source)
@@ -0,0 +1,56 @@
+from extensions import db
+from cash_flow.models import Invoice
+from cash_flow.models.invoice_model import InvoiceStatus
+
+def reload(invoice_id):
+    db.session.expire_all()
+    return db.session.get(Invoice, invoice_id)
+
+def test_payment_updates_amount_paid_and_status(make_invoice, make_payment):
+    invoice = make_invoice(total_amount=100.0)
+    make_payment(invoice, 40.0)
+    invoice = reload(invoice.id)
+    assert invoice.amount_paid == 40.0
+    assert invoice.status == InvoiceStatus.PARTIALLY_PAID
+
+    make_payment(invoice, 60.0)
+    invoice = reload(invoice.id)
+    assert invoice.amount_paid == 100.0
+    assert invoice.status == InvoiceStatus.PAID
+
+def test_soft_deleted_payment_no_longer_counts(make_invoice, make_payment):
+    invoice = make_invoice(total_amount=100.0)
+    payment = make_payment(invoice, 100.0)
+    payment.soft_delete(db.session)
+    invoice = reload(invoice.id)
+    assert invoice.amount_paid == 0.0
+    assert invoice.status == InvoiceStatus.UNPAID
+
+def test_moving_an_expired_payment_refreshes_both_invoices(make_invoice, make_payment):
+    first = make_invoice(total_amount=100.0)
+    second = make_invoice(total_amount=100.0)
+    payment = make_payment(first, 30.0)
+    first_id, second_id = first.id, second.id
+
+    # The commit expired the payment, so invoice_id is set without its old value loaded
+    assert 'invoice_id' not in payment.__dict__
+    payment.invoice_id = second_id
+    db.session.commit()
+
+    first, second = reload(first_id), reload(second_id)
+    assert first.amount_paid == 0.0
+    assert first.status == InvoiceStatus.UNPAID
+    assert second.amount_paid == 30.0
+    assert second.status == InvoiceStatus.PARTIALLY_PAID
+
+def test_changing_the_total_recomputes_status(make_invoice, make_payment):
+    invoice = make_invoice(total_amount=100.0)
+    make_payment(invoice, 50.0)
+    invoice = reload(invoice.id)
+    invoice.total_amount = 50.0
+    db.session.commit()
+    assert reload(invoice.id).status == InvoiceStatus.PAID
+
+def test_payment_serializes_its_invoice(make_invoice, make_payment):
+    invoice = make_invoice()
+    assert make_payment(invoice, 10.0).to_dict()['invoice_id'] == invoice.id
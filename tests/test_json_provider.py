@@ -0,0 +1,50 @@
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+import pytest
+from json_provider import OrjsonJSONProvider, StdlibJSONProvider, orjson
+from cash_flow.models.invoice_model import InvoiceStatus
+
+PAYLOAD = {
+    'created_at': datetime(2030, 1, 2, 3, 4, 5, 678901),
+    'updated_at': datetime(2030, 1, 2, 3, 4, 5),
+    'sent_at': datetime(2030, 1, 2, tzinfo=timezone.utc),
+    'due_date': date(2030, 1, 31),
+    'reminder_time': time(9, 30, 0, 15),
+    'amount': Decimal('1234.50'),
+    'rate': Decimal('0.000001'),
+    'name': 'José Ñúñez — 東京 😀',
+    'status': InvoiceStatus.PAID,
+    'id': uuid.UUID(int=1),
+    'lines': [{'amount': 2.5, 'note': None, 'paid': True}, {'amount': 10, 'note': 'Straße'}],
+}
+
+requires_orjson = pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+
+@pytest.fixture(params=[False, True], ids=['compact', 'debug'])
+def providers(app, request):
+    app.debug = request.param
+    return StdlibJSONProvider(app), OrjsonJSONProvider(app)
+
+@requires_orjson
+def test_dumps_is_identical(providers):
+    stdlib, fast = providers
+    assert fast.dumps(PAYLOAD) == stdlib.dumps(PAYLOAD)
+
+@requires_orjson
+def test_responses_are_identical(providers):
+    stdlib, fast = providers
+    assert fast.response(PAYLOAD).get_data() == stdlib.response(PAYLOAD).get_data()
+
+@requires_orjson
+def test_values_are_written_as_the_api_documents(app):
+    data = OrjsonJSONProvider(app).loads(OrjsonJSONProvider(app).dumps(PAYLOAD))
+    assert data['created_at'] == '2030-01-02T03:04:05.678901'
+    assert data['sent_at'] == '2030-01-02T00:00:00+00:00'
+    assert data['due_date'] == '2030-01-31'
+    assert (data['amount'], data['rate']) == ('1234.50', '0.000001')
+    assert data['status'] == 'paid'
+
+def test_stdlib_writes_text_as_utf8(app):
+    assert StdlibJSONProvider(app).dumps({'name': 'José 東京'}) == '{"name":"José 東京"}'
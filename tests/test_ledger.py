@@ -0,0 +1,96 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import func
+from extensions import db
+from auth.models import User
+from cash_flow.models import Account, ExpenseCategory, Posting, Transaction, Transfer
+from cash_flow.models.ledger import (
+    BALANCE_ADJUSTMENTS, OPENING_BALANCES, RECEIVABLES, UNDEPOSITED_FUNDS, verify_balances,
+)
+
+def balance(account):
+    db.session.expire_all()
+    return db.session.get(Account, account.id).balance
+
+def ledger_total(ledger):
+    return db.session.query(func.coalesce(func.sum(Posting.amount), 0.0)).filter(Posting.ledger == ledger).scalar()
+
+def verify():
+    return verify_balances(db.session.connection())
+
+@pytest.fixture(autouse=True)
+def ledger_stays_consistent(app):
+    yield
+    assert verify() == []
+
+def test_opening_balance_is_booked_against_equity(make_account):
+    account = make_account(balance=250.0)
+    assert balance(account) == 250.0
+    assert ledger_total(OPENING_BALANCES) == -250.0
+
+def test_transfer_edits_and_deletes_move_both_balances(make_account):
+    checking, savings = make_account(balance=100.0), make_account(name='Savings')
+    transfer = Transfer(from_account_id=checking.id, to_account_id=savings.id, amount=30.0)
+    db.session.add(transfer)
+    db.session.commit()
+    assert (balance(checking), balance(savings)) == (70.0, 30.0)
+
+    transfer = db.session.get(Transfer, transfer.id)
+    transfer.amount = 45.0
+    db.session.commit()
+    assert (balance(checking), balance(savings)) == (55.0, 45.0)
+
+    db.session.get(Transfer, transfer.id).soft_delete(db.session)
+    assert (balance(checking), balance(savings)) == (100.0, 0.0)
+    # Postings are append-only: the edit and the delete were recorded as adjusting entries
+    entries = db.session.query(func.count(func.distinct(Posting.entry_id))) \
+        .filter(Posting.source_type == 'transfer').scalar()
+    assert entries == 3
+
+def test_payment_moves_between_an_account_and_undeposited_funds(make_account, make_invoice, make_payment):
+    account = make_account()
+    invoice = make_invoice(total_amount=500.0)
+    payment = make_payment(invoice, 120.0, account=account)
+    assert balance(account) == 120.0
+    assert ledger_total(RECEIVABLES) == -120.0
+
+    payment.account_id = None
+    db.session.commit()
+    assert balance(account) == 0.0
+    assert ledger_total(UNDEPOSITED_FUNDS) == 120.0
+    assert ledger_total(RECEIVABLES) == -120.0
+
+def test_income_and_expense_transactions(make_account):
+    user = User(username='owner', email='owner@example.com', password_hash='x')
+    rent = ExpenseCategory(name='Rent')
+    db.session.add_all([user, rent])
+    db.session.commit()
+    account = make_account(balance=1000.0)
+
+    db.session.add_all([
+        Transaction(name=1.0, user_id=user.id, account_id=account.id, transaction_type='income', amount=200.0),
+        Transaction(name=2.0, user_id=user.id, account_id=account.id, transaction_type='expense', amount=450.0,
+                    expense_category_id=rent.id),
+        # Transfers are posted from Transfer rows, so a transfer transaction posts nothing
+        Transaction(name=3.0, user_id=user.id, account_id=account.id, transaction_type='transfer', amount=99.0),
+    ])
+    db.session.commit()
+    assert balance(account) == 750.0
+    expense_leg = Posting.query.filter_by(account_id=account.id, flow_type='expense').one()
+    assert (expense_leg.amount, expense_leg.category_id) == (-450.0, rent.id)
+
+def test_direct_balance_edit_is_booked_as_an_adjustment(make_account):
+    account = make_account(balance=100.0)
+    account = db.session.get(Account, account.id)
+    account.balance = 80.0
+    db.session.commit()
+    assert balance(account) == 80.0
+    assert ledger_total(BALANCE_ADJUSTMENTS) == 20.0
+
+def test_verify_reports_a_balance_out_of_step(make_account):
+    account = make_account(balance=100.0)
+    db.session.execute(db.text('UPDATE accounts SET balance = 90 WHERE id = :id'), {'id': account.id})
+    [problem] = verify()
+    assert account.id in problem
+    db.session.rollback()
@@ -0,0 +1,86 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from extensions import db
+from cash_flow.models import ProductService, Vendor
+from cash_flow.views.list_cache import get_list_cache
+
+def names(client, url):
+    return sorted(item['name'] if 'name' in item else item['first_name'] for item in client.get(url).get_json()['items'])
+
+def stats():
+    return get_list_cache().stats()
+
+@pytest.fixture
+def products(app):
+    db.session.add_all([ProductService(name='Widget', price=2.0, cost=1.0), ProductService(name='Bolt', price=1.0, cost=0.5)])
+    db.session.commit()
+
+def test_repeated_requests_are_served_from_the_cache(client, products):
+    first = client.get('/cash_flow/get_all?limit=10')
+    second = client.get('/cash_flow/get_all?limit=10')
+    assert second.get_data() == first.get_data()
+    assert (stats()['misses'], stats()['hits'], stats()['entries']) == (1, 1, 1)
+
+    # Each query string is its own entry
+    client.get('/cash_flow/get_all?limit=1')
+    assert (stats()['misses'], stats()['entries']) == (2, 2)
+
+def test_orm_write_invalidates_the_page(client, products):
+    assert names(client, '/cash_flow/get_all') == ['Bolt', 'Widget']
+    ProductService.query.filter_by(name='Bolt').one().name = 'Nut'
+    db.session.commit()
+    assert names(client, '/cash_flow/get_all') == ['Nut', 'Widget']
+    assert stats()['invalidations'] == 1
+
+def test_bulk_insert_invalidates_the_page(client, products):
+    assert names(client, '/cash_flow/get_all') == ['Bolt', 'Widget']
+    response = client.post('/cash_flow/product_service/bulk', json=[{'name': 'Screw', 'price': 1.0, 'cost': 0.2}])
+    assert response.status_code == 201
+    assert names(client, '/cash_flow/get_all') == ['Bolt', 'Screw', 'Widget']
+
+def test_ledger_balance_update_invalidates_the_accounts_page(client, make_account, make_invoice, make_payment):
+    account = make_account(balance=0.0)
+    invoice = make_invoice(total_amount=500.0)
+
+    def balance():
+        [item] = client.get('/cash_flow/accounts').get_json()['items']
+        return item['balance']
+
+    assert balance() == 0.0
+    # The ledger moves the balance with a Core UPDATE of accounts, outside the ORM unit of work
+    make_payment(invoice, 120.0, account=account)
+    assert balance() == 120.0
+    assert stats()['invalidations'] == 1
+
+def test_vendor_write_invalidates_the_page(client):
+    vendor = Vendor(first_name='Ana', last_name='Lima', email='ana@example.com', phone='555-020-0001')
+    db.session.add(vendor)
+    db.session.commit()
+    assert names(client, '/cash_flow/vendor') == ['Ana']
+    vendor.soft_delete(db.session)
+    assert names(client, '/cash_flow/vendor') == []
+
+def test_streamed_requests_are_not_cached(client, products):
+    for _ in range(2):
+        response = client.get('/cash_flow/get_all?stream=1')
+        assert len(response.get_data(as_text=True).splitlines()) == 2
+    assert (stats()['hits'], stats()['misses'], stats()['entries']) == (0, 0, 0)
+
+def test_writes_to_other_tables_keep_the_page(client, products, make_customer):
+    client.get('/cash_flow/get_all')
+    make_customer()
+    client.get('/cash_flow/get_all')
+    assert (stats()['hits'], stats()['invalidations']) == (1, 0)
+
+def test_stats_endpoint_is_admin_only(app, client, products):
+    client.get('/cash_flow/get_all')
+
+    def get(role):
+        token = create_access_token(identity={'user_id': 1, 'username': role, 'email': f'{role}@example.com', 'role': role})
+        return client.get('/cash_flow/admin/list-cache-stats', headers={'Authorization': f'Bearer {token}'})
+
+    response = get('admin')
+    assert response.status_code == 200
+    assert response.get_json()['entries'] == 1
+    assert get('user').status_code == 403
+    assert client.get('/cash_flow/admin/list-cache-stats').status_code == 401
@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from extensions import db
+from notifications.models import OutboxMessage
+from notifications.outbox import OutboxSender, enqueue_mail
+
+class FakeMail:
+    """Stands in for Flask-Mail: records sent messages and fails for chosen recipients or on connect."""
+
+    def __init__(self):
+        self.outbox = []
+        self.failing_recipients = set()
+        self.connect_error = None
+        self.connections = 0
+
+    @contextmanager
+    def connect(self):
+        if self.connect_error:
+            raise self.connect_error
+        self.connections += 1
+        yield self
+
+    def send(self, message):
+        if self.failing_recipients & set(message.recipients):
+            raise OSError(f'550 rejected {message.recipients}')
+        self.outbox.append(message)
+
+@pytest.fixture
+def mail():
+    return FakeMail()
+
+@pytest.fixture
+def sender(app, mail):
+    return OutboxSender(app, mail, poll_interval=0, batch_size=10, max_attempts=3, backoff_base=30,
+                        backoff_max=60, lease=300, retention=3600, prune_batch_size=2)
+
+def queue(*recipients):
+    messages = [enqueue_mail(f'Hello {recipient}', [recipient], body='Hi') for recipient in recipients]
+    db.session.commit()
+    return messages
+
+def make_due(message):
+    message.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+def test_batch_is_sent_over_one_connection(sender, mail):
+    first, second = queue('a@example.com', 'b@example.com')
+
+    assert sender.send_batch() == 2
+    assert [m.recipients for m in mail.outbox] == [['a@example.com'], ['b@example.com']]
+    assert mail.connections == 1
+    assert first.status == second.status == 'sent'
+    assert first.sent_at is not None and first.claimed_by is None
+    assert sender.send_batch() == 0
+    assert sender.stats()['sent'] == 2
+
+def test_failed_message_is_retried_with_backoff_until_max_attempts(sender, mail):
+    good, bad = queue('a@example.com', 'bad@example.com')
+    mail.failing_recipients.add('bad@example.com')
+
+    before = datetime.utcnow()
+    assert sender.send_batch() == 2
+    assert good.status == 'sent'
+    assert (bad.status, bad.attempts) == ('pending', 1)
+    assert '550' in bad.last_error
+    assert bad.next_attempt_at >= before + timedelta(seconds=30)
+    # Not due again until the backoff has passed
+    assert sender.send_batch() == 0
+
+    make_due(bad)
+    sender.send_batch()
+    assert (bad.status, bad.attempts) == ('pending', 2)
+    make_due(bad)
+    sender.send_batch()
+    assert (bad.status, bad.attempts) == ('failed', 3)
+    assert sender.failed == 1
+    assert [m.recipients for m in mail.outbox] == [['a@example.com']]
+
+def test_backoff_doubles_up_to_the_maximum(sender):
+    assert [sender.backoff(n).total_seconds() for n in (1, 2, 3)] == [30, 60, 60]
+
+def test_connection_failure_retries_the_whole_batch(sender, mail):
+    messages = queue('a@example.com', 'b@example.com')
+    mail.connect_error = ConnectionRefusedError('smtp down')
+
+    assert sender.send_batch() == 2
+    assert [(m.status, m.attempts, m.claimed_by) for m in messages] == [('pending', 1, None)] * 2
+
+    mail.connect_error = None
+    for message in messages:
+        make_due(message)
+    assert sender.send_batch() == 2
+    assert [m.status for m in messages] == ['sent', 'sent']
+
+def test_prune_deletes_only_sent_messages_past_retention(sender):
+    now = datetime.utcnow()
+    old = now - timedelta(hours=2)
+    for status, sent_at in [('sent', old), ('sent', old), ('sent', old), ('sent', now), ('failed', None), ('pending', None)]:
+        db.session.add(OutboxMessage(subject=status, recipients='a@example.com', status=status, attempts=0,
+                                     next_attempt_at=old, created_at=old, sent_at=sent_at))
+    db.session.commit()
+
+    # Three rows with a chunk size of two takes two transactions
+    assert sender.prune(now) == 3
+    assert sorted(m.status for m in OutboxMessage.query) == ['failed', 'pending', 'sent']
+    assert sender.stats()['pruned_by_this_worker'] == 3
+    assert sender.prune(now) == 0
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from extensions import db
+from cash_flow.models import Customer
+from cash_flow.views.pagination import decode_cursor, encode_cursor
+
+def walk(client, url, limit):
+    """Follow next_cursor from the first page to the last, returning the ids of every page."""
+    pages, cursor = [], None
+    while True:
+        query = f'{url}?limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(query).get_json()
+        assert len(body['items']) <= limit and body['limit'] == limit
+        pages.append([item['id'] for item in body['items']])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return pages
+
+@pytest.fixture
+def customers(make_customer):
+    """Seven customers, five of them created in the same microsecond."""
+    made = [make_customer(created_at='2030-01-01T00:00:00.000000') for _ in range(5)]
+    made += [make_customer(created_at='2029-12-31T00:00:00.000000'), make_customer(created_at='2030-01-02T00:00:00.000000')]
+    made[2].soft_delete(db.session)
+    return made
+
+def test_cursor_round_trip(customers):
+    customer = customers[0]
+    assert decode_cursor(encode_cursor(customer.created_at, customer.id)) == (True, (customer.created_at, customer.id))
+    assert decode_cursor('not a cursor') == (False, None)
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 6, 50])
+def test_walking_every_page_returns_each_row_once(client, customers, limit):
+    pages = walk(client, '/cash_flow/view_customers', limit)
+    ids = [row_id for page in pages for row_id in page]
+    expected = [c.id for c in Customer.query.filter(Customer.deleted_at.is_(None)).order_by(Customer.created_at, Customer.id)]
+    assert ids == expected and len(set(ids)) == 6
+    assert all(len(page) == limit for page in pages[:-1])
+
+@pytest.mark.parametrize('query', ['cursor=not-a-cursor', 'cursor=WzEsMl0', 'limit=0', 'limit=-3', 'limit=ten'])
+def test_bad_cursor_or_limit_is_rejected(client, customers, query):
+    response = client.get(f'/cash_flow/view_customers?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+def test_limit_is_clamped_to_the_maximum(app, client, customers):
+    app.config['PAGINATION_MAX_LIMIT'] = 4
+    body = client.get('/cash_flow/view_customers?limit=100').get_json()
+    assert (body['limit'], len(body['items'])) == (4, 4)
+
+def stream(client, query=''):
+    response = client.get(f'/cash_flow/view_customers?stream=1{query}')
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+def test_stream_writes_one_object_per_line(app, client, customers):
+    app.config['STREAM_BATCH_SIZE'] = 2
+    rows = stream(client)
+    paged = client.get('/cash_flow/view_customers?limit=50').get_json()['items']
+    assert rows == paged
+
+    first_page = client.get('/cash_flow/view_customers?limit=2').get_json()
+    assert stream(client, f'&cursor={first_page["next_cursor"]}') == paged[2:]
+
+def test_stream_is_chosen_by_the_accept_header(client, customers):
+    response = client.get('/cash_flow/view_customers', headers={'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    assert len(response.get_data(as_text=True).splitlines()) == 6
+
+def test_stream_ignores_limit(client, customers):
+    assert len(stream(client, '&limit=ten')) == 6
+    assert len(stream(client, '&limit=1')) == 6
+    assert client.get('/cash_flow/view_customers?stream=1&cursor=bad').status_code == 400
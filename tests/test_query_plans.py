@@ -0,0 +1,31 @@
+from extensions import db
+from cash_flow.commands import explain, plan_problems, planned_queries
+
+def plan_failures():
+    failures = {}
+    for label, statement, indexes, sorts in planned_queries():
+        problems = plan_problems(explain(statement), indexes, sorts)
+        if problems:
+            failures[label] = problems
+    return failures
+
+def test_hot_queries_are_served_by_indexes(app):
+    assert plan_failures() == {}
+
+def test_dropping_the_aging_index_is_caught(app):
+    db.session.execute(db.text('DROP INDEX ix_invoices_aging'))
+    failures = plan_failures()
+    assert 'ix_invoices_aging not used' in failures['aging: as of today']
+
+def test_dropping_an_updated_at_index_is_caught(app):
+    db.session.execute(db.text('DROP INDEX ix_customers_updated_at'))
+    failures = plan_failures()
+    assert 'customers: etag watermark' in failures
+    assert 'customers: changes since the start' in failures
+    assert 'vendors: etag watermark' not in failures
+
+def test_dropping_a_list_index_is_caught(app):
+    db.session.execute(db.text('DROP INDEX ix_payments_active_created_at'))
+    failures = plan_failures()
+    assert 'payments: first page' in failures
+    assert 'payments: next page' in failures
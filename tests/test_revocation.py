@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from auth.models import TokenBlocklist
+from auth.pruning import BlocklistPruner
+from auth.revocation import RevocationCache
+
+def revoke(jti, expires_at):
+    db.session.add(TokenBlocklist(jti=jti, expires_at=expires_at))
+    db.session.commit()
+
+def test_revocation_after_a_prune_reaches_other_workers(app):
+    now = datetime.utcnow()
+    revoke('live', now + timedelta(minutes=15))
+    revoke('expired', now - timedelta(minutes=1))
+
+    # Another worker has already read both rows, so its watermark is the id of the newest one
+    cache = RevocationCache(max_staleness=0, token_lifetime=timedelta(minutes=15))
+    cache.refresh(force=True)
+    assert cache.is_revoked('live')
+
+    assert BlocklistPruner(app, interval=0, batch_size=10).prune(now) == 1
+    revoke('after-prune', now + timedelta(minutes=15))
+
+    # SQLite would hand the pruned row's id to the new one, which the watermark has already passed
+    cache.refresh(force=True)
+    assert cache.is_revoked('after-prune')
+    assert cache.is_revoked('live')
+    assert not cache.is_revoked('expired')
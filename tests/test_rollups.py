@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+from extensions import db
+from cash_flow.models import CashFlowDaily, Transfer
+from cash_flow.models.rollups import cash_flow_report, rebuild_rollups, verify_rollups
+
+def connection():
+    return db.session.connection()
+
+def report(*group_by, start=None, end=None, **filters):
+    return cash_flow_report(connection(), start, end, list(group_by), **filters)
+
+def flows(row):
+    return row['inflow'], row['outflow'], row['net']
+
+@pytest.fixture
+def accounts(make_account, make_invoice, make_payment):
+    """Payments into checking in January and February, and a January transfer to savings."""
+    checking, savings = make_account(), make_account(name='Savings')
+    invoice = make_invoice(total_amount=1000.0)
+    make_payment(invoice, 100.0, payment_date=date(2030, 1, 5), account=checking)
+    make_payment(invoice, 40.0, payment_date=date(2030, 2, 10), account=checking)
+    make_payment(invoice, 20.0, payment_date=date(2030, 1, 7), account=checking).soft_delete(db.session)
+    db.session.add(Transfer(from_account_id=checking.id, to_account_id=savings.id, amount=30.0,
+                            created_at='2030-01-20T10:00:00.000000'))
+    db.session.commit()
+    return checking, savings
+
+def test_rollups_follow_every_posting(accounts):
+    assert verify_rollups(connection()) == []
+    # The soft-deleted payment was reversed into the same rollup row
+    checking, _ = accounts
+    assert CashFlowDaily.query.filter_by(account_id=checking.id, day=date(2030, 1, 7)).one().amount == 0.0
+
+def test_report_totals_and_groupings(accounts):
+    checking, savings = accounts
+    [total] = report()
+    assert flows(total) == (170.0, 30.0, 140.0)
+
+    by_month = report('month')
+    assert [(row['month'], flows(row)) for row in by_month] == [
+        ('2030-01', (130.0, 30.0, 100.0)), ('2030-02', (40.0, 0.0, 40.0))]
+
+    by_account_and_type = {(row['account'], row['type']): row['net'] for row in report('account', 'type')}
+    assert by_account_and_type == {
+        (checking.id, 'payment'): 140.0, (checking.id, 'transfer_out'): -30.0, (savings.id, 'transfer_in'): 30.0}
+
+    [row] = report('category', 'day', start=date(2030, 1, 20), end=date(2030, 1, 20))
+    assert (row['category'], row['day'], flows(row)) == (None, '2030-01-20', (30.0, 30.0, 0.0))
+
+def test_report_filters(accounts):
+    _, savings = accounts
+    assert flows(report(flow_types=['payment'])[0]) == (140.0, 0.0, 140.0)
+    assert flows(report(flow_types=['transfer_in', 'transfer_out'])[0]) == (30.0, 30.0, 0.0)
+    assert flows(report(account_ids=[savings.id])[0]) == (30.0, 0.0, 30.0)
+    assert flows(report(start=date(2030, 2, 1))[0]) == (40.0, 0.0, 40.0)
+    assert flows(report(end=date(2029, 12, 31))[0]) == (0.0, 0.0, 0.0)
+
+def test_rebuild_restores_the_rollups(accounts):
+    expected = report('day', 'account', 'type')
+    CashFlowDaily.query.filter(CashFlowDaily.day >= date(2030, 1, 20)).update({'amount': 999.0})
+    db.session.flush()
+    assert len(verify_rollups(connection())) == 3
+
+    assert rebuild_rollups(connection(), date(2030, 1, 20)) == 3
+    assert verify_rollups(connection()) == []
+    assert report('day', 'account', 'type') == expected
+    assert rebuild_rollups(connection()) == CashFlowDaily.query.count()
+    assert report('day', 'account', 'type') == expected
+
+def test_report_endpoint(client, accounts):
+    response = client.get('/cash_flow/reports/cash_flow?from=2030-01-01&to=2030-01-31&group_by=type&type=payment')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['from'], body['to'], body['group_by']) == ('2030-01-01', '2030-01-31', ['type'])
+    assert body['rows'] == [{'type': 'payment', 'inflow': 100.0, 'outflow': 0.0, 'net': 100.0}]
+
+    assert client.get('/cash_flow/reports/cash_flow?group_by=week').status_code == 400
+    assert client.get('/cash_flow/reports/cash_flow?type=gift').status_code == 400
+    assert client.get('/cash_flow/reports/cash_flow?from=2030-02-01&to=2030-01-01').status_code == 400
@@ -0,0 +1,92 @@
+import pytest
+from extensions import db
+from cash_flow.models import CustomerContact, ProductService, Vendor
+from cash_flow.models import search as search_module
+from cash_flow.models.search import rebuild_search_index, search
+
+def hits(query, entities=None, limit=20):
+    return [(hit['type'], hit['id']) for hit in search(db.session.connection(), query, entities, limit)]
+
+def test_index_follows_inserts_updates_and_soft_deletes(make_customer):
+    customer = make_customer(first_name='Marguerite', last_name='Duras')
+    assert hits('argue') == [('customer', customer.id)]
+
+    customer.first_name = 'Colette'
+    db.session.commit()
+    assert hits('argue') == []
+    assert hits('olett') == [('customer', customer.id)]
+
+    customer.soft_delete(db.session)
+    assert hits('olett') == []
+
+    customer.deleted_at = None
+    db.session.commit()
+    assert hits('olett') == [('customer', customer.id)]
+
+def test_hard_delete_leaves_the_index(make_customer):
+    customer = make_customer(first_name='Ephemeral')
+    db.session.delete(customer)
+    db.session.commit()
+    assert hits('Ephemeral') == []
+    assert db.session.execute(db.text("SELECT count(*) FROM search_documents")).scalar() == 0
+
+def test_every_term_must_match(make_customer):
+    ada = make_customer(first_name='Ada', last_name='Lovelace', address='12 Analytical Way')
+    make_customer(first_name='Ada', last_name='Byron')
+    assert hits('lovelace analytical') == [('customer', ada.id)]
+    assert hits('LOVELACE byron') == []
+    # Terms too short for trigrams are ignored
+    assert hits('ab') == []
+
+def test_phone_digits_match_however_the_phone_was_typed(make_customer):
+    customer = make_customer(phone='+1 (555) 867-5309')
+    assert hits('8675309') == [('customer', customer.id)]
+    assert hits('555867') == [('customer', customer.id)]
+    assert hits('867-5309') == [('customer', customer.id)]
+
+def test_types_filter(make_customer):
+    customer = make_customer(first_name='Acme')
+    db.session.add_all([
+        Vendor(first_name='Acme', last_name='Supplies', email='sales@acme.example'),
+        ProductService(name='Acme Anvil', price=10.0, cost=4.0),
+        CustomerContact(customer_id=customer.id, contact_type='email', contact_value='acme@example.com'),
+    ])
+    db.session.commit()
+
+    assert {entity for entity, _ in hits('acme')} == {'customer', 'vendor', 'product_service', 'customer_contact'}
+    assert hits('acme', ['customer']) == [('customer', customer.id)]
+    assert {entity for entity, _ in hits('acme', ['vendor', 'product_service'])} == {'vendor', 'product_service'}
+
+def test_title_matches_rank_first_and_are_never_cut(monkeypatch, make_customer):
+    monkeypatch.setattr(search_module, 'SEARCH_CANDIDATES', 3)
+    # Indexed before the name hit, so they come first in index order
+    for _ in range(5):
+        make_customer(address='1 Zebra Crossing')
+    zebra = make_customer(first_name='Zebra')
+
+    found = hits('zebra')
+    assert len(found) == 3
+    assert found[0] == ('customer', zebra.id)
+
+def test_rebuild_search_index(make_customer):
+    kept = make_customer(first_name='Rebuilt')
+    gone = make_customer(first_name='Rebuilt')
+    gone.soft_delete(db.session)
+    connection = db.session.connection()
+    connection.exec_driver_sql("DELETE FROM search_index")
+    connection.exec_driver_sql("DELETE FROM search_documents")
+    assert hits('Rebuilt') == []
+
+    assert rebuild_search_index(connection) == 1
+    assert hits('Rebuilt') == [('customer', kept.id)]
+
+def test_search_endpoint(client, make_customer):
+    customer = make_customer(first_name='Searchable')
+    response = client.get('/cash_flow/search?q=searchab&types=customer&limit=5')
+    assert response.status_code == 200
+    [hit] = response.get_json()['hits']
+    assert (hit['type'], hit['id'], hit['title']) == ('customer', customer.id, f'Searchable {customer.last_name}')
+
+@pytest.mark.parametrize('query', ['q=ab', 'q=abc&types=invoice', 'q=abc&limit=0', 'q=abc&limit=101', 'q=abc&limit=x'])
+def test_search_endpoint_rejects_bad_parameters(client, query):
+    assert client.get(f'/cash_flow/search?{query}').status_code == 400
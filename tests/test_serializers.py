@@ -0,0 +1,122 @@
+import enum
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import inspect
+from extensions import db
+from auth.models import User
+from cash_flow.models import (
+    Account, Customer, CustomerContact, ExpenseCategory, IncomeCategory, Invoice, Payment, ProductService,
+    Transaction, Transfer, Vendor, VendorContact,
+)
+from cash_flow.models import serializers
+from cash_flow.models.base_model import BaseModel
+
+# Fields each model's hand-written to_dict added on top of BaseModel.to_dict before serializers were compiled
+LEGACY_FIELDS = {
+    Account: ['name', 'description', 'balance', 'account_type'],
+    Transaction: ['name', 'description', 'user_id', 'account_id', 'transaction_type'],
+    ExpenseCategory: ['name', 'description'],
+    IncomeCategory: ['name', 'description'],
+    Vendor: ['first_name', 'last_name', 'email', 'phone', 'address', 'description'],
+    VendorContact: ['vendor_id', 'contact_type', 'contact_value'],
+    Customer: ['first_name', 'last_name', 'email', 'phone', 'address', 'description'],
+    CustomerContact: ['customer_id', 'contact_type', 'contact_value'],
+    ProductService: ['name', 'description', 'price', 'cost', 'stock_quantity'],
+    Invoice: ['customer_id', 'total_amount', 'status', 'due_date', 'amount_paid'],
+    Payment: ['invoice_id', 'payment_date', 'amount', 'payment_method', 'account_id'],
+    Transfer: ['from_account_id', 'to_account_id', 'amount', 'description'],
+}
+
+def legacy_to_dict(obj) -> dict:
+    """The to_dict the models had before compiled serializers, as BaseModel and each subclass wrote it."""
+    obj_dict = obj.__dict__.copy()
+    obj_dict['created_at'] = obj.created_at.isoformat()
+    obj_dict['updated_at'] = obj.updated_at.isoformat()
+    obj_dict['__class__'] = obj.__class__.__name__
+    if '_sa_instance_state' in obj_dict:
+        del obj_dict['_sa_instance_state']
+    for field in LEGACY_FIELDS[type(obj)]:
+        value = getattr(obj, field)
+        obj_dict[field] = value.value if isinstance(value, enum.Enum) else value
+    if isinstance(obj, Invoice):
+        obj_dict['balance_due'] = obj.calculate_balance_due()
+    return obj_dict
+
+def expected_dict(obj) -> dict:
+    """
+    The legacy output with the changes the serializers made on purpose: only
+    columns are output (no loaded relationships or normalized contact columns),
+    and dates are ISO 8601 like datetimes.
+    """
+    columns = {column.key for column in inspect(type(obj)).column_attrs}
+    columns -= set(getattr(type(obj), '__serializer_exclude__', ()))
+    return {
+        key: value.isoformat() if isinstance(value, (date, datetime)) else value
+        for key, value in legacy_to_dict(obj).items()
+        if key in columns or key in ('__class__', 'balance_due')
+    }
+
+@pytest.fixture
+def instances(make_customer, make_account, make_invoice, make_payment):
+    user = User(username='owner', email='owner@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+
+    customer = make_customer(description='Prefers email')
+    account = make_account(description='Main account')
+    savings = make_account(name='Savings')
+    invoice = make_invoice(total_amount=250.0, customer=customer)
+    payment = make_payment(invoice, 100.0, account=account)
+    vendor = Vendor(first_name='Ana', last_name='Lima', email='ana@vendor.example', phone='555-020-0001')
+    income = IncomeCategory(name='Sales', description='Product sales')
+    expense = ExpenseCategory(name='Rent')
+    db.session.add_all([vendor, income, expense])
+    db.session.commit()
+
+    others = [
+        VendorContact(vendor_id=vendor.id, contact_type='email', contact_value='billing@vendor.example'),
+        CustomerContact(customer_id=customer.id, contact_type='phone', contact_value='555-010-9999'),
+        ProductService(name='Widget', description='A widget', price=9.5, cost=4.25, stock_quantity=12),
+        Transaction(name=42.0, user_id=user.id, account_id=account.id, transaction_type='income', amount=42.0,
+                    income_category_id=income.id),
+        Transfer(from_account_id=account.id, to_account_id=savings.id, amount=10.0, description='Top up'),
+    ]
+    db.session.add_all(others)
+    db.session.commit()
+    payment.soft_delete(db.session)
+    return [account, customer, invoice, payment, vendor, income, expense, *others]
+
+def test_every_model_is_covered():
+    concrete = {cls for cls in BaseModel.__subclasses__() if not cls.__dict__.get('__abstract__', False)}
+    assert concrete == set(LEGACY_FIELDS)
+
+def test_serializers_match_the_legacy_to_dict(instances):
+    for obj in instances:
+        # The legacy to_dict read __dict__, so every column has to be loaded for it
+        db.session.refresh(obj)
+        legacy = legacy_to_dict(obj)
+        serialized = obj.to_dict()
+
+        assert serialized == expected_dict(obj), type(obj).__name__
+        assert set(LEGACY_FIELDS[type(obj)]) <= set(serialized)
+        # Anything dropped is a relationship or a normalized contact column, never a field of the API
+        dropped = set(legacy) - set(serialized)
+        relationships = {relationship.key for relationship in inspect(type(obj)).relationships}
+        assert dropped <= relationships | set(getattr(type(obj), '__serializer_exclude__', ())), type(obj).__name__
+
+def test_expired_instances_serialize_like_loaded_ones(instances):
+    loaded = []
+    for obj in instances:
+        db.session.refresh(obj)
+        loaded.append(obj.to_dict())
+    db.session.expire_all()
+    assert [obj.to_dict() for obj in instances] == loaded
+
+def test_date_strings_are_cached_within_a_bound(make_invoice, monkeypatch):
+    monkeypatch.setattr('cash_flow.models.serializers._DATE_ISO_MAX', 2)
+    cache = serializers._DATE_ISO
+    cache.clear()
+    invoices = [make_invoice(due_date=date(2030, 1, day)) for day in (1, 2, 2, 3)]
+    assert [invoice.to_dict()['due_date'] for invoice in invoices] == ['2030-01-01', '2030-01-02', '2030-01-02', '2030-01-03']
+    assert list(cache) == [date(2030, 1, 3)]
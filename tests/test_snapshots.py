@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+
+import pytest
+from extensions import db
+from cash_flow.models import BalanceSnapshot, Posting
+from cash_flow.models.snapshots import balances_as_of, build_snapshots, period_ends, verify_snapshots
+
+def replayed(account, as_of):
+    """The balance of an account from every posting up to a day, without snapshots."""
+    return sum(p.amount for p in Posting.query.filter(Posting.account_id == account.id, Posting.effective_date <= as_of))
+
+def connection():
+    return db.session.connection()
+
+@pytest.fixture
+def history(make_account, make_invoice, make_payment):
+    """Two accounts with payments spread over the first quarter of 2030."""
+    checking, savings = make_account(), make_account(name='Savings')
+    invoice = make_invoice(total_amount=10000.0)
+    for day, amount, account in [(5, 100.0, checking), (20, 50.0, savings), (35, 25.0, checking),
+                                 (59, 10.0, checking), (70, 5.0, savings)]:
+        make_payment(invoice, amount, payment_date=date(2030, 1, 1) + timedelta(days=day - 1), account=account)
+    return checking, savings, invoice
+
+def test_period_ends():
+    assert period_ends(date(2030, 1, 30), date(2030, 2, 2), 'daily') == [
+        date(2030, 1, 30), date(2030, 1, 31), date(2030, 2, 1), date(2030, 2, 2)]
+    assert period_ends(date(2031, 12, 15), date(2032, 3, 30), 'monthly') == [
+        date(2031, 12, 31), date(2032, 1, 31), date(2032, 2, 29)]
+    assert period_ends(date(2030, 1, 1), date(2030, 1, 30), 'monthly') == []
+    with pytest.raises(ValueError):
+        period_ends(date(2030, 1, 1), date(2030, 1, 2), 'weekly')
+
+@pytest.mark.parametrize('interval', ['daily', 'monthly'])
+def test_snapshot_plus_replay_equals_full_replay(history, interval):
+    checking, savings, _ = history
+    days = [date(2029, 12, 31), date(2030, 1, 5), date(2030, 1, 31), date(2030, 2, 15), date(2030, 3, 31)]
+    before = {day: balances_as_of(connection(), day) for day in days}
+
+    assert build_snapshots(connection(), date(2030, 2, 28), interval) > 0
+    db.session.commit()
+    for day in days:
+        balances = balances_as_of(connection(), day)
+        assert balances == before[day]
+        assert balances == {checking.id: replayed(checking, day), savings.id: replayed(savings, day)}
+    assert verify_snapshots(connection()) == []
+
+def test_snapshots_are_only_added_after_the_latest(history):
+    assert build_snapshots(connection(), date(2030, 1, 31), 'monthly') == 2
+    assert build_snapshots(connection(), date(2030, 1, 31), 'monthly') == 0
+    assert build_snapshots(connection(), date(2030, 3, 31), 'monthly') == 4
+    assert sorted({s.as_of for s in BalanceSnapshot.query}) == [date(2030, 1, 31), date(2030, 2, 28), date(2030, 3, 31)]
+
+def test_back_dated_posting_shifts_later_snapshots(history, make_payment):
+    checking, _, invoice = history
+    build_snapshots(connection(), date(2030, 3, 31), 'monthly')
+    db.session.commit()
+
+    make_payment(invoice, 1000.0, payment_date=date(2030, 2, 1), account=checking)
+    january = BalanceSnapshot.query.filter_by(account_id=checking.id, as_of=date(2030, 1, 31)).one()
+    february = BalanceSnapshot.query.filter_by(account_id=checking.id, as_of=date(2030, 2, 28)).one()
+    assert (january.balance, february.balance) == (100.0, 1135.0)
+    assert balances_as_of(connection(), date(2030, 1, 31), [checking.id]) == {checking.id: 100.0}
+    assert balances_as_of(connection(), date(2030, 2, 1), [checking.id]) == {checking.id: 1100.0}
+    assert verify_snapshots(connection()) == []
+
+def test_verify_reports_a_wrong_snapshot(history):
+    checking, _, _ = history
+    build_snapshots(connection(), date(2030, 3, 31), 'monthly')
+    BalanceSnapshot.query.filter_by(account_id=checking.id, as_of=date(2030, 3, 31)).one().balance += 1
+    db.session.flush()
+    [problem] = verify_snapshots(connection())
+    assert checking.id in problem
+
+def test_balance_endpoints(client, history):
+    checking, savings, _ = history
+    build_snapshots(connection(), date(2030, 1, 31), 'monthly')
+    db.session.commit()
+
+    response = client.get(f'/cash_flow/accounts/{checking.id}/balance?as_of=2030-02-04')
+    assert response.get_json() == {'account_id': checking.id, 'as_of': '2030-02-04', 'balance': 125.0}
+    assert client.get(f'/cash_flow/accounts/{checking.id}/balance').get_json()['balance'] == 135.0
+
+    response = client.get(f'/cash_flow/accounts/balances?as_of=2030-01-31&account_id={savings.id}')
+    assert response.get_json() == {'as_of': '2030-01-31', 'balances': {savings.id: 50.0}}
+    assert client.get('/cash_flow/accounts/balances').status_code == 400
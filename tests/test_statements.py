@@ -0,0 +1,83 @@
+import json
+from datetime import date
+
+import pytest
+from extensions import db
+from cash_flow.statements import customer_partitions, iter_statements
+
+START, END = date(2030, 2, 1), date(2030, 2, 28)
+
+def created(day):
+    return f'{day.isoformat()}T12:00:00.000000'
+
+def statements(**kwargs):
+    return list(iter_statements(db.session.connection(), START, END, **kwargs))
+
+@pytest.fixture
+def ada(make_customer, make_invoice, make_payment):
+    """A customer owing 70 from January, invoiced and paying through February and beyond."""
+    ada = make_customer(first_name='Ada', last_name='<Byron>')
+    january = make_invoice(100.0, customer=ada, created_at=created(date(2030, 1, 10)))
+    make_payment(january, 30.0, payment_date=date(2030, 1, 20))
+    make_payment(january, 20.0, payment_date=date(2030, 2, 3))
+    february = make_invoice(50.0, customer=ada, due_date=date(2030, 3, 10), created_at=created(date(2030, 2, 3)))
+    make_payment(february, 10.0, payment_date=date(2030, 2, 28))
+    make_payment(february, 5.0, payment_date=date(2030, 3, 1))
+    make_payment(february, 7.0, payment_date=date(2030, 2, 15)).soft_delete(db.session)
+    make_invoice(999.0, customer=ada, created_at=created(date(2030, 2, 10))).soft_delete(db.session)
+    make_invoice(40.0, customer=ada, created_at=created(date(2030, 3, 1)))
+    return ada
+
+def test_statement_of_one_customer(ada):
+    [statement] = statements(customer_id=ada.id)
+    assert statement['customer']['name'] == 'Ada <Byron>'
+    assert statement['period'] == {'from': '2030-02-01', 'to': '2030-02-28'}
+    assert statement['opening_balance'] == 70.0
+    # Same-day lines list the invoice before the payment
+    assert [(line['date'], line['type'], line['amount'], line['balance']) for line in statement['lines']] == [
+        ('2030-02-03', 'invoice', 50.0, 120.0),
+        ('2030-02-03', 'payment', -20.0, 100.0),
+        ('2030-02-28', 'payment', -10.0, 90.0),
+    ]
+    assert statement['lines'][0]['due_date'] == '2030-03-10'
+    assert statement['lines'][1]['due_date'] is None
+    assert (statement['invoiced'], statement['paid'], statement['closing_balance']) == (50.0, 30.0, 90.0)
+
+def test_every_active_customer_gets_a_statement_in_id_order(ada, make_customer, make_invoice):
+    quiet = make_customer()
+    gone = make_customer()
+    make_invoice(25.0, customer=gone, created_at=created(date(2030, 2, 5)))
+    gone.soft_delete(db.session)
+
+    result = statements()
+    assert [s['customer']['id'] for s in result] == sorted([ada.id, quiet.id])
+    by_id = {s['customer']['id']: s for s in result}
+    assert (by_id[quiet.id]['opening_balance'], by_id[quiet.id]['lines'], by_id[quiet.id]['closing_balance']) == (0.0, [], 0.0)
+    assert statements(batch_size=1) == result
+
+@pytest.mark.parametrize('parts', [1, 2, 3, 7])
+def test_partitions_cover_every_customer_once(make_customer, make_invoice, parts):
+    for n in range(6):
+        make_invoice(10.0 + n, customer=make_customer(), created_at=created(date(2030, 2, 1 + n)))
+    full = statements()
+
+    partitions = customer_partitions(db.session.connection(), parts)
+    assert len(partitions) <= parts
+    assert [s for after, through in partitions for s in statements(after=after, through=through)] == full
+
+def test_statement_endpoints(client, ada):
+    response = client.get('/cash_flow/statements?from=2030-02-01&to=2030-02-28')
+    assert response.mimetype == 'application/x-ndjson'
+    [line] = response.get_data(as_text=True).splitlines()
+    assert json.loads(line)['closing_balance'] == 90.0
+
+    response = client.get(f'/cash_flow/customers/{ada.id}/statement?from=2030-02-01&to=2030-02-28&format=html')
+    assert response.mimetype == 'text/html'
+    html = response.get_data(as_text=True)
+    assert 'Ada &lt;Byron&gt;' in html and '<Byron>' not in html
+    assert 'Closing balance</td><td>90.00' in html
+
+    assert client.get(f'/cash_flow/customers/{ada.id}/statement?from=2030-02-01&to=2030-02-28').get_json()['paid'] == 30.0
+    assert client.get('/cash_flow/customers/missing/statement?from=2030-02-01&to=2030-02-28').status_code == 404
+    assert client.get('/cash_flow/statements?from=2030-02-01').status_code == 400
+    assert client.get('/cash_flow/statements?from=2030-02-01&to=2030-02-28&format=pdf').status_code == 400
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+from flask_jwt_extended import create_access_token
+from extensions import db
+from cash_flow.models import ProductService
+from cash_flow.typeahead import Typeahead, TypeaheadIndex, normalize_name
+
+def ids(results):
+    return [result['id'] for result in results]
+
+@pytest.fixture
+def typeahead(app):
+    """Indexes that apply changes on every lookup and are rebuilt only when a test asks."""
+    return Typeahead(max_staleness=0, rebuild_interval=3600, overlap=0)
+
+def lookup(typeahead, query, kind='customer', limit=10):
+    return typeahead.lookup(db.session, kind, query, limit)
+
+def test_normalize_name():
+    assert normalize_name('  Élodie   DURAND ') == 'elodie durand'
+
+def test_prefix_hits_come_before_infix_hits():
+    index = TypeaheadIndex()
+    index.load([('1', 'Jane Smith'), ('2', 'Blacksmith Supplies'), ('3', 'Smithers Ltd'), ('4', 'Omar Haddad')])
+    # Word starts in alphabetical order of the matching word, then names containing the query
+    assert index.lookup('smi', 10) == [('1', 'Jane Smith'), ('3', 'Smithers Ltd'), ('2', 'Blacksmith Supplies')]
+    assert index.lookup('ADDA', 10) == [('4', 'Omar Haddad')]
+    assert index.lookup('smi', 1) == [('1', 'Jane Smith')]
+    assert index.lookup('zzz', 10) == [] and index.lookup(' ', 10) == []
+
+def test_upsert_and_remove_without_a_rebuild():
+    index = TypeaheadIndex()
+    index.load([('1', 'Jane Smith'), ('2', 'John Smith')])
+    index.upsert('3', 'Anne Smith')
+    index.upsert('1', 'Jane Doe')
+    index.remove('2')
+    assert index.lookup('smith', 10) == [('3', 'Anne Smith')]
+    assert index.lookup('jane', 10) == [('1', 'Jane Doe')]
+    assert (len(index), index.dead) == (2, 2)
+
+def test_stats_memory_grows_with_the_index():
+    small, large = TypeaheadIndex(), TypeaheadIndex()
+    small.load([('1', 'Jane Smith')])
+    large.load((str(n), f'Customer number {n}') for n in range(1000))
+    assert 0 < small.memory() < large.memory()
+    stats = large.stats()
+    assert (stats['entries'], stats['dead_slots'], stats['prefix_keys']) == (1000, 0, 3000)
+    assert stats['memory_bytes'] == large.memory()
+    assert stats['postings'] >= stats['trigrams'] > 0
+
+def test_inserts_renames_and_soft_deletes_are_picked_up(typeahead, make_customer):
+    jane = make_customer(first_name='Jane', last_name='Smith')
+    assert ids(lookup(typeahead, 'smi')) == [jane.id]
+
+    john = make_customer(first_name='John', last_name='Smithers')
+    assert ids(lookup(typeahead, 'smi')) == [jane.id, john.id]
+
+    jane.last_name = 'Doe'
+    db.session.commit()
+    assert ids(lookup(typeahead, 'smi')) == [john.id]
+    assert ids(lookup(typeahead, 'doe')) == [jane.id]
+
+    john.soft_delete(db.session)
+    assert lookup(typeahead, 'smi') == []
+    stats = typeahead.stats()['indexes']['customer']
+    assert (stats['entries'], stats['dead_slots']) == (1, 2)
+
+def test_products_are_indexed_separately(typeahead, make_customer):
+    make_customer(first_name='Anvil', last_name='Buyer')
+    db.session.add(ProductService(name='Anvil', price=10.0, cost=4.0))
+    db.session.commit()
+    assert [result['name'] for result in lookup(typeahead, 'anv', kind='product_service')] == ['Anvil']
+
+def test_readers_keep_the_old_index_during_a_rebuild(typeahead, make_customer, monkeypatch):
+    jane = make_customer(first_name='Jane', last_name='Smith')
+    assert ids(lookup(typeahead, 'smith')) == [jane.id]
+    make_customer(first_name='John', last_name='Smith')
+    typeahead.max_staleness = typeahead.rebuild_interval = 0
+    seen = []
+    load = TypeaheadIndex.load
+
+    def slow_load(index, rows):
+        # Another thread looks up while this one is building the new index
+        reader = threading.Thread(target=lambda: seen.append(ids(typeahead.lookup(None, 'customer', 'smith', 10))))
+        reader.start()
+        reader.join(timeout=5)
+        load(index, rows)
+
+    monkeypatch.setattr(TypeaheadIndex, 'load', slow_load)
+    assert len(lookup(typeahead, 'smith')) == 2
+    assert seen == [[jane.id]]
+
+def test_typeahead_endpoint(client, make_customer):
+    jane = make_customer(first_name='Jane', last_name='Smith')
+    response = client.get('/cash_flow/typeahead?type=customer&q=smi&limit=5')
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [{'id': jane.id, 'name': 'Jane Smith'}]
+    assert client.get('/cash_flow/typeahead?type=invoice&q=smi').status_code == 400
+    assert client.get('/cash_flow/typeahead?type=customer&q=smi&limit=51').status_code == 400
+
+def test_stats_endpoint_is_admin_only(client, make_customer):
+    make_customer()
+    client.get('/cash_flow/typeahead?type=customer&q=test')
+
+    def get(role):
+        token = create_access_token(identity={'user_id': 1, 'username': role, 'email': f'{role}@example.com', 'role': role})
+        return client.get('/cash_flow/admin/typeahead-stats', headers={'Authorization': f'Bearer {token}'})
+
+    response = get('admin')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['lookups'] == 1 and body['indexes']['customer']['entries'] == 1
+    assert body['memory_bytes'] == body['indexes']['customer']['memory_bytes'] > 0
+    assert get('user').status_code == 403
+    assert client.get('/cash_flow/admin/typeahead-stats').status_code == 401
+    assert client.get('/auth/admin/typeahead-stats').status_code == 404